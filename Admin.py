@@ -2,6 +2,8 @@ from Person import Person
 
 
 class Admin(Person):
+    __slots__ = ()
+
     def __init__(self, id: int, name: str, surname: str, birthdate: str, email: str, uniEmail: str):
         super().__init__(id, name, surname, birthdate, email, uniEmail)
 
@@ -1,4 +1,7 @@
+# Fields are plain slots instead of properties, the subclasses add slots for their own fields
 class Person:
+    __slots__ = ("id", "name", "surname", "birthdate", "email", "uniEmail")
+
     def __init__(self, id: int, name: str, surname: str, birthdate: str, email: str, uniEmail: str) -> None:
         self.id: int = id
         self.name: str = name
@@ -10,51 +13,3 @@ class Person:
     def __str__(self) -> str:
         return (f"ID: {self.id}, First name: {self.name}, Surname: {self.surname}, Birthdate: {self.birthdate}, "
                 f"Email: {self.email}, University email: {self.uniEmail}")
-
-    @property
-    def id(self) -> int:
-        return self._id
-
-    @id.setter
-    def id(self, id: int) -> None:
-        self._id: int = id
-
-    @property
-    def name(self) -> str:
-        return self._name
-
-    @name.setter
-    def name(self, name: str) -> None:
-        self._name: str = name
-
-    @property
-    def surname(self) -> str:
-        return self._surname
-
-    @surname.setter
-    def surname(self, surname: str) -> None:
-        self._surname: str = surname
-
-    @property
-    def birthdate(self) -> str:
-        return self._birthdate
-
-    @birthdate.setter
-    def birthdate(self, birthdate: str) -> None:
-        self._birthdate: str = birthdate
-
-    @property
-    def email(self) -> str:
-        return self._email
-
-    @email.setter
-    def email(self, email: str) -> None:
-        self._email: str = email
-
-    @property
-    def uniEmail(self) -> str:
-        return self._uniEmail
-
-    @uniEmail.setter
-    def uniEmail(self, uniEmail: str) -> None:
-        self._uniEmail: str = uniEmail
@@ -0,0 +1,30 @@
+from typing import Optional, Sequence, Union
+from Person import Person
+from Student import Student
+from Teacher import Teacher
+from Admin import Admin
+from Course import Course
+from course_filter import CourseView
+
+
+# State of one client of the portal: the logged-in user, the loaded course lists and the course filter
+# Every client (a window, a request, a thread) keeps its own session, so the service functions
+# never share mutable state between clients
+class Session:
+    __slots__ = ("user", "all_courses_list", "all_courses_for_degree_list", "courses_filter_list",
+                 "select_filter_value")
+
+    def __init__(self) -> None:
+        # Current logged-in user, instance of type Person (Student, Teacher, Admin), None before login
+        self.user: Optional[Union[Person, Student, Teacher, Admin]] = None
+        # Lists to hold filtered courses, all courses (read page by page) and courses for a degree
+        self.all_courses_list: Sequence[Course] = []
+        self.all_courses_for_degree_list: list[Course] = []
+        self.courses_filter_list: CourseView = CourseView()
+        # Selected filter option
+        self.select_filter_value: int = 0
+
+    def __str__(self) -> str:
+        return (f"User: {self.user.id if self.user is not None else None}, "
+                f"All courses: {len(self.all_courses_list)}, "
+                f"Courses for degree: {len(self.all_courses_for_degree_list)}")
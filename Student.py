@@ -1,9 +1,13 @@
+from typing import Optional
 from Person import Person
 from Course import Course
 from Grade import Grade
 
 
 class Student(Person):
+    __slots__ = ("degree", "courses", "_grades", "_grade_positions", "_average", "_weighted_average",
+                 "_passed_count", "_failed_count", "_credits_earned")
+
     def __init__(self, id: int, name: str, surname: str, birthdate: str, email: str, uniEmail: str, degree: str,
                  courses: list[Course], grades: list[Grade]):
         super().__init__(id, name, surname, birthdate, email, uniEmail)
@@ -13,35 +17,76 @@ class Student(Person):
 
     def __str__(self) -> str:
         course: list[str] = []
-        for i in self._courses:
+        for i in self.courses:
             course.append(f"{i.id} {i.name}")
 
         grade: list[str] = []
         for g in self._grades:
             grade.append(f"{g.course.name}: {g.grades}")
 
-        return f"{super().__str__()}, Degree: {self._degree}, Courses: {', '.join(course)}, Grades: {', '.join(grade)}"
+        return f"{super().__str__()}, Degree: {self.degree}, Courses: {', '.join(course)}, Grades: {', '.join(grade)}"
 
+    # Setting the grades rebuilds the grade index and the summary, so reading them is free
+    # The index keeps the position of the grade of each course in the list, so replacing a grade needs no search
     @property
-    def degree(self) -> str:
-        return self._degree
+    def grades(self) -> list[Grade]:
+        return self._grades
+
+    @grades.setter
+    def grades(self, grades: list[Grade]) -> None:
+        self._grades: list[Grade] = grades
+        self._grade_positions: dict[int, int] = {grade.course.id: index for index, grade in enumerate(grades)}
+        self._summarize_grades()
+
+    # Add the grade of a course, or replace the grade the course already has
+    def set_grade(self, grade: Grade) -> None:
+        position: Optional[int] = self._grade_positions.get(grade.course.id)
+        if position is None:
+            self._grade_positions[grade.course.id] = len(self._grades)
+            self._grades.append(grade)
+        else:
+            self._grades[position] = grade
+        self._summarize_grades()
+
+    # Return the grade of the course with the given id, or None when the course has no grade yet
+    def grade_for(self, course_id: int) -> Optional[Grade]:
+        position: Optional[int] = self._grade_positions.get(course_id)
+        return self._grades[position] if position is not None else None
+
+    # Compute the grade summary once, every time the grades change
+    def _summarize_grades(self) -> None:
+        grades: list[Grade] = [self._grades[position] for position in self._grade_positions.values()]
+        total_credits: int = sum(grade.course.credits for grade in grades)
+        passed: list[Grade] = [grade for grade in grades if grade.grades >= grade.course.passing_grade]
 
-    @degree.setter
-    def degree(self, degree: str) -> None:
-        self._degree: str = degree
+        self._average: Optional[float] = sum(grade.grades for grade in grades) / len(grades) if grades else None
+        self._weighted_average: Optional[float] = (
+            sum(grade.grades * grade.course.credits for grade in grades) / total_credits if total_credits else None)
+        self._passed_count: int = len(passed)
+        self._failed_count: int = len(grades) - len(passed)
+        self._credits_earned: int = sum(grade.course.credits for grade in passed)
 
+    # Average grade over all graded courses, None without grades
     @property
-    def courses(self) -> list[Course]:
-        return self._courses
+    def average(self) -> Optional[float]:
+        return self._average
 
-    @courses.setter
-    def courses(self, courses: list[Course]) -> None:
-        self._courses: list[Course] = courses
+    # Average grade weighted by the credits of each course, None without grades
+    @property
+    def weighted_average(self) -> Optional[float]:
+        return self._weighted_average
 
+    # Number of courses graded at or above their passing grade
     @property
-    def grades(self) -> list[Grade]:
-        return self._grades
+    def passed_count(self) -> int:
+        return self._passed_count
 
-    @grades.setter
-    def grades(self, grades: list[Grade]) -> None:
-        self._grades: list[Grade] = grades
+    # Number of courses graded below their passing grade
+    @property
+    def failed_count(self) -> int:
+        return self._failed_count
+
+    # Sum of the credits of all passed courses
+    @property
+    def credits_earned(self) -> int:
+        return self._credits_earned
@@ -1,8 +1,10 @@
 from Person import Person
-import Course
+from Course import Course
 
 
 class Teacher(Person):
+    __slots__ = ("courses",)
+
     def __init__(self, id: int, name: str, surname: str, birthdate: str, email: str, uniEmail: str,
                  courses: list[Course]):
         super().__init__(id, name, surname, birthdate, email, uniEmail)
@@ -10,14 +12,6 @@ class Teacher(Person):
 
     def __str__(self) -> str:
         course: list[str] = []
-        for i in self._courses:
+        for i in self.courses:
             course.append(f"{i.id} {i.name}, ")
         return f"{super().__str__()}, Courses: {''.join(course)}"
-
-    @property
-    def courses(self) -> list[Course]:
-        return self._courses
-
-    @courses.setter
-    def courses(self, courses: list[Course]) -> None:
-        self._courses: list[Course] = courses
@@ -0,0 +1,391 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from typing import Any, Awaitable, Callable, Optional, Union
+from urllib.parse import parse_qs, urlsplit
+import service
+from Admin import Admin
+from Course import Course
+from Person import Person
+from Session import Session
+from Student import Student
+from Teacher import Teacher
+from course_search import search_courses
+from db import ConnectionManager
+import session_tokens
+from session_tokens import SessionStore
+import login_throttle
+from login_throttle import LoginThrottled
+
+# JSON over HTTP/1.1 for the portal, served by one asyncio event loop
+# The event loop only parses requests and writes responses, bcrypt runs in the hash executor and every
+# query in the database executor, whose threads each keep one connection of service.db_manager
+# All clients share the catalog cache, the write queue and the connections of the process
+
+DEFAULT_HOST: str = "127.0.0.1"
+DEFAULT_PORT: int = 8080
+
+# Worker threads for queries, each with its own connection
+DB_WORKERS: int = 8
+
+# Largest request body and number of header lines accepted
+MAX_BODY: int = 64 * 1024
+MAX_HEADERS: int = 100
+
+# Seconds a kept-alive connection may wait for its next request
+IDLE_TIMEOUT: float = 30.0
+
+REASONS: dict[int, str] = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+                           405: "Method Not Allowed", 413: "Payload Too Large", 429: "Too Many Requests",
+                           500: "Internal Server Error"}
+
+
+# Raised by a handler to answer with an error status and message
+class ApiError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status: int = status
+        self.message: str = message
+
+
+# One parsed HTTP request
+class Request:
+    __slots__ = ("method", "path", "query", "headers", "body", "version", "client")
+
+    def __init__(self, method: str, path: str, query: dict[str, str], headers: dict[str, str], body: bytes,
+                 version: str, client: str = "") -> None:
+        self.method: str = method
+        self.path: str = path
+        self.query: dict[str, str] = query
+        self.headers: dict[str, str] = headers
+        self.body: bytes = body
+        self.version: str = version
+        # Address of the client, for the login throttle
+        self.client: str = client
+
+    def __str__(self) -> str:
+        return f"{self.method} {self.path}"
+
+    # HTTP/1.1 keeps the connection open unless the client asks to close it, HTTP/1.0 the other way around
+    @property
+    def keep_alive(self) -> bool:
+        connection: str = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    # Token from the "Authorization: Bearer <token>" header, None when there is none
+    @property
+    def token(self) -> Optional[str]:
+        scheme, _, token = self.headers.get("authorization", "").partition(" ")
+        return (token.strip() or None) if scheme.lower() == "bearer" else None
+
+    # The body as a JSON object
+    def json(self) -> dict[str, Any]:
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise ApiError(400, "The body is not valid JSON")
+        if not isinstance(data, dict):
+            raise ApiError(400, "The body must be a JSON object")
+        return data
+
+    # A string field of the JSON body, missing fields are empty
+    def field(self, data: dict[str, Any], name: str) -> str:
+        value = data.get(name, "")
+        if not isinstance(value, str):
+            raise ApiError(400, f"{name} must be a string")
+        return value
+
+
+# Read one request from the stream, returns None when the client closed the connection
+async def read_request(reader: asyncio.StreamReader, client: str = "") -> Optional[Request]:
+    line: bytes = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise ApiError(400, "Malformed request line")
+
+    headers: dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise ApiError(400, "Too many headers")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length: str = headers.get("content-length", "0")
+    if not length.isdigit():
+        raise ApiError(400, "Invalid Content-Length")
+    if int(length) > MAX_BODY:
+        raise ApiError(413, f"The body can be at most {MAX_BODY} bytes")
+    body: bytes = await reader.readexactly(int(length)) if int(length) else b""
+
+    url = urlsplit(target)
+    query: dict[str, str] = {name: values[-1] for name, values in parse_qs(url.query).items()}
+    return Request(method.upper(), url.path, query, headers, body, version.upper(), client)
+
+
+def response_bytes(status: int, payload: Any, keep_alive: bool) -> bytes:
+    body: bytes = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head: str = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n" +
+                 "Content-Type: application/json; charset=utf-8\r\n" +
+                 f"Content-Length: {len(body)}\r\n" +
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+def course_json(course: Course) -> dict[str, Any]:
+    return {"id": course.id, "name": course.name, "passing_grade": course.passing_grade,
+            "active": course.active_status == 1, "credits": course.credits}
+
+
+def user_json(user: Union[Person, Student, Teacher, Admin]) -> dict[str, Any]:
+    role: str = ("student" if isinstance(user, Student) else "teacher" if isinstance(user, Teacher)
+                 else "admin" if isinstance(user, Admin) else "person")
+    data: dict[str, Any] = {"id": user.id, "name": user.name, "surname": user.surname, "birthdate": user.birthdate,
+                            "email": user.email, "uni_email": user.uniEmail, "role": role}
+    if isinstance(user, Student):
+        data["degree"] = user.degree
+    if isinstance(user, (Student, Teacher)):
+        data["courses"] = [course_json(course) for course in user.courses]
+    return data
+
+
+# The courses of a student with their grades and the grade summary, like the grades page
+def grades_json(student: Student) -> dict[str, Any]:
+    courses: list[dict[str, Any]] = []
+    for course in student.courses:
+        grade = student.grade_for(course.id)
+        courses.append({**course_json(course), "grade": grade.grades if grade is not None else None})
+    return {"courses": courses, "average": student.average, "weighted_average": student.weighted_average,
+            "passed": student.passed_count, "failed": student.failed_count,
+            "credits_earned": student.credits_earned}
+
+
+# The JSON API, routes map (method, path) to a handler that returns the JSON payload of the response
+class ApiServer:
+    def __init__(self, hash_workers: Optional[int] = None, db_workers: int = DB_WORKERS) -> None:
+        # bcrypt releases the GIL, so one hashing thread per core keeps every core busy and no more
+        self.hash_workers: int = hash_workers or os.cpu_count() or 1
+        self.hash_executor = ThreadPoolExecutor(max_workers=self.hash_workers, thread_name_prefix="roll-call-hash")
+        self.db_executor = ThreadPoolExecutor(max_workers=db_workers, thread_name_prefix="roll-call-db")
+        self.requests: int = 0
+        self.errors: int = 0
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.routes: dict[tuple[str, str], Callable[[Request], Awaitable[Any]]] = {
+            ("POST", "/login"): self.login,
+            ("POST", "/logout"): self.logout,
+            ("GET", "/profile"): self.profile,
+            ("GET", "/courses"): self.courses,
+            ("GET", "/courses/degree"): self.degree_courses,
+            ("GET", "/courses/search"): self.search,
+            ("GET", "/grades"): self.grades,
+            ("POST", "/settings"): self.settings,
+            ("GET", "/stats"): self.stats,
+        }
+
+    def __str__(self) -> str:
+        return f"API server: {self.requests} requests, {self.errors} errors, {len(self.sessions)} sessions"
+
+    # Sessions of the process, shared with service so a settings change drops the sessions of the user
+    @property
+    def sessions(self) -> SessionStore:
+        return session_tokens.store
+
+    # Start listening, returns the port, which is picked by the system when port is 0
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> int:
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        await self.server.serve_forever()
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.hash_executor.shutdown(wait=False, cancel_futures=True)
+        self.db_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run_db(self, function: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.db_executor, function, *args)
+
+    async def run_hash(self, function: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.hash_executor, function, *args)
+
+    # Serve the requests of one connection until the client closes it or asks to close it
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info("peername")
+        client: str = peer[0] if isinstance(peer, tuple) else ""
+        try:
+            while True:
+                try:
+                    request: Optional[Request] = await asyncio.wait_for(read_request(reader, client), IDLE_TIMEOUT)
+                except ApiError as error:
+                    writer.write(response_bytes(error.status, {"error": error.message}, False))
+                    await writer.drain()
+                    break
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                    break
+                if request is None:
+                    break
+                status, payload = await self.dispatch(request)
+                writer.write(response_bytes(status, payload, request.keep_alive))
+                await writer.drain()
+                if not request.keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            # The connection task ends here anyway, so a cancel while closing (on shutdown) is not passed on
+            with suppress(ConnectionError, asyncio.CancelledError):
+                await writer.wait_closed()
+
+    # Run the handler of the request, returns the status and the JSON payload
+    async def dispatch(self, request: Request) -> tuple[int, Any]:
+        self.requests += 1
+        handler = self.routes.get((request.method, request.path))
+        try:
+            if handler is None:
+                if any(path == request.path for _, path in self.routes):
+                    raise ApiError(405, f"{request.method} is not allowed on {request.path}")
+                raise ApiError(404, f"No route for {request.path}")
+            return 200, await handler(request)
+        except ApiError as error:
+            self.errors += 1
+            return error.status, {"error": error.message}
+        except PermissionError as error:
+            self.errors += 1
+            return 403, {"error": str(error)}
+        except LoginThrottled as error:
+            self.errors += 1
+            return 429, {"error": str(error), "retry_after": round(error.retry_after, 1)}
+        except Exception:
+            self.errors += 1
+            traceback.print_exc(file=sys.stderr)
+            return 500, {"error": "Internal server error"}
+
+    # Session of the token of the request
+    def session_for(self, request: Request) -> Session:
+        session: Optional[Session] = self.sessions.get(request.token)
+        if session is None:
+            raise ApiError(401, "Log in first and send the token as 'Authorization: Bearer <token>'")
+        return session
+
+    async def login(self, request: Request) -> dict[str, Any]:
+        data = request.json()
+        email, password = request.field(data, "email").strip(), request.field(data, "password").strip()
+        session = Session()
+        # The throttle runs on the event loop, so a rejected attempt never waits for a hashing thread
+        if not login_throttle.throttle.admit(email, request.client or login_throttle.LOCAL_CLIENT):
+            raise ApiError(401, "Invalid email or password")
+        # The rest of the login hashes and queries in one go, so it runs in the hash executor
+        if not await self.run_hash(service.verify_login, session, email, password.encode("utf-8")):
+            raise ApiError(401, "Invalid email or password")
+        return {"token": self.sessions.issue(session), "user": user_json(session.user)}
+
+    async def logout(self, request: Request) -> dict[str, Any]:
+        self.session_for(request)
+        self.sessions.revoke(request.token)
+        return {"message": "Logged out"}
+
+    async def profile(self, request: Request) -> dict[str, Any]:
+        return user_json(self.session_for(request).user)
+
+    # One page of all courses, ?order=id|name&limit=50&after=<next of the previous page>
+    async def courses(self, request: Request) -> dict[str, Any]:
+        self.session_for(request)
+        after: Optional[tuple] = None
+        try:
+            limit: int = int(request.query.get("limit", service.COURSE_PAGE_SIZE))
+            if "after" in request.query:
+                key = json.loads(request.query["after"])
+                if not isinstance(key, list):
+                    raise ValueError("after is not a list")
+                after = tuple(key)
+        except (TypeError, ValueError):
+            raise ApiError(400, "limit must be a number and after the next value of the previous page")
+        if not 0 < limit <= 500:
+            raise ApiError(400, "limit must be between 1 and 500")
+        try:
+            courses, next_key = await self.run_db(service.list_courses_page, after, limit,
+                                                  request.query.get("order", "id"))
+        except ValueError as error:
+            raise ApiError(400, str(error))
+        return {"courses": [course_json(course) for course in courses],
+                "next": list(next_key) if next_key is not None else None}
+
+    async def degree_courses(self, request: Request) -> dict[str, Any]:
+        session = self.session_for(request)
+        courses = await self.run_db(service.get_all_courses_for_degree, session.user.id)
+        return {"courses": [course_json(course) for course in courses]}
+
+    async def search(self, request: Request) -> dict[str, Any]:
+        self.session_for(request)
+        text: str = request.query.get("q", "").strip()
+        if not text:
+            raise ApiError(400, "Pass the text to search for as ?q=")
+        courses = await self.run_db(lambda: search_courses(service.db_manager.connection(), text))
+        return {"courses": [course_json(course) for course in courses]}
+
+    # Grades of the logged-in student, loaded with the profile at login
+    async def grades(self, request: Request) -> dict[str, Any]:
+        user = self.session_for(request).user
+        if not isinstance(user, Student):
+            raise ApiError(403, "Only students have grades")
+        return grades_json(user)
+
+    async def settings(self, request: Request) -> dict[str, Any]:
+        session = self.session_for(request)
+        data = request.json()
+        message: str = await self.run_hash(service.change_user_settings, session, request.field(data, "email"),
+                                           request.field(data, "password1"), request.field(data, "password2"))
+        # A changed email or password drops every session of the user, this client gets a new token
+        if self.sessions.get(request.token) is None:
+            return {"message": message, "token": self.sessions.issue(session)}
+        return {"message": message}
+
+    async def stats(self, request: Request) -> dict[str, Any]:
+        self.session_for(request)
+        return {"requests": self.requests, "errors": self.errors, "sessions": self.sessions.stats(),
+                "database": service.db_manager.stats(), "write_queue": service.write_queue().stats(),
+                "catalog": {"loads": service.catalog().loads, "hits": service.catalog().hits},
+                "login_throttle": login_throttle.throttle.stats()}
+
+
+async def serve(host: str, port: int) -> None:
+    server = ApiServer()
+    port = await server.start(host, port)
+    print(f"Serving the portal API on http://{host}:{port}")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the portal as a JSON API")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"address to listen on (default {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port to listen on (default {DEFAULT_PORT})")
+    parser.add_argument("--db", default=service.DBFILE, help="database file (default roll_call.db)")
+    args = parser.parse_args()
+
+    service.db_manager = ConnectionManager(args.db)
+    service.create_database()
+    with suppress(KeyboardInterrupt):
+        asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import json
+import sqlite3
+from typing import Iterable, Optional
+
+# Pending requests listed per page
+PENDING_PAGE_SIZE: int = 200
+
+# Key of an enrollment request, the primary key of CourseEnrollments: (UserId, CourseId, StartDate)
+RequestKey = tuple[int, int, str]
+
+# Pending requests with the student and course, in the order of the partial index on pending rows
+# The WHERE clause must keep "e.Assigned = 0" as written, so SQLite can use the partial index
+# The index and the join order are fixed: left to itself the planner prefers the full index on
+# (CourseId, Assigned) for some filters and sorts the whole result, which is several times slower
+PENDING_QUERY: str = ("SELECT e.UserId, u.FirstName, u.Surname, e.CourseId, c.CourseName, e.StartDate " +
+                      "FROM CourseEnrollments AS e INDEXED BY idx_enrollments_pending " +
+                      "CROSS JOIN User AS u ON u.Id = e.UserId " +
+                      "CROSS JOIN Course AS c ON c.CourseId = e.CourseId " +
+                      "WHERE e.Assigned = 0")
+
+# Keys of the selected requests, passed as one JSON array of [UserId, CourseId, StartDate] so a selection
+# of any size is one statement with one parameter
+SELECTED_KEYS: str = ("SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'), " +
+                      "json_extract(value, '$[2]') FROM json_each(?)")
+
+
+# One enrollment request waiting for approval
+class PendingRequest:
+    __slots__ = ("user_id", "first_name", "surname", "course_id", "course_name", "start_date")
+
+    def __init__(self, user_id: int, first_name: str, surname: str, course_id: int, course_name: str,
+                 start_date: str) -> None:
+        self.user_id: int = user_id
+        self.first_name: str = first_name
+        self.surname: str = surname
+        self.course_id: int = course_id
+        self.course_name: str = course_name
+        self.start_date: str = start_date
+
+    def __str__(self) -> str:
+        return f"{self.first_name} {self.surname} ({self.user_id}): {self.course_name}, Start: {self.start_date}"
+
+    @property
+    def key(self) -> RequestKey:
+        return self.user_id, self.course_id, self.start_date
+
+
+# Extra conditions for a filter on the course and on the degree of the student, given as
+# (BaseId, DegreeBNId, TypeId), returns the SQL to add to the WHERE clause and its parameters
+# The columns are qualified with the table, so the degree subquery can not bind them to Degree
+def filter_sql(course_id: Optional[int], degree: Optional[tuple[int, int, int]], table: str = "e") -> tuple[str, list]:
+    sql: str = ""
+    parameters: list = []
+    if course_id is not None:
+        sql += f" AND {table}.CourseId = ?"
+        parameters.append(course_id)
+    if degree is not None:
+        sql += (f" AND EXISTS (SELECT 1 FROM Degree AS d WHERE d.UserId = {table}.UserId " +
+                "AND d.BaseId = ? AND d.DegreeBNId = ? AND d.TypeId = ?)")
+        parameters.extend(degree)
+    return sql, parameters
+
+
+# List one page of pending requests, optionally for one course and for the students of one degree
+# Pages continue after the key of the last request of the previous page, like the paged course listing
+def list_pending(conn: sqlite3.Connection, course_id: Optional[int] = None,
+                 degree: Optional[tuple[int, int, int]] = None, after: Optional[tuple] = None,
+                 limit: int = PENDING_PAGE_SIZE) -> list[PendingRequest]:
+    sql, parameters = filter_sql(course_id, degree)
+    if after is not None:
+        # after is the key of the last request as (CourseId, UserId, StartDate), the order of the index
+        sql += " AND (e.CourseId, e.UserId, e.StartDate) > (?, ?, ?)"
+        parameters.extend(after)
+    cur = conn.cursor()
+    cur.execute(PENDING_QUERY + sql + " ORDER BY e.CourseId, e.UserId, e.StartDate LIMIT ?", (*parameters, limit))
+    return [PendingRequest(row[0], row[1], row[2], row[3], row[4], row[5]) for row in cur.fetchall()]
+
+
+# Number of pending requests for the filter
+def count_pending(conn: sqlite3.Connection, course_id: Optional[int] = None,
+                  degree: Optional[tuple[int, int, int]] = None) -> int:
+    sql, parameters = filter_sql(course_id, degree)
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) FROM CourseEnrollments AS e INDEXED BY idx_enrollments_pending " +
+                "WHERE e.Assigned = 0" + sql, parameters)
+    return cur.fetchone()[0]
+
+
+# Run one set-based statement on the pending requests: the selected ones when keys are given,
+# otherwise all the ones matching the filter, returns the number of requests it changed
+def change_pending(conn: sqlite3.Connection, statement: str, keys: Optional[Iterable[RequestKey]],
+                   course_id: Optional[int], degree: Optional[tuple[int, int, int]]) -> int:
+    sql, parameters = filter_sql(course_id, degree, table="CourseEnrollments")
+    if keys is not None:
+        sql += f" AND (UserId, CourseId, StartDate) IN ({SELECTED_KEYS})"
+        parameters.append(json.dumps([list(key) for key in keys]))
+
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        cur.execute(statement + " WHERE Assigned = 0" + sql, parameters)
+        changed: int = cur.rowcount
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return changed
+
+
+# Approve pending requests in one statement and one transaction, either the selected ones or all
+# that match the filter, requests that were already handled are left alone
+def approve(conn: sqlite3.Connection, keys: Optional[Iterable[RequestKey]] = None, course_id: Optional[int] = None,
+            degree: Optional[tuple[int, int, int]] = None) -> int:
+    return change_pending(conn, "UPDATE CourseEnrollments SET Assigned = 1", keys, course_id, degree)
+
+
+# Reject pending requests by deleting them, selected the same way as approve
+def reject(conn: sqlite3.Connection, keys: Optional[Iterable[RequestKey]] = None, course_id: Optional[int] = None,
+           degree: Optional[tuple[int, int, int]] = None) -> int:
+    return change_pending(conn, "DELETE FROM CourseEnrollments", keys, course_id, degree)
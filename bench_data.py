@@ -0,0 +1,145 @@
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from typing import Any, Callable
+import service
+from course_search import search_courses
+from db import ConnectionManager
+from Student import Student
+from user_profile import find_login, load_profile
+
+# Runs of every benchmark, each on another sampled user or query
+RUNS: int = 200
+
+# Slowdown against the compared run that counts as a regression
+REGRESSION_THRESHOLD: float = 0.2
+
+SEARCH_QUERIES: list[str] = ["zo", "ge", "bio", "zoology", "programming", "marine bio", "advanced gen",
+                             "topics in data", "information sys", "intro"]
+
+
+# Time a function over the given arguments, returns the timings in milliseconds
+def time_calls(function: Callable[[Any], Any], arguments: list[Any]) -> list[float]:
+    timings: list[float] = []
+    for argument in arguments:
+        start: float = time.perf_counter()
+        function(argument)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings: list[float]) -> dict[str, float]:
+    ordered: list[float] = sorted(timings)
+    return {"runs": len(ordered), "mean_ms": statistics.fmean(ordered), "min_ms": ordered[0],
+            "p50_ms": ordered[len(ordered) // 2], "p95_ms": ordered[int(len(ordered) * 0.95) - 1 or 0]}
+
+
+# Login without bcrypt: the login row and the profile, like check_login after the password check
+def load_login(email: str) -> None:
+    cur = service.db_manager.connection().cursor()
+    load_profile(cur, find_login(cur, email), service.catalog().degree_names())
+
+
+# Data prep of the grades page: the grade for every course and the grade summary
+def prepare_grades(student: Student) -> None:
+    for course in student.courses:
+        student.grade_for(course.id)
+    student.grades = student.grades
+
+
+# Run the benchmarks on the database at path, service.db_manager points at it for the run and is restored after
+def run(path: str, runs: int, seed: int) -> dict[str, Any]:
+    previous_manager: ConnectionManager = service.db_manager
+    service.db_manager = ConnectionManager(path)
+    try:
+        return run_benchmarks(runs, seed)
+    finally:
+        service.db_manager.close_all()
+        service.db_manager = previous_manager
+
+
+def run_benchmarks(runs: int, seed: int) -> dict[str, Any]:
+    # Databases generated by an older version are upgraded first
+    service.create_database()
+    conn: sqlite3.Connection = service.db_manager.connection()
+    rng = random.Random(seed)
+
+    # Sample the users to log in as, the same sample for every benchmark and every run
+    students: list[tuple[int, str]] = conn.execute("SELECT Id, Email FROM User WHERE Account = 1").fetchall()
+    sample: list[tuple[int, str]] = rng.sample(students, min(runs, len(students)))
+    loaded: list[Student] = []
+    for _, email in sample:
+        cur = conn.cursor()
+        loaded.append(load_profile(cur, find_login(cur, email), service.catalog().degree_names()))
+
+    dataset: dict[str, int] = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                               for table in ("User", "Course", "CourseEnrollments", "Grade", "Degrees")}
+
+    benchmarks: dict[str, tuple[Callable[[Any], Any], list[Any]]] = {
+        "check_login_without_bcrypt": (load_login, [email for _, email in sample]),
+        "get_all_courses": (lambda _: service.get_all_courses(), list(range(max(runs // 20, 5)))),
+        "get_all_courses_for_degree": (service.get_all_courses_for_degree, [user_id for user_id, _ in sample]),
+        "search_courses": (lambda query: search_courses(conn, query),
+                           [SEARCH_QUERIES[number % len(SEARCH_QUERIES)] for number in range(runs)]),
+        "grades_page_prep": (prepare_grades, loaded),
+    }
+
+    results: dict[str, dict[str, float]] = {}
+    for name, (function, arguments) in benchmarks.items():
+        # One untimed call to warm the page cache and the statement cache
+        function(arguments[0])
+        results[name] = summarize(time_calls(function, arguments))
+
+    return {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version, "dataset": dataset, "results": results}
+
+
+# Print every benchmark against a previous run, returns the names of the benchmarks that got slower
+def compare(current: dict[str, Any], previous: dict[str, Any]) -> list[str]:
+    regressions: list[str] = []
+    print(f"{'benchmark':<30}{'p50 ms':>10}{'before':>10}{'change':>10}")
+    for name, result in current["results"].items():
+        before: dict[str, float] = previous["results"].get(name)
+        if before is None:
+            print(f"{name:<30}{result['p50_ms']:>10.3f}{'-':>10}{'-':>10}")
+            continue
+        change: float = result["p50_ms"] / before["p50_ms"] - 1 if before["p50_ms"] else 0.0
+        print(f"{name:<30}{result['p50_ms']:>10.3f}{before['p50_ms']:>10.3f}{change:>+10.0%}")
+        if change > REGRESSION_THRESHOLD:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the data layer on a generated database")
+    parser.add_argument("path", help="database made with generate_dataset.py")
+    parser.add_argument("--output", default="bench_results.json", help="JSON file for the results")
+    parser.add_argument("--compare", help="results of an earlier run, exits with 1 on a regression")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    results = run(args.path, args.runs, args.seed)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file))
+        if regressions:
+            print(f"Slower by more than {REGRESSION_THRESHOLD:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+    else:
+        print(f"{'benchmark':<30}{'p50 ms':>10}{'p95 ms':>10}")
+        for name, result in results["results"].items():
+            print(f"{name:<30}{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
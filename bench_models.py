@@ -0,0 +1,115 @@
+import timeit
+import tracemalloc
+from typing import Callable
+from Course import Course
+from Grade import Grade
+
+# Number of objects created for the memory benchmark, about a full catalog with a cohort's grades
+OBJECT_COUNT: int = 100_000
+
+
+# Course and Grade as they were before the slotted model, with a property per field
+class PropertyCourse:
+    def __init__(self, id: int, name: str, passing_grade: int, active_status: int, credits: int = 10):
+        self.id: int = id
+        self.name: str = name
+        self.passing_grade: int = passing_grade
+        self.active_status: int = active_status
+        self.credits: int = credits
+
+    @property
+    def id(self) -> int:
+        return self._id
+
+    @id.setter
+    def id(self, id: int) -> None:
+        self._id: int = id
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @name.setter
+    def name(self, name: str) -> None:
+        self._name: str = name
+
+    @property
+    def passing_grade(self) -> int:
+        return self._passing_grade
+
+    @passing_grade.setter
+    def passing_grade(self, passing_grade: int) -> None:
+        self._passing_grade: int = passing_grade
+
+    @property
+    def active_status(self) -> int:
+        return self._active_status
+
+    @active_status.setter
+    def active_status(self, active_status: int) -> None:
+        self._active_status: int = active_status
+
+    @property
+    def credits(self) -> int:
+        return self._credits
+
+    @credits.setter
+    def credits(self, credits: int) -> None:
+        self._credits: int = credits
+
+
+class PropertyGrade:
+    def __init__(self, course: PropertyCourse, grades: int):
+        self.course: PropertyCourse = course
+        self.grades: int = grades
+
+    @property
+    def course(self) -> PropertyCourse:
+        return self._course
+
+    @course.setter
+    def course(self, course: PropertyCourse) -> None:
+        self._course: PropertyCourse = course
+
+    @property
+    def grades(self) -> int:
+        return self._grades
+
+    @grades.setter
+    def grades(self, grades: int) -> None:
+        self._grades: int = grades
+
+
+# Bytes allocated for OBJECT_COUNT courses with one grade each
+def measure_memory(course_class: Callable, grade_class: Callable) -> int:
+    tracemalloc.start()
+    objects: list = [grade_class(course_class(i, "Course", 50, 1), 70) for i in range(OBJECT_COUNT)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+# Seconds for a million reads of grade.course.passing_grade and grade.grades
+def measure_access(course_class: Callable, grade_class: Callable) -> float:
+    grade = grade_class(course_class(1, "Course", 50, 1), 70)
+    return min(timeit.repeat(lambda: grade.grades >= grade.course.passing_grade, number=1_000_000, repeat=5))
+
+
+def main() -> None:
+    results: dict[str, tuple[int, float]] = {
+        "property": (measure_memory(PropertyCourse, PropertyGrade), measure_access(PropertyCourse, PropertyGrade)),
+        "slots": (measure_memory(Course, Grade), measure_access(Course, Grade)),
+    }
+
+    print(f"{'model':<10}{'memory (MB)':>14}{'access (s/1M)':>16}")
+    for model, (size, seconds) in results.items():
+        print(f"{model:<10}{size / 1_000_000:>14.1f}{seconds:>16.3f}")
+
+    memory_saved: float = 1 - results["slots"][0] / results["property"][0]
+    speedup: float = results["property"][1] / results["slots"][1]
+    print(f"Memory saved: {memory_saved:.0%}, attribute access speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
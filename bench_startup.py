@@ -0,0 +1,133 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+
+# Folder of the portal modules, the measured interpreters run from here
+PROJECT_DIR: str = os.path.dirname(os.path.abspath(__file__))
+
+# Milliseconds "import project" may take, and the launch up to the painted main frame
+IMPORT_BUDGET_MS: float = 300
+FRAME_BUDGET_MS: float = 1500
+
+# Modules only needed after the first click, importing project must not load them
+DEFERRED_MODULES: tuple[str, ...] = ("validator_collection", "jsonschema", "bcrypt", "concurrent.futures",
+                                     "write_queue")
+
+# Launches per measurement, the fastest one counts so other work on the machine does not fail the budget
+RUNS: int = 5
+
+# Opens the window like project.main() and exits once the main frame is painted
+FIRST_FRAME_CODE: str = ("import project\nproject.open_window()\nproject.window.update()\n" +
+                         "print('painted', flush=True)\n")
+
+# Messages of the TclError raised by Tk when there is no display to open a window on
+NO_DISPLAY_ERRORS: tuple[str, ...] = ("no display name", "couldn't connect to display")
+
+
+# True when a failed launch failed only because no window can be opened
+def is_no_display(stderr: str) -> bool:
+    return "TclError" in stderr and any(message in stderr for message in NO_DISPLAY_ERRORS)
+
+
+# Environment of the measured interpreters: compiled modules are cached in the given folder, even where
+# PYTHONDONTWRITEBYTECODE is set, so every launch after the first one starts like an installed portal
+def environment(cache_folder: str) -> dict[str, str]:
+    variables: dict[str, str] = {name: value for name, value in os.environ.items()
+                                 if name != "PYTHONDONTWRITEBYTECODE"}
+    return {**variables, "PYTHONPATH": PROJECT_DIR, "PYTHONPYCACHEPREFIX": cache_folder}
+
+
+# Parse the report of python -X importtime into the self and cumulative microseconds per module
+def parse_importtime(report: str) -> dict[str, tuple[int, int]]:
+    times: dict[str, tuple[int, int]] = {}
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():
+            times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+# Import a module in a new interpreter with -X importtime, returns the times of the fastest of the runs
+# (after one more run that compiles the modules)
+def import_times(module: str = "project", runs: int = RUNS) -> dict[str, tuple[int, int]]:
+    fastest: dict[str, tuple[int, int]] = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for _ in range(runs + 1):
+            result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                    cwd=PROJECT_DIR, env=environment(folder), capture_output=True, text=True,
+                                    check=True)
+            times: dict[str, tuple[int, int]] = parse_importtime(result.stderr)
+            if not fastest or times[module][1] < fastest[module][1]:
+                fastest = times
+    return fastest
+
+
+# Modules loaded by importing a module in a new interpreter
+def loaded_modules(module: str = "project") -> set[str]:
+    result = subprocess.run([sys.executable, "-c", f"import sys, {module}\nprint(' '.join(sys.modules))"],
+                            cwd=PROJECT_DIR, capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+# Milliseconds from launching the portal to its painted main frame, the fastest of the runs
+# Runs on a database in a temporary folder, made by a first launch that is not counted (and compiles the modules)
+# Returns None when no window can be opened, like on a machine without a display, any other failed launch
+# raises RuntimeError with its error output
+def time_to_first_frame(runs: int = RUNS) -> Optional[float]:
+    timings: list[float] = []
+    with tempfile.TemporaryDirectory() as folder:
+        for _ in range(runs + 1):
+            start: float = time.perf_counter()
+            result = subprocess.run([sys.executable, "-c", FIRST_FRAME_CODE], cwd=folder, env=environment(folder),
+                                    capture_output=True, text=True)
+            if result.returncode != 0 and is_no_display(result.stderr):
+                return None
+            if result.returncode != 0 or "painted" not in result.stdout:
+                raise RuntimeError(f"Launching the portal failed:\n{result.stderr}")
+            timings.append((time.perf_counter() - start) * 1000)
+    return min(timings[1:])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the start-up time of the portal")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--check", action="store_true", help="exit with 1 when a budget is exceeded")
+    args = parser.parse_args()
+
+    times = import_times("project", args.runs)
+    import_ms: float = times["project"][1] / 1000
+    print(f"{'module':<40}{'self ms':>10}{'total ms':>10}")
+    for name, (self_us, cumulative_us) in sorted(times.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"{name:<40}{self_us / 1000:>10.1f}{cumulative_us / 1000:>10.1f}")
+
+    failures: list[str] = []
+    print(f"import project: {import_ms:.1f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)")
+    if import_ms > IMPORT_BUDGET_MS:
+        failures.append("import time")
+    deferred: list[str] = sorted(set(DEFERRED_MODULES) & loaded_modules("project"))
+    if deferred:
+        print(f"Imported on start-up: {', '.join(deferred)}")
+        failures.append("deferred modules")
+
+    frame_ms: Optional[float] = time_to_first_frame(args.runs)
+    if frame_ms is None:
+        print("Time to first frame: no window could be opened (no display?)")
+    else:
+        print(f"Time to first frame: {frame_ms:.1f} ms (budget {FRAME_BUDGET_MS:.0f} ms)")
+        if frame_ms > FRAME_BUDGET_MS:
+            failures.append("time to first frame")
+
+    if args.check and failures:
+        print(f"Over budget: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
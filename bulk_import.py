@@ -0,0 +1,252 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import sqlite3
+import time
+from contextlib import nullcontext
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, Optional
+import bcrypt
+import service
+from password_policy import policy
+
+# Rows written per transaction
+CHUNK_SIZE: int = 1000
+
+# Emails per lookup of existing users, far below the 32766 variables SQLite allows in one statement
+EMAIL_LOOKUP_SIZE: int = 1000
+
+# Domain of the university email, same as the CreateUniEmail trigger
+UNI_EMAIL_DOMAIN: str = "@idkUniversity.com"
+
+# Account type of imported users, same as the AssignUser trigger
+STUDENT_ACCOUNT: int = 1
+
+# Columns every input row must have, per kind of import
+COLUMNS: dict[str, tuple[str, ...]] = {
+    "students": ("first_name", "surname", "birthdate", "email", "password"),
+    "courses": ("name", "passing_grade", "active", "credits"),
+    "enrollments": ("user_id", "course_id", "start_date", "assigned"),
+}
+
+
+# Problem with one input row, the row is skipped and the import goes on
+class RowError:
+    __slots__ = ("line", "message")
+
+    def __init__(self, line: int, message: str) -> None:
+        self.line: int = line
+        self.message: str = message
+
+    def __str__(self) -> str:
+        return f"Line {self.line}: {self.message}"
+
+
+# Outcome of an import
+class ImportReport:
+    def __init__(self) -> None:
+        self.rows_read: int = 0
+        self.rows_imported: int = 0
+        self.errors: list[RowError] = []
+        self.seconds: float = 0.0
+
+    def __str__(self) -> str:
+        return (f"Imported {self.rows_imported} of {self.rows_read} rows in {self.seconds:.2f} s "
+                f"({self.rows_per_second:.0f} rows/sec), {len(self.errors)} errors")
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_imported / self.seconds if self.seconds else 0.0
+
+
+# Stream the rows of a CSV file (with a header) or a JSONL file as (line number, row) pairs
+def read_rows(path: str) -> Iterator[tuple[int, dict[str, Any]]]:
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.endswith(".jsonl"):
+            for line, text in enumerate(file, start=1):
+                if text.strip():
+                    yield line, json.loads(text)
+        else:
+            # Line 1 is the header
+            for line, row in enumerate(csv.DictReader(file), start=2):
+                yield line, row
+
+
+# Hash one password, runs in a worker process
+def hash_password(password: str, rounds: int) -> bytes:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds))
+
+
+# Check a student row and return the values to insert (with the plain password), raises ValueError when invalid
+def parse_student(row: dict[str, Any]) -> tuple:
+    first_name, surname = str(row["first_name"]).strip(), str(row["surname"]).strip()
+    birthdate, email = str(row["birthdate"]).strip(), str(row["email"]).strip()
+    password = str(row["password"])
+    if not first_name.isalpha() or not surname.isalpha():
+        raise ValueError("Missing name")
+    if not service.validate_date(birthdate):
+        raise ValueError("Incorrect date/format")
+    if not service.validate_email(email):
+        raise ValueError("Invalid email")
+    if password == "":
+        raise ValueError("Missing password")
+    return first_name, surname, birthdate, email, password
+
+
+def parse_course(row: dict[str, Any]) -> tuple:
+    name = str(row["name"]).strip()
+    if name == "":
+        raise ValueError("Missing course name")
+    passing_grade, active, credits = int(row["passing_grade"]), int(row["active"]), int(row["credits"])
+    if not 0 <= passing_grade <= 100:
+        raise ValueError("Passing grade must be between 0 and 100")
+    return name, passing_grade, active, credits
+
+
+def parse_enrollment(row: dict[str, Any]) -> tuple:
+    start_date = str(row["start_date"]).strip()
+    if not service.validate_date(start_date):
+        raise ValueError("Incorrect date/format")
+    return int(row["user_id"]), int(row["course_id"]), start_date, int(row["assigned"])
+
+
+# Insert the rows of one chunk with one executemany, if a row breaks a constraint the chunk is
+# inserted again row by row inside the same transaction to find and skip the bad rows
+def insert_chunk(cur: sqlite3.Cursor, sql: str, rows: list[tuple[int, tuple]], report: ImportReport) -> None:
+    cur.execute("SAVEPOINT chunk")
+    try:
+        cur.executemany(sql, [values for _, values in rows])
+        cur.execute("RELEASE chunk")
+        report.rows_imported += len(rows)
+        return
+    except sqlite3.IntegrityError:
+        cur.execute("ROLLBACK TO chunk")
+        cur.execute("RELEASE chunk")
+
+    for line, values in rows:
+        try:
+            cur.execute(sql, values)
+            report.rows_imported += 1
+        except sqlite3.IntegrityError as error:
+            report.errors.append(RowError(line, str(error)))
+
+
+# Validate a chunk of rows, invalid rows are reported and left out
+def parse_chunk(chunk: list[tuple[int, dict[str, Any]]], parse: Callable[[dict[str, Any]], tuple],
+                columns: tuple[str, ...], report: ImportReport) -> list[tuple[int, tuple]]:
+    parsed: list[tuple[int, tuple]] = []
+    for line, row in chunk:
+        report.rows_read += 1
+        missing: list[str] = [column for column in columns if row.get(column) is None]
+        if missing:
+            report.errors.append(RowError(line, f"Missing column {', '.join(missing)}"))
+            continue
+        try:
+            parsed.append((line, parse(row)))
+        except (ValueError, TypeError) as error:
+            report.errors.append(RowError(line, str(error)))
+    return parsed
+
+
+# Import students: duplicates are dropped before hashing, the passwords of a chunk are hashed in
+# parallel, and the university email and account type are part of the insert, so the user triggers
+# have nothing to do
+def import_students(conn: sqlite3.Connection, rows: list[tuple[int, tuple]], pool: Executor,
+                    seen_emails: set[str], report: ImportReport) -> None:
+    cur = conn.cursor()
+    emails: list[str] = [values[3] for _, values in rows]
+    for start in range(0, len(emails), EMAIL_LOOKUP_SIZE):
+        lookup: list[str] = emails[start:start + EMAIL_LOOKUP_SIZE]
+        cur.execute(f"SELECT Email FROM User WHERE Email IN ({', '.join('?' * len(lookup))})", lookup)
+        seen_emails.update(row[0] for row in cur.fetchall())
+
+    new_rows: list[tuple[int, tuple]] = []
+    for line, values in rows:
+        if values[3] in seen_emails:
+            report.errors.append(RowError(line, f"Email {values[3]} already exists"))
+        else:
+            seen_emails.add(values[3])
+            new_rows.append((line, values))
+
+    hashes: list[bytes] = list(pool.map(hash_password, [values[4] for _, values in new_rows],
+                                        itertools.repeat(policy.rounds), chunksize=16))
+
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        # Hand out the ids here, so the university email can be written with the row
+        cur.execute("SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'User'), 0), " +
+                    "COALESCE((SELECT MAX(Id) FROM User), 0))")
+        next_id: int = cur.fetchone()[0] + 1
+        users: list[tuple[int, tuple]] = []
+        for (line, values), hash_pass in zip(new_rows, hashes):
+            users.append((line, (next_id, values[0], values[1], values[2], values[3],
+                                 f"{next_id}{UNI_EMAIL_DOMAIN}", hash_pass, STUDENT_ACCOUNT)))
+            next_id += 1
+        insert_chunk(cur, "INSERT INTO User VALUES (?, ?, ?, ?, ?, ?, ?, ?)", users, report)
+        conn.commit()
+    except BaseException:
+        # The connection is shared by the thread, an open write transaction would lock out every other writer
+        conn.rollback()
+        raise
+
+
+# Import a CSV or JSONL file of students, courses or enrollments in chunked transactions
+# Rows that fail validation or a constraint are reported and skipped without aborting the import
+def import_file(path: str, kind: str, chunk_size: int = CHUNK_SIZE, workers: Optional[int] = None) -> ImportReport:
+    parsers: dict[str, Callable[[dict[str, Any]], tuple]] = {
+        "students": parse_student, "courses": parse_course, "enrollments": parse_enrollment}
+    statements: dict[str, str] = {
+        "courses": "INSERT INTO Course (CourseName, PassingGrade, Active, Credits) VALUES (?, ?, ?, ?)",
+        "enrollments": "INSERT INTO CourseEnrollments VALUES (?, ?, ?, ?)"}
+    if kind not in parsers:
+        raise ValueError(f"Unknown import kind {kind}, use one of {', '.join(parsers)}")
+
+    report = ImportReport()
+    start: float = time.perf_counter()
+    conn = service.db_manager.connection()
+    seen_emails: set[str] = set()
+    rows: Iterable[tuple[int, dict[str, Any]]] = read_rows(path)
+
+    # Only students have passwords to hash, the other kinds start no worker processes
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) if kind == "students" else nullcontext() as pool:
+        while chunk := list(itertools.islice(rows, chunk_size)):
+            parsed = parse_chunk(chunk, parsers[kind], COLUMNS[kind], report)
+            if not parsed:
+                continue
+            if kind == "students":
+                import_students(conn, parsed, pool, seen_emails, report)
+            else:
+                cur = conn.cursor()
+                cur.execute("BEGIN IMMEDIATE")
+                try:
+                    insert_chunk(cur, statements[kind], parsed, report)
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import students, courses or enrollments from CSV or JSONL",
+                                     epilog="Columns: " + "; ".join(f"{kind}: {', '.join(columns)}"
+                                                                    for kind, columns in COLUMNS.items()))
+    parser.add_argument("kind", choices=sorted(COLUMNS), help="what the file contains")
+    parser.add_argument("path", help="CSV file with a header row, or a JSONL file with one object per line")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows per transaction")
+    parser.add_argument("--workers", type=int, default=None, help="processes for password hashing")
+    args = parser.parse_args()
+
+    service.create_database()
+    report = import_file(args.path, args.kind, args.chunk_size, args.workers)
+    for error in report.errors:
+        print(error)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import sqlite3
+import threading
+from typing import Optional
+from Course import Course
+from db import ConnectionManager
+
+COURSE_COLUMNS: str = "c.CourseId, c.CourseName, c.PassingGrade, c.Active, c.Credits"
+
+# Single row lookup that tells if the catalog changed since it was loaded
+VERSION_QUERY: str = "SELECT Version FROM CatalogVersion WHERE Id = 1"
+
+# Every course connected to a degree, in the order get_all_courses_for_degree returns them
+DEGREE_COURSES_QUERY: str = ("SELECT x.BaseId, x.DegreeBNId, x.TypeId, x.CourseId FROM Connection AS x " +
+                             "ORDER BY x.BaseId, x.DegreeBNId, x.TypeId, x.CourseId")
+
+# Full name of every degree, like "Bachelors of Science Zoology"
+DEGREE_NAMES_QUERY: str = ("SELECT d.BaseId, d.DegreeBNId, d.TypeId, b.BaseName, bn.DegreeBName, t.TypeName " +
+                           "FROM Degrees AS d " +
+                           "JOIN DegreeBase AS b ON b.BaseId = d.BaseId " +
+                           "JOIN DegreeBaseName AS bn ON bn.DegreeBNId = d.DegreeBNId " +
+                           "JOIN DegreeType AS t ON t.TypeId = d.TypeId")
+
+
+# Courses, degree courses and degree names of one database, kept in memory for the whole process
+# The catalog tables almost never change, so every read only checks the catalog version (kept up to date
+# by triggers, see migrations.add_catalog_version) and reloads everything when it moved
+# The Course objects are shared by every caller and must not be changed
+class CatalogCache:
+    def __init__(self, manager: ConnectionManager) -> None:
+        self.manager: ConnectionManager = manager
+        self.loads: int = 0
+        self.hits: int = 0
+        self._version: Optional[int] = None
+        self._courses: list[Course] = []
+        self._courses_by_degree: dict[tuple[int, int, int], list[Course]] = {}
+        self._degree_names: dict[tuple[int, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    def __str__(self) -> str:
+        return f"Catalog version: {self._version}, Loads: {self.loads}, Hits: {self.hits}"
+
+    # Every course, in the order of the Course table
+    def courses(self) -> list[Course]:
+        self._refresh()
+        return list(self._courses)
+
+    # The courses connected to a degree given as (BaseId, DegreeBNId, TypeId)
+    def courses_for_degree(self, degree: tuple[int, int, int]) -> list[Course]:
+        self._refresh()
+        return list(self._courses_by_degree.get(tuple(degree), ()))
+
+    # Full names of all degrees by (BaseId, DegreeBNId, TypeId)
+    def degree_names(self) -> dict[tuple[int, int, int], str]:
+        self._refresh()
+        return self._degree_names
+
+    # Drop the loaded catalog, the next read loads it again
+    def clear(self) -> None:
+        with self._lock:
+            self._version = None
+
+    def _refresh(self) -> None:
+        conn = self.manager.connection()
+        version: int = conn.execute(VERSION_QUERY).fetchone()[0]
+        if version == self._version:
+            self.hits += 1
+            return
+        with self._lock:
+            # Another thread may have loaded it while this one waited for the lock
+            if version != self._version:
+                self._load(conn)
+
+    # Read the version and all catalog tables in one read transaction, so they come from the same snapshot
+    def _load(self, conn: sqlite3.Connection) -> None:
+        own_transaction: bool = not conn.in_transaction
+        if own_transaction:
+            conn.execute("BEGIN")
+        try:
+            version: int = conn.execute(VERSION_QUERY).fetchone()[0]
+            courses: list[Course] = [Course(row[0], row[1], row[2], row[3], row[4])
+                                     for row in conn.execute(f"SELECT {COURSE_COLUMNS} FROM Course AS c")]
+            by_id: dict[int, Course] = {course.id: course for course in courses}
+
+            courses_by_degree: dict[tuple[int, int, int], list[Course]] = {}
+            for base_id, base_name_id, type_id, course_id in conn.execute(DEGREE_COURSES_QUERY):
+                # Like the join it replaces, connections to a missing course are left out
+                if course_id in by_id:
+                    courses_by_degree.setdefault((base_id, base_name_id, type_id), []).append(by_id[course_id])
+
+            degree_names: dict[tuple[int, int, int], str] = {
+                (row[0], row[1], row[2]): f"{row[3]} of {row[4]} {row[5]}" for row in conn.execute(DEGREE_NAMES_QUERY)}
+        finally:
+            if own_transaction:
+                conn.commit()
+
+        self._courses, self._courses_by_degree, self._degree_names = courses, courses_by_degree, degree_names
+        self._version = version
+        self.loads += 1
@@ -0,0 +1,80 @@
+from collections.abc import Iterator, Sequence
+from typing import Callable, Optional, Union
+from Course import Course
+
+# Defining list of filter options for courses
+FILTER_OPTIONS: list[str] = ["", "All courses", "Courses for degree", "Courses I am taking"]
+
+
+# Read-only view over a list of courses
+# The view shares the list and the Course objects with its source, so creating one costs the same
+# for any list size, and the display code can not change the source through it
+class CourseView(Sequence):
+    __slots__ = ("_courses",)
+
+    def __init__(self, courses: Sequence[Course] = ()) -> None:
+        self._courses: Sequence[Course] = courses
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Course, "CourseView"]:
+        if isinstance(index, slice):
+            return CourseView(self._courses[index])
+        return self._courses[index]
+
+    def __len__(self) -> int:
+        return len(self._courses)
+
+    def __iter__(self) -> Iterator[Course]:
+        return iter(self._courses)
+
+    def __str__(self) -> str:
+        return f"Courses: {len(self._courses)}"
+
+
+# Read-only view that reads its courses page by page with a keyset fetch function, like
+# service.list_courses_page, which returns a page of courses and the key of the next page
+# Only the first page is read up front, load_more reads the next one when the list is scrolled to the end
+class CoursePager(CourseView):
+    __slots__ = ("_fetch", "_next_key", "_done")
+
+    def __init__(self, fetch: Callable[[Optional[tuple]], tuple[list[Course], Optional[tuple]]]) -> None:
+        super().__init__([])
+        self._fetch: Callable[[Optional[tuple]], tuple[list[Course], Optional[tuple]]] = fetch
+        self._next_key: Optional[tuple] = None
+        self._done: bool = False
+        self.load_more()
+
+    def __str__(self) -> str:
+        return f"Courses: {len(self._courses)}{'' if self._done else ' and more'}"
+
+    # True once the last page is read
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    # Read the next page, returns False when there was nothing left to read
+    def load_more(self) -> bool:
+        if self._done:
+            return False
+        courses, self._next_key = self._fetch(self._next_key)
+        self._courses.extend(courses)
+        self._done = self._next_key is None
+        return bool(courses)
+
+
+# Return a view over the courses, views are returned as they are so a pager keeps paging
+def as_view(courses: Sequence[Course]) -> CourseView:
+    return courses if isinstance(courses, CourseView) else CourseView(courses)
+
+
+# Return the view of the courses for a filter option, an empty view for any other option
+def filter_view(option: str, all_courses: Sequence[Course], degree_courses: Sequence[Course],
+                user_courses: Sequence[Course]) -> CourseView:
+    match option:
+        case "All courses":
+            return as_view(all_courses)
+        case "Courses for degree":
+            return as_view(degree_courses)
+        case "Courses I am taking":
+            return as_view(user_courses)
+        case _:
+            return CourseView()
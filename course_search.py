@@ -0,0 +1,54 @@
+import sqlite3
+from Course import Course
+
+# Maximum number of courses returned by a search
+SEARCH_LIMIT: int = 100
+
+# Shortest word the trigram index can match
+MIN_INDEXED_LENGTH: int = 3
+
+COURSE_COLUMNS: str = "c.CourseId, c.CourseName, c.PassingGrade, c.Active, c.Credits"
+
+
+# Escape the LIKE wildcards in user input, so "%" and "_" only match themselves
+def like_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# Quote a word as an FTS5 string, so operators and punctuation in user input are matched literally
+def fts_quote(word: str) -> str:
+    return '"' + word.replace('"', '""') + '"'
+
+
+# Search courses by name, matching every word of the text anywhere in the name, case insensitive
+# Names that start with the text come first, then the best full text matches
+def search_courses(conn: sqlite3.Connection, text: str, limit: int = SEARCH_LIMIT) -> list[Course]:
+    words: list[str] = text.split()
+    if not words:
+        return []
+
+    phrase: str = " ".join(words)
+    long_words: list[str] = [word for word in words if len(word) >= MIN_INDEXED_LENGTH]
+    short_words: list[str] = [word for word in words if len(word) < MIN_INDEXED_LENGTH]
+    cur = conn.cursor()
+
+    if long_words:
+        # Words the index can not match are checked on the names the index found
+        short_filter: str = "".join(" AND c.CourseName LIKE ? ESCAPE '\\'" for _ in short_words)
+        cur.execute(f"SELECT {COURSE_COLUMNS} FROM CourseSearch JOIN Course AS c ON c.CourseId = CourseSearch.rowid " +
+                    f"WHERE CourseSearch MATCH ?{short_filter} " +
+                    "ORDER BY c.CourseName LIKE ? ESCAPE '\\' DESC, CourseSearch.rank, c.CourseName, c.CourseId " +
+                    "LIMIT ?",
+                    (" AND ".join(fts_quote(word) for word in long_words),
+                     *(f"%{like_escape(word)}%" for word in short_words),
+                     f"{like_escape(phrase)}%", limit))
+    else:
+        # Only a few characters typed, look up the names starting with them as a range on the name index
+        lower: str = phrase.lower()
+        upper: str = lower[:-1] + chr(ord(lower[-1]) + 1)
+        cur.execute(f"SELECT {COURSE_COLUMNS} FROM Course AS c " +
+                    "WHERE c.CourseName COLLATE NOCASE >= ? AND c.CourseName COLLATE NOCASE < ? " +
+                    "ORDER BY c.CourseName COLLATE NOCASE, c.CourseId LIMIT ?",
+                    (lower, upper, limit))
+
+    return [Course(row[0], row[1], row[2], row[3], row[4]) for row in cur.fetchall()]
@@ -0,0 +1,131 @@
+import sqlite3
+import threading
+from typing import Optional, Union
+import query_trace
+
+# Pragmas applied to every new connection
+# WAL lets readers run next to a writer, NORMAL sync is safe in WAL mode, a negative cache_size is in KiB
+DEFAULT_PRAGMAS: dict[str, Union[str, int]] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -16000,
+    "mmap_size": 134217728,
+    "busy_timeout": 5000,
+}
+
+# Number of compiled statements kept per connection
+DEFAULT_CACHED_STATEMENTS: int = 256
+
+
+# Cursor that counts the statements executed on its connection, and times them when tracing is on
+class CountingCursor(sqlite3.Cursor):
+    def execute(self, sql: str, parameters=()) -> sqlite3.Cursor:
+        self.connection.statements_executed += 1
+        if query_trace.tracer is None:
+            return super().execute(sql, parameters)
+        return query_trace.timed(query_trace.tracer, super().execute, sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters) -> sqlite3.Cursor:
+        self.connection.statements_executed += 1
+        if query_trace.tracer is None:
+            return super().executemany(sql, seq_of_parameters)
+        return query_trace.timed(query_trace.tracer, super().executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script: str) -> sqlite3.Cursor:
+        self.connection.statements_executed += 1
+        if query_trace.tracer is None:
+            return super().executescript(sql_script)
+        return query_trace.timed(query_trace.tracer, super().executescript, sql_script)
+
+
+# Connection that hands out counting cursors, also for the conn.execute shortcuts
+class ManagedConnection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.statements_executed: int = 0
+
+    def cursor(self, factory=None) -> sqlite3.Cursor:
+        return super().cursor(factory or CountingCursor)
+
+    # The built-in shortcuts create a plain cursor, so they go through cursor() explicitly
+    def execute(self, sql: str, parameters=()) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script: str) -> sqlite3.Cursor:
+        return self.cursor().executescript(sql_script)
+
+
+# Keeps one open connection per thread to the same database file, so every data function reuses
+# the file handle, the parsed schema and the compiled statements instead of reconnecting
+class ConnectionManager:
+    def __init__(self, path: str, pragmas: Optional[dict[str, Union[str, int]]] = None,
+                 cached_statements: int = DEFAULT_CACHED_STATEMENTS) -> None:
+        self.path: str = path
+        self.pragmas: dict[str, Union[str, int]] = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.cached_statements: int = cached_statements
+        self.connections_opened: int = 0
+        self._closed_statements: int = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[ManagedConnection] = []
+
+    def __str__(self) -> str:
+        return (f"Database: {self.path}, Connections opened: {self.connections_opened}, "
+                f"Statements executed: {self.statements_executed}")
+
+    # Total statements executed on all connections opened by this manager
+    @property
+    def statements_executed(self) -> int:
+        with self._lock:
+            return self._closed_statements + sum(conn.statements_executed for conn in self._connections)
+
+    # Return the connection of the calling thread, opening it on first use
+    def connection(self) -> ManagedConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+        return conn
+
+    def _open(self) -> ManagedConnection:
+        # check_same_thread is off so close_all can run from any thread,
+        # every connection is still only used by the thread that opened it
+        conn = sqlite3.connect(self.path, factory=ManagedConnection, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+
+        # Only count the statements run by the application
+        conn.statements_executed = 0
+
+        with self._lock:
+            self._connections.append(conn)
+            self.connections_opened += 1
+        return conn
+
+    # Return the counters, so the effect of reusing connections can be measured
+    def stats(self) -> dict[str, int]:
+        return {"connections_opened": self.connections_opened, "statements_executed": self.statements_executed}
+
+    # Close the connection of the calling thread
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            with self._lock:
+                self._connections.remove(conn)
+                self._closed_statements += conn.statements_executed
+            conn.close()
+
+    # Close the connections of all threads, the next call to connection() opens a new one
+    def close_all(self) -> None:
+        with self._lock:
+            connections = self._connections
+            self._connections = []
+            self._closed_statements += sum(conn.statements_executed for conn in connections)
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
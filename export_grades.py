@@ -0,0 +1,163 @@
+import argparse
+import csv
+import gzip
+import json
+import sqlite3
+import sys
+import time
+from typing import Any, Iterable, Iterator, Mapping, Optional, TextIO
+import service
+from db import ConnectionManager
+
+# Rows fetched from the cursor at a time, the export never holds more than this many rows
+BATCH_SIZE: int = 2000
+
+# Seconds between two progress lines
+PROGRESS_INTERVAL: float = 1.0
+
+FORMATS: tuple[str, ...] = ("csv", "jsonl")
+
+# Columns of the export, one row per course a student is assigned to
+COLUMNS: tuple[str, ...] = ("user_id", "first_name", "surname", "uni_email", "degree", "course_id", "course_name",
+                            "credits", "start_date", "grade", "passing_grade", "result")
+
+# Every course of every student with the grade (if any) and the first degree of the student, like at login
+# The rows come in the order of the enrollment index, so SQLite streams them without sorting
+EXPORT_QUERY: str = ("SELECT u.Id, u.FirstName, u.Surname, u.UniEmail, d.BaseId, d.DegreeBNId, d.TypeId, " +
+                     "c.CourseId, c.CourseName, c.Credits, e.StartDate, g.Grade, c.PassingGrade " +
+                     "FROM User AS u " +
+                     "JOIN CourseEnrollments AS e ON e.UserId = u.Id AND e.Assigned = 1 " +
+                     "JOIN Course AS c ON c.CourseId = e.CourseId " +
+                     "LEFT JOIN Grade AS g ON g.UserId = e.UserId AND g.CourseId = e.CourseId " +
+                     "LEFT JOIN Degree AS d ON d.UserId = u.Id AND (d.BaseId, d.DegreeBNId, d.TypeId) = " +
+                     "(SELECT BaseId, DegreeBNId, TypeId FROM Degree WHERE UserId = u.Id " +
+                     "ORDER BY BaseId, DegreeBNId, TypeId LIMIT 1) " +
+                     "WHERE u.Account = 1 " +
+                     "ORDER BY u.Id, e.CourseId, e.StartDate")
+
+COUNT_QUERY: str = ("SELECT COUNT(*) FROM CourseEnrollments AS e JOIN User AS u ON u.Id = e.UserId " +
+                    "WHERE e.Assigned = 1 AND u.Account = 1")
+
+
+# Stream the export rows from the cursor, a batch at a time
+def fetch_rows(cur: sqlite3.Cursor, batch_size: int = BATCH_SIZE) -> Iterator[tuple]:
+    cur.execute(EXPORT_QUERY)
+    while batch := cur.fetchmany(batch_size):
+        yield from batch
+
+
+# Turn the raw rows into export records, with the degree name from the catalog instead of joining the name tables
+def to_records(rows: Iterable[tuple], degree_names: Mapping[tuple[int, int, int], str]) -> Iterator[dict[str, Any]]:
+    for (user_id, first_name, surname, uni_email, base_id, base_name_id, type_id,
+         course_id, course_name, credits, start_date, grade, passing_grade) in rows:
+        result: str = "" if grade is None else "passed" if grade >= passing_grade else "failed"
+        yield {"user_id": user_id, "first_name": first_name, "surname": surname, "uni_email": uni_email,
+               "degree": degree_names.get((base_id, base_name_id, type_id), ""), "course_id": course_id,
+               "course_name": course_name, "credits": credits, "start_date": start_date, "grade": grade,
+               "passing_grade": passing_grade, "result": result}
+
+
+# Pass the records through and print the progress and throughput now and then
+class Progress:
+    def __init__(self, total: Optional[int] = None, output: TextIO = sys.stderr,
+                 interval: float = PROGRESS_INTERVAL) -> None:
+        self.total: Optional[int] = total
+        self.output: TextIO = output
+        self.interval: float = interval
+        self.count: int = 0
+        self.start: float = time.perf_counter()
+
+    def __str__(self) -> str:
+        done: str = f"{self.count}" if not self.total else f"{self.count}/{self.total} ({self.count / self.total:.0%})"
+        return f"Exported {done} rows in {self.seconds:.1f} s ({self.rows_per_second:.0f} rows/sec)"
+
+    @property
+    def seconds(self) -> float:
+        return time.perf_counter() - self.start
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.count / self.seconds if self.seconds else 0.0
+
+    def track(self, records: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        next_report: float = self.start + self.interval
+        for record in records:
+            self.count += 1
+            yield record
+            # Only look at the clock every thousand rows
+            if self.count % 1000 == 0 and time.perf_counter() >= next_report:
+                print(self, file=self.output)
+                next_report = time.perf_counter() + self.interval
+
+
+def write_csv(records: Iterable[dict[str, Any]], file: TextIO) -> None:
+    writer = csv.DictWriter(file, fieldnames=COLUMNS)
+    writer.writeheader()
+    writer.writerows(records)
+
+
+def write_jsonl(records: Iterable[dict[str, Any]], file: TextIO) -> None:
+    for record in records:
+        file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+# Open the output file, gzip compressed when asked or when the name ends in .gz
+def open_output(path: str, compress: bool) -> TextIO:
+    if compress or path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+# Format from the file name, like grades.csv or grades.jsonl.gz
+def format_for(path: str) -> str:
+    name: str = path[:-3] if path.endswith(".gz") else path
+    for file_format in FORMATS:
+        if name.endswith("." + file_format):
+            return file_format
+    raise ValueError(f"Can not tell the format of {path}, use a .csv or .jsonl name or pass --format")
+
+
+# Export the grades of every student to a CSV or JSONL file, streaming from the cursor to the file
+# The export reads one snapshot of the database, writers can go on while it runs (WAL)
+def export_grades(path: str, file_format: Optional[str] = None, compress: bool = False,
+                  batch_size: int = BATCH_SIZE, progress: Optional[Progress] = None) -> Progress:
+    file_format = file_format or format_for(path)
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format {file_format}, use one of {', '.join(FORMATS)}")
+
+    degree_names = service.catalog().degree_names()
+    conn = service.db_manager.connection()
+    cur = conn.cursor()
+    cur.execute("BEGIN")
+    try:
+        if progress is None:
+            cur.execute(COUNT_QUERY)
+            progress = Progress(cur.fetchone()[0])
+        records = progress.track(to_records(fetch_rows(cur, batch_size), degree_names))
+        with open_output(path, compress) as file:
+            (write_csv if file_format == "csv" else write_jsonl)(records, file)
+    finally:
+        conn.commit()
+    return progress
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the courses and grades of every student")
+    parser.add_argument("path", help="output file, like grades.csv, grades.jsonl or grades.csv.gz")
+    parser.add_argument("--format", choices=FORMATS, help="output format, taken from the file name by default")
+    parser.add_argument("--gzip", action="store_true", help="compress the output with gzip")
+    parser.add_argument("--db", default=service.DBFILE, help="database file (default roll_call.db)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows fetched at a time")
+    args = parser.parse_args()
+
+    service.db_manager = ConnectionManager(args.db)
+    service.create_database()
+    try:
+        progress = export_grades(args.path, args.format, args.gzip, args.batch_size)
+    except ValueError as error:
+        parser.error(str(error))
+    print(progress)
+
+
+if __name__ == "__main__":
+    main()
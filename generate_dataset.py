@@ -0,0 +1,164 @@
+import argparse
+import itertools
+import os
+import random
+import sqlite3
+import time
+from typing import Iterator
+import bcrypt
+from bulk_import import UNI_EMAIL_DOMAIN
+from migrations import migrate
+
+# Password of every generated user, hashed once with the lowest work factor
+PASSWORD: bytes = b"DFq398g9&Ddgs"
+
+# Rows per executemany batch
+BATCH_SIZE: int = 50_000
+
+# Share of users that are teachers and admins, the rest are students
+TEACHER_SHARE: float = 0.01
+ADMIN_SHARE: float = 0.001
+
+# Share of enrollments still waiting for approval, and share of approved ones with a grade
+PENDING_SHARE: float = 0.05
+GRADED_SHARE: float = 0.8
+
+# Share of a student's courses taken from the courses of their degree
+DEGREE_COURSE_SHARE: float = 0.8
+
+SUBJECTS: list[str] = ["Zoology", "Botany", "Genetics", "Ecology", "Physics", "Chemistry", "Mathematics",
+                       "Statistics", "Geography", "Entomology", "Programming", "Databases", "Networks", "History",
+                       "Economics", "Philosophy", "Linguistics", "Marine Biology", "Wildlife Management",
+                       "Information Systems"]
+LEVELS: list[str] = ["Introduction to", "Advanced", "Applied", "Topics in", "Seminar in", "Methods of",
+                     "Foundations of", "Research in"]
+
+
+# Yield the items of an iterator in lists of at most size items
+def batches(items: Iterator, size: int = BATCH_SIZE) -> Iterator[list]:
+    while batch := list(itertools.islice(items, size)):
+        yield batch
+
+
+# Weights of a skewed distribution, a few degrees and courses are far more popular than the rest
+def popularity(count: int) -> list[float]:
+    return [1 / (rank + 1) ** 0.8 for rank in range(count)]
+
+
+# Build a database with the given number of users, courses and enrollments per student
+# Degrees, degree courses and enrollments follow skewed popularity, like a real university
+def generate(path: str, users: int, courses: int, enrollments_per_student: int, degree_types: int,
+             seed: int) -> dict[str, int]:
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    # Loading throw-away data, durability does not matter
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    migrate(conn)
+    cur = conn.cursor()
+    cur.execute("BEGIN")
+
+    # Degree types next to the ones of the starting data, every type exists for every degree base
+    cur.executemany("INSERT OR IGNORE INTO DegreeType (TypeName) VALUES (?)",
+                    [(f"{rng.choice(SUBJECTS)} {number}",) for number in range(degree_types)])
+    cur.execute("INSERT OR IGNORE INTO Degrees SELECT b.BaseId, n.DegreeBNId, t.TypeId " +
+                "FROM DegreeBase AS b, DegreeBaseName AS n, DegreeType AS t")
+    degrees: list[tuple] = cur.execute("SELECT BaseId, DegreeBNId, TypeId FROM Degrees").fetchall()
+    degree_weights: list[float] = popularity(len(degrees))
+
+    # Courses, each connected to one to three degrees
+    first_course: int = cur.execute("SELECT COALESCE(MAX(CourseId), 0) + 1 FROM Course").fetchone()[0]
+    cur.executemany("INSERT INTO Course VALUES (?, ?, ?, 1, ?)",
+                    ((first_course + number, f"{rng.choice(LEVELS)} {rng.choice(SUBJECTS)} {number}",
+                      rng.choice((40, 50, 60)), rng.choice((5, 7, 10, 15)))
+                     for number in range(courses)))
+    course_ids: list[int] = list(range(first_course, first_course + courses))
+    courses_by_degree: dict[tuple, list[int]] = {degree: [] for degree in degrees}
+    connections: list[tuple] = []
+    for course_id in course_ids:
+        for degree in set(rng.choices(degrees, degree_weights, k=rng.randint(1, 3))):
+            courses_by_degree[degree].append(course_id)
+            connections.append((course_id, *degree))
+    cur.executemany("INSERT OR IGNORE INTO Connection VALUES (?, ?, ?, ?)", connections)
+    course_weights: list[float] = popularity(len(course_ids))
+
+    # Users share one password hash, bcrypt is not what the data layer benchmarks measure
+    hash_pass: bytes = bcrypt.hashpw(PASSWORD, bcrypt.gensalt(4))
+    first_user: int = cur.execute("SELECT COALESCE(MAX(Id), 0) + 1 FROM User").fetchone()[0]
+    accounts: list[int] = rng.choices((1, 2, 3), (1 - TEACHER_SHARE - ADMIN_SHARE, TEACHER_SHARE, ADMIN_SHARE),
+                                      k=users)
+    for batch in batches((first_user + number, "Student", "Generated", f"{rng.randint(1970, 2006)}-01-01",
+                          f"user{first_user + number}@example.com", f"{first_user + number}{UNI_EMAIL_DOMAIN}",
+                          hash_pass, accounts[number]) for number in range(users)):
+        cur.executemany("INSERT INTO User VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+
+    # Degree, enrollments and grades of every student
+    counts: dict[str, int] = {"enrollments": 0, "grades": 0}
+
+    def student_rows() -> Iterator[tuple[str, tuple]]:
+        for number in range(users):
+            if accounts[number] != 1:
+                continue
+            user_id: int = first_user + number
+            degree: tuple = rng.choices(degrees, degree_weights)[0]
+            yield "degree", (user_id, *degree)
+
+            taken: set[int] = set()
+            for _ in range(enrollments_per_student * 4):
+                if len(taken) == enrollments_per_student:
+                    break
+                if courses_by_degree[degree] and rng.random() < DEGREE_COURSE_SHARE:
+                    taken.add(rng.choice(courses_by_degree[degree]))
+                else:
+                    taken.add(rng.choices(course_ids, course_weights)[0])
+            for course_id in taken:
+                assigned: int = 0 if rng.random() < PENDING_SHARE else 1
+                yield "enrollment", (user_id, course_id, f"{rng.randint(2015, 2024)}-08-15", assigned)
+                if assigned and rng.random() < GRADED_SHARE:
+                    yield "grade", (user_id, course_id, max(0, min(100, round(rng.gauss(65, 15)))))
+
+    # The first user may already have the dummy data of the starting data
+    statements: dict[str, str] = {"degree": "INSERT OR IGNORE INTO Degree VALUES (?, ?, ?, ?)",
+                                  "enrollment": "INSERT OR IGNORE INTO CourseEnrollments VALUES (?, ?, ?, ?)",
+                                  "grade": "INSERT OR IGNORE INTO Grade VALUES (?, ?, ?)"}
+    for batch in batches(student_rows()):
+        for kind, statement in statements.items():
+            rows: list[tuple] = [row for row_kind, row in batch if row_kind == kind]
+            cur.executemany(statement, rows)
+            # Rows skipped by INSERT OR IGNORE are not counted
+            if kind == "enrollment":
+                counts["enrollments"] += max(cur.rowcount, 0)
+            elif kind == "grade":
+                counts["grades"] += max(cur.rowcount, 0)
+
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return {"users": users, "courses": courses, "degrees": len(degrees), **counts}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a roll_call database of a given size for benchmarks")
+    parser.add_argument("path", help="database file to create")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--courses", type=int, default=10_000)
+    parser.add_argument("--enrollments-per-student", type=int, default=20)
+    parser.add_argument("--degree-types", type=int, default=40, help="degree types added to the starting data")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--force", action="store_true", help="replace the file if it exists")
+    args = parser.parse_args()
+
+    if os.path.exists(args.path):
+        if not args.force:
+            parser.error(f"{args.path} exists, use --force to replace it")
+        os.remove(args.path)
+
+    start: float = time.perf_counter()
+    counts = generate(args.path, args.users, args.courses, args.enrollments_per_student, args.degree_types,
+                      args.seed)
+    print(", ".join(f"{name}: {count}" for name, count in counts.items()))
+    print(f"Generated {args.path} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
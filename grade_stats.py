@@ -0,0 +1,119 @@
+import argparse
+import math
+import sqlite3
+from typing import Optional
+import service
+from db import ConnectionManager
+from migrations import GRADE_STATS_QUERY
+
+STATS_COLUMNS: str = "CourseId, GradeCount, GradeSum, GradeSquares, MinGrade, MaxGrade, PassCount"
+
+# Courses whose stored statistics differ from the ones computed from Grade, in either direction
+# Courses that lost all their grades keep a row with a count of 0, which matches no grades
+MISMATCH_QUERY: str = (f"SELECT CourseId FROM (SELECT {STATS_COLUMNS} FROM CourseGradeStats WHERE GradeCount > 0 " +
+                       f"EXCEPT {GRADE_STATS_QUERY}) " +
+                       "UNION " +
+                       f"SELECT CourseId FROM ({GRADE_STATS_QUERY} " +
+                       f"EXCEPT SELECT {STATS_COLUMNS} FROM CourseGradeStats) " +
+                       "ORDER BY CourseId")
+
+
+# Grade statistics of one course, read from the running totals so every figure costs the same for any class size
+class CourseStats:
+    __slots__ = ("course_id", "count", "total", "squares", "min_grade", "max_grade", "passed")
+
+    def __init__(self, course_id: int, count: int, total: int, squares: int, min_grade: Optional[int],
+                 max_grade: Optional[int], passed: int) -> None:
+        self.course_id: int = course_id
+        self.count: int = count
+        self.total: int = total
+        self.squares: int = squares
+        self.min_grade: Optional[int] = min_grade
+        self.max_grade: Optional[int] = max_grade
+        self.passed: int = passed
+
+    def __str__(self) -> str:
+        if not self.count:
+            return f"Course {self.course_id}: no grades"
+        return (f"Course {self.course_id}: {self.count} grades, Mean: {self.mean:.1f}, Std dev: {self.stddev:.1f}, "
+                f"Min: {self.min_grade}, Max: {self.max_grade}, Pass rate: {self.pass_rate:.0%}")
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    # Population standard deviation from the sum of squares
+    @property
+    def stddev(self) -> Optional[float]:
+        if not self.count:
+            return None
+        return math.sqrt(max(0.0, self.squares / self.count - (self.total / self.count) ** 2))
+
+    @property
+    def pass_rate(self) -> Optional[float]:
+        return self.passed / self.count if self.count else None
+
+
+# Statistics of one course, one primary key lookup, a course without grades has a count of 0
+def course_stats(conn: sqlite3.Connection, course_id: int) -> CourseStats:
+    row = conn.execute(f"SELECT {STATS_COLUMNS} FROM CourseGradeStats WHERE CourseId = ?", (course_id,)).fetchone()
+    return CourseStats(*row) if row is not None else CourseStats(course_id, 0, 0, 0, None, None, 0)
+
+
+# Statistics of every course with grades
+def all_course_stats(conn: sqlite3.Connection) -> dict[int, CourseStats]:
+    return {row[0]: CourseStats(*row) for row in
+            conn.execute(f"SELECT {STATS_COLUMNS} FROM CourseGradeStats WHERE GradeCount > 0 ORDER BY CourseId")}
+
+
+# Compute the statistics again from every grade and replace the stored ones
+def rebuild(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        cur.execute("DELETE FROM CourseGradeStats")
+        cur.execute("INSERT INTO CourseGradeStats " + GRADE_STATS_QUERY)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+# Compare the stored statistics with the ones computed from every grade, returns the ids of the courses
+# that differ, and rebuilds the statistics when asked and something differs
+def check_consistency(conn: sqlite3.Connection, repair: bool = False) -> list[int]:
+    mismatches: list[int] = [row[0] for row in conn.execute(MISMATCH_QUERY)]
+    if mismatches and repair:
+        rebuild(conn)
+    return mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Show, check or rebuild the grade statistics per course")
+    parser.add_argument("--db", default=service.DBFILE, help="database file (default roll_call.db)")
+    parser.add_argument("--check", action="store_true", help="compare with statistics computed from every grade")
+    parser.add_argument("--repair", action="store_true", help="with --check, rebuild when they differ")
+    parser.add_argument("--rebuild", action="store_true", help="compute the statistics again from every grade")
+    args = parser.parse_args()
+
+    service.db_manager = ConnectionManager(args.db)
+    service.create_database()
+    conn = service.db_manager.connection()
+
+    if args.rebuild:
+        rebuild(conn)
+        print("Rebuilt the grade statistics")
+    elif args.check:
+        mismatches = check_consistency(conn, args.repair)
+        if not mismatches:
+            print("Grade statistics are consistent")
+        else:
+            print(f"Grade statistics differ for {len(mismatches)} courses: {', '.join(map(str, mismatches[:20]))}")
+            print("Rebuilt the grade statistics" if args.repair else "Run with --repair or --rebuild to fix them")
+    else:
+        for stats in all_course_stats(conn).values():
+            print(stats)
+
+
+if __name__ == "__main__":
+    main()
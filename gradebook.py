@@ -0,0 +1,139 @@
+import sqlite3
+import time
+from typing import Mapping, Optional
+from Course import Course
+
+# Range of a valid grade, same as the grades shown on the grades page
+MIN_GRADE: int = 0
+MAX_GRADE: int = 100
+
+# Every student assigned to a course with their grade (if any), in one query
+# A student enrolled with more than one start date is listed once
+ROSTER_QUERY: str = ("SELECT u.Id, u.FirstName, u.Surname, u.UniEmail, g.Grade " +
+                     "FROM CourseEnrollments AS e " +
+                     "JOIN User AS u ON u.Id = e.UserId " +
+                     "LEFT JOIN Grade AS g ON g.UserId = e.UserId AND g.CourseId = e.CourseId " +
+                     "WHERE e.CourseId = ? AND e.Assigned = 1 AND u.Account = 1 " +
+                     "GROUP BY u.Id " +
+                     "ORDER BY u.Surname, u.FirstName, u.Id")
+
+# Ids of the students a grade can be saved for, same students as the roster
+ROSTER_IDS_QUERY: str = ("SELECT DISTINCT e.UserId FROM CourseEnrollments AS e " +
+                         "JOIN User AS u ON u.Id = e.UserId " +
+                         "WHERE e.CourseId = ? AND e.Assigned = 1 AND u.Account = 1")
+
+# Insert a grade or change the existing one, rows with the same grade are left untouched
+UPSERT_GRADE: str = ("INSERT INTO Grade (UserId, CourseId, Grade) VALUES (?, ?, ?) " +
+                     "ON CONFLICT(UserId, CourseId) DO UPDATE SET Grade = excluded.Grade " +
+                     "WHERE Grade.Grade <> excluded.Grade")
+
+
+# Raised when a gradebook save has invalid grades, nothing is written then
+class GradebookError(ValueError):
+    def __init__(self, problems: list[str]) -> None:
+        super().__init__("; ".join(problems))
+        self.problems: list[str] = problems
+
+
+# One student of a course roster
+class RosterEntry:
+    __slots__ = ("user_id", "first_name", "surname", "uni_email", "grade")
+
+    def __init__(self, user_id: int, first_name: str, surname: str, uni_email: str, grade: Optional[int]) -> None:
+        self.user_id: int = user_id
+        self.first_name: str = first_name
+        self.surname: str = surname
+        self.uni_email: str = uni_email
+        self.grade: Optional[int] = grade
+
+    def __str__(self) -> str:
+        return f"{self.user_id} {self.first_name} {self.surname}, Grade: {self.grade}"
+
+
+# The students of a course with their grades
+class Roster:
+    __slots__ = ("course", "entries")
+
+    def __init__(self, course: Course, entries: list[RosterEntry]) -> None:
+        self.course: Course = course
+        self.entries: list[RosterEntry] = entries
+
+    def __str__(self) -> str:
+        return f"Course: {self.course.name}, Students: {len(self.entries)}"
+
+    # True when the grade reaches the passing grade of the course
+    def passed(self, grade: int) -> bool:
+        return grade >= self.course.passing_grade
+
+
+# Outcome of saving a gradebook
+class SaveResult:
+    __slots__ = ("saved", "cleared", "passed", "failed", "seconds")
+
+    def __init__(self) -> None:
+        self.saved: int = 0
+        self.cleared: int = 0
+        self.passed: int = 0
+        self.failed: int = 0
+        self.seconds: float = 0.0
+
+    def __str__(self) -> str:
+        return (f"Saved {self.saved} grades ({self.passed} passed, {self.failed} failed), "
+                f"cleared {self.cleared}, in {self.seconds * 1000:.0f} ms")
+
+
+# Load the roster of a course with the existing grades
+def load_roster(conn: sqlite3.Connection, course: Course) -> Roster:
+    cur = conn.cursor()
+    cur.execute(ROSTER_QUERY, (course.id,))
+    return Roster(course, [RosterEntry(row[0], row[1], row[2], row[3], row[4]) for row in cur.fetchall()])
+
+
+# Check one grade, returns the problem or None when the grade is valid
+def grade_problem(user_id: int, grade: Optional[int], enrolled: set[int]) -> Optional[str]:
+    if user_id not in enrolled:
+        return f"Student {user_id} is not assigned to the course"
+    if grade is not None and (not isinstance(grade, int) or isinstance(grade, bool)
+                              or not MIN_GRADE <= grade <= MAX_GRADE):
+        return f"Grade of student {user_id} must be a whole number between {MIN_GRADE} and {MAX_GRADE}"
+    return None
+
+
+# Write the grades of a course, by user id, in one transaction: one batched upsert for the grades
+# and one batched delete for the grades set to None
+# All grades are checked first against the grade range and the roster of the course, any invalid grade
+# raises GradebookError and nothing is written; passes are counted against the passing grade of the course
+def save_grades(conn: sqlite3.Connection, course_id: int, grades: Mapping[int, Optional[int]]) -> SaveResult:
+    result = SaveResult()
+    start: float = time.perf_counter()
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        cur.execute("SELECT PassingGrade FROM Course WHERE CourseId = ?", (course_id,))
+        row = cur.fetchone()
+        if row is None:
+            raise GradebookError([f"Course {course_id} does not exist"])
+        passing_grade: int = row[0]
+
+        cur.execute(ROSTER_IDS_QUERY, (course_id,))
+        enrolled: set[int] = {row[0] for row in cur.fetchall()}
+        problems: list[str] = [problem for user_id, grade in grades.items()
+                               if (problem := grade_problem(user_id, grade, enrolled)) is not None]
+        if problems:
+            raise GradebookError(problems)
+
+        upserts: list[tuple[int, int, int]] = [(user_id, course_id, grade) for user_id, grade in grades.items()
+                                               if grade is not None]
+        deletes: list[tuple[int, int]] = [(user_id, course_id) for user_id, grade in grades.items() if grade is None]
+        cur.executemany(UPSERT_GRADE, upserts)
+        cur.executemany("DELETE FROM Grade WHERE UserId = ? AND CourseId = ?", deletes)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+    result.saved, result.cleared = len(upserts), len(deletes)
+    result.passed = sum(1 for _, _, grade in upserts if grade >= passing_grade)
+    result.failed = result.saved - result.passed
+    result.seconds = time.perf_counter() - start
+    return result
@@ -0,0 +1,179 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+# Login attempts an account can take in a burst, and attempts per second it gets back
+ACCOUNT_CAPACITY: float = 10
+ACCOUNT_RATE: float = 1 / 30
+
+# Login attempts a client (an address) can take in a burst, and attempts per second it gets back
+CLIENT_CAPACITY: float = 30
+CLIENT_RATE: float = 1.0
+
+# Failed passwords in a row before an account is locked, the first lockout in seconds, doubled for every
+# further failure, and the longest lockout
+LOCKOUT_AFTER: int = 5
+LOCKOUT_SECONDS: float = 30
+MAX_LOCKOUT_SECONDS: float = 900
+
+# Seconds an unknown email is remembered, so repeated attempts on it skip the database
+UNKNOWN_TTL: float = 60
+
+# Accounts, clients and unknown emails remembered at most, the least recently used are forgotten first
+MAX_ENTRIES: int = 100000
+
+# Client name of logins from the desktop application
+LOCAL_CLIENT: str = "local"
+
+
+# Raised instead of checking the password when a login attempt is throttled
+class LoginThrottled(Exception):
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(f"Too many login attempts ({reason}), try again in {max(1, round(retry_after))} seconds")
+        self.reason: str = reason
+        self.retry_after: float = retry_after
+
+
+# Attempts that refill at a fixed rate up to the capacity
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, capacity: float, now: float) -> None:
+        self.tokens: float = capacity
+        self.updated: float = now
+
+    # Take one attempt, returns the seconds until one is available when the bucket is empty
+    def take(self, capacity: float, rate: float, now: float) -> float:
+        self.tokens = min(capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens < 1:
+            return (1 - self.tokens) / rate
+        self.tokens -= 1
+        return 0.0
+
+
+# Failed passwords in a row of an account and the end of its lockout
+class Lockout:
+    __slots__ = ("failures", "until")
+
+    def __init__(self) -> None:
+        self.failures: int = 0
+        self.until: float = 0.0
+
+
+# Bounded mapping that forgets the least recently used keys
+class RecentMap(OrderedDict):
+    def __init__(self, max_entries: int) -> None:
+        super().__init__()
+        self.max_entries: int = max_entries
+
+    def lookup(self, key: str, default: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = self[key] = default()
+            if len(self) > self.max_entries:
+                self.popitem(last=False)
+        else:
+            self.move_to_end(key)
+        return value
+
+
+# Decides whether a login attempt may check a password, before any query or bcrypt round is spent on it
+# Every attempt takes from the bucket of its client and of its account, failed passwords in a row lock
+# the account for longer and longer, and emails found unknown are answered from memory for a while
+# A rejected attempt costs a few dictionary lookups, counted per reason for monitoring
+class LoginThrottle:
+    def __init__(self, clock: Callable[[], float] = time.monotonic, max_entries: int = MAX_ENTRIES) -> None:
+        self.clock: Callable[[], float] = clock
+        self.allowed: int = 0
+        self.rejected: dict[str, int] = {"client": 0, "account": 0, "locked": 0, "unknown": 0}
+        self.failures: int = 0
+        self.lockouts: int = 0
+        self._clients = RecentMap(max_entries)
+        self._accounts = RecentMap(max_entries)
+        self._lockouts = RecentMap(max_entries)
+        self._unknown = RecentMap(max_entries)
+        self._lock = threading.Lock()
+
+    def __str__(self) -> str:
+        return (f"Logins allowed: {self.allowed}, Rejected: {sum(self.rejected.values())} ({self.rejected}), "
+                f"Failed passwords: {self.failures}, Lockouts: {self.lockouts}")
+
+    # Account buckets and lockouts ignore case and spaces, so changing them does not give new attempts
+    @staticmethod
+    def account(email: str) -> str:
+        return email.strip().lower()
+
+    # Let an attempt through, raises LoginThrottled when the client or the account is out of attempts or
+    # the account is locked; returns False when the email is known to be unknown, True to go on and check it
+    def admit(self, email: str, client: str = LOCAL_CLIENT) -> bool:
+        now: float = self.clock()
+        account: str = self.account(email)
+        with self._lock:
+            wait: float = self._clients.lookup(client, lambda: TokenBucket(CLIENT_CAPACITY, now)).take(
+                CLIENT_CAPACITY, CLIENT_RATE, now)
+            if wait:
+                self.rejected["client"] += 1
+                raise LoginThrottled("client", wait)
+
+            unknown_until: Optional[float] = self._unknown.get(email)
+            if unknown_until is not None:
+                if unknown_until > now:
+                    self.rejected["unknown"] += 1
+                    return False
+                del self._unknown[email]
+
+            lockout: Optional[Lockout] = self._lockouts.get(account)
+            if lockout is not None and lockout.until > now:
+                self.rejected["locked"] += 1
+                raise LoginThrottled("locked", lockout.until - now)
+
+            wait = self._accounts.lookup(account, lambda: TokenBucket(ACCOUNT_CAPACITY, now)).take(
+                ACCOUNT_CAPACITY, ACCOUNT_RATE, now)
+            if wait:
+                self.rejected["account"] += 1
+                raise LoginThrottled("account", wait)
+            self.allowed += 1
+            return True
+
+    # No user has this email
+    def record_unknown(self, email: str) -> None:
+        with self._lock:
+            self._unknown[email] = self.clock() + UNKNOWN_TTL
+            if len(self._unknown) > self._unknown.max_entries:
+                self._unknown.popitem(last=False)
+
+    # The email exists now (a new user or a changed email), stop answering it as unknown
+    def forget_unknown(self, email: str) -> None:
+        with self._lock:
+            self._unknown.pop(email, None)
+
+    # A wrong password, locks the account after LOCKOUT_AFTER in a row, longer with every further one
+    def record_failure(self, email: str) -> None:
+        with self._lock:
+            self.failures += 1
+            lockout: Lockout = self._lockouts.lookup(self.account(email), Lockout)
+            lockout.failures += 1
+            if lockout.failures >= LOCKOUT_AFTER:
+                doublings: int = min(lockout.failures - LOCKOUT_AFTER, 16)
+                seconds: float = min(MAX_LOCKOUT_SECONDS, LOCKOUT_SECONDS * 2 ** doublings)
+                lockout.until = self.clock() + seconds
+                self.lockouts += 1
+
+    # The right password, the failures of the account start over
+    def record_success(self, email: str) -> None:
+        with self._lock:
+            self._lockouts.pop(self.account(email), None)
+
+    def stats(self) -> dict[str, int]:
+        now: float = self.clock()
+        with self._lock:
+            return {"allowed": self.allowed, **{f"rejected_{reason}": count for reason, count in self.rejected.items()},
+                    "failures": self.failures, "lockouts": self.lockouts,
+                    "locked_accounts": sum(1 for lockout in self._lockouts.values() if lockout.until > now),
+                    "unknown_emails": len(self._unknown)}
+
+
+# Throttle of this process, used by service.check_login
+throttle: LoginThrottle = LoginThrottle()
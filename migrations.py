@@ -0,0 +1,388 @@
+import sqlite3
+import time
+from typing import Callable, Optional
+
+# Every database keeps the migrations applied to it in this table
+VERSION_TABLE: str = "schema_version"
+
+
+# Migration 1: the tables, triggers and starting data the portal was first released with
+def create_base_schema(cur: sqlite3.Cursor) -> None:
+    # Create the table Account in the Database with required fields
+    cur.execute("CREATE TABLE Account(AccountId INTEGER NOT NULL UNIQUE," +
+                "AccountType TEXT NOT NULL UNIQUE," +
+                "PRIMARY KEY(AccountId AUTOINCREMENT))")
+
+    # Create the table User in the Database with required fields
+    cur.execute("CREATE TABLE User(Id INTEGER UNIQUE," +
+                "FirstName TEXT NOT NULL, Surname TEXT NOT NULL, Birth TEXT NOT NULL," +
+                "Email TEXT NOT NULL UNIQUE, UniEmail TEXT," +
+                "Password TEXT NOT NULL, Account INTEGER," +
+                "PRIMARY KEY(Id AUTOINCREMENT)," +
+                "FOREIGN KEY(Account) REFERENCES Account(AccountId))")
+
+    # Create the table DegreeBase in the Database, to symbolise like "Bachelor" or other degrees
+    cur.execute("CREATE TABLE DegreeBase(BaseId INTEGER NOT NULL," +
+                "BaseName TEXT NOT NULL UNIQUE," +
+                "PRIMARY KEY(BaseId AUTOINCREMENT))")
+
+    # Create the table DegreeBaseName in the Database, to symbolise like "of Science" or others
+    cur.execute("CREATE TABLE DegreeBaseName(DegreeBNId INTEGER NOT NULL," +
+                "DegreeBName TEXT NOT NULL UNIQUE," +
+                "PRIMARY KEY(DegreeBNId AUTOINCREMENT))")
+
+    # Create the table DegreeType in the Database, to symbolide like "Zoology" or other degrees
+    cur.execute("CREATE TABLE DegreeType(TypeId INTEGER NOT NULL," +
+                "TypeName TEXT NOT NULL UNIQUE," +
+                "PRIMARY KEY(TypeId AUTOINCREMENT))")
+
+    # Create the table Degree in the Database with required fields
+    cur.execute("CREATE TABLE Degrees(BaseId INTEGER NOT NULL," +
+                "DegreeBNId INTEGER NOT NULL," +
+                "TypeId INTEGER NOT NULL," +
+                "PRIMARY KEY(BaseId, DegreeBNId, TypeId)," +
+                "FOREIGN KEY(BaseId) REFERENCES DegreeBase(BaseId)" +
+                "FOREIGN KEY(TypeId) REFERENCES DegreeType(TypeId)" +
+                "FOREIGN KEY(DegreeBNId) REFERENCES DegreeBaseName(DegreeBNId))")
+
+    # Create the table Degree in the Database for linking the degree the user is taking
+    cur.execute("CREATE TABLE Degree(UserId INTEGER NOT NULL," +
+                "BaseId INTEGER NOT NULL," +
+                "DegreeBNId INTEGER NOT NULL," +
+                "TypeId INTEGER NOT NULL," +
+                "PRIMARY KEY(UserId, BaseId, DegreeBNId, TypeId)," +
+                "FOREIGN KEY(UserId) REFERENCES User(Id)," +
+                "FOREIGN KEY(BaseId, DegreeBNId, TypeId) REFERENCES Degrees(BaseId, DegreeBNId, TypeId))")
+
+    # Create the table Course in the Database with required fields
+    cur.execute("CREATE TABLE Course(CourseId INTEGER NOT NULL," +
+                "CourseName TEXT NOT NULL," +
+                "PassingGrade INTEGER NOT NULL," +
+                "Active INTEGER NOT NULL," +
+                "PRIMARY KEY(CourseId AUTOINCREMENT))")
+
+    # Create the table Grade in the Database with required fields
+    cur.execute("CREATE TABLE Grade(UserId INTEGER NOT NULL," +
+                "CourseId INTEGER NOT NULL," +
+                "Grade INTEGER NOT NULL," +
+                "FOREIGN KEY(CourseId) REFERENCES Course(CourseId)," +
+                "FOREIGN KEY(UserId) REFERENCES User(Id)," +
+                "PRIMARY KEY(UserId, CourseId))")
+
+    # Create the table Classes in the Database with required fields
+    cur.execute("CREATE TABLE CourseEnrollments(UserId INTEGER NOT NULL," +
+                "CourseId INTEGER NOT NULL," +
+                "StartDate TEXT NOT NULL," +
+                "Assigned INTEGER NOT NULL," +
+                "PRIMARY KEY(UserId, CourseId, StartDate)," +
+                "FOREIGN KEY(UserId) REFERENCES User(Id)," +
+                "FOREIGN KEY(CourseId) REFERENCES Course(CourseId))")
+
+    # Create the table Connection in the Database to connect courses to degrees
+    cur.execute("CREATE TABLE Connection(CourseId INTEGER NOT NULL," +
+                "BaseId INTEGER NOT NULL," +
+                "DegreeBNId INTEGER NOT NULL," +
+                "TypeId INTEGER NOT NULL," +
+                "PRIMARY KEY(CourseId, BaseId, DegreeBNId, TypeId)," +
+                "FOREIGN KEY(CourseId) REFERENCES Course(CourseId)," +
+                "FOREIGN KEY(BaseId, DegreeBNId, TypeId) REFERENCES Degrees(BaseId, DegreeBNId, TypeId))")
+
+    # Triggers to automatically set the UniEmail and Account field upon new user insertion
+    cur.execute("CREATE TRIGGER CreateUniEmail AFTER INSERT ON User " + "\n" +
+                "BEGIN " + "\n" +
+                "UPDATE User SET UniEmail = NEW.Id || '@idkUniversity.com' WHERE Id = NEW.Id;" + "\n" +
+                "END;")
+
+    # Trigger to automatically assign the default account type to new users
+    cur.execute("CREATE TRIGGER AssignUser AFTER INSERT ON User " + "\n" +
+                "BEGIN " + "\n" +
+                "UPDATE User SET Account = 1 WHERE Id = NEW.Id;" + "\n" +
+                "END;")
+
+    # Insert the default data into table Account
+    cur.execute("INSERT INTO Account (AccountType) VALUES ('Student')," +
+                "('Teacher'), ('Admin')")
+
+    # Insert the default data into table DegreeBase
+    cur.execute("INSERT INTO DegreeBase (BaseName) VALUES ('Bachelors')," +
+                "('Masters'), ('Doctor of Philosophy')")
+
+    # Insert the default data into table DegreeBaseName
+    cur.execute("INSERT INTO DegreeBaseName (DegreeBName) VALUES ('Science')")
+
+    # Insert the default data into table DegreeType
+    cur.execute("INSERT INTO DegreeType (TypeName) VALUES ('Zoology'), " +
+                "('Wildlife Management'), ('Entomology'), ('IT and IS')")
+
+    # Insert the degrees build on DegreeBase, DegreeBaseName
+    # and DegreeType into Degrees
+    cur.execute("INSERT INTO Degrees VALUES (1,1,1), (1,1,2), (1,1,3), " +
+                "(2,1,1), (2,1,2), (2,1,3), (3,1,1), (3,1,2), (3,1,3), " +
+                "(1,1,4)")
+
+    # Dummy data
+    cur.execute("INSERT INTO Degree VALUES (1,3,1,1)")
+
+    cur.execute("INSERT INTO Course VALUES (null, 'Zoology', 50, 1), " +
+                "(null, 'Botany', 50, 1), (null, 'Genetics', 50, 1), " +
+                "(null, 'Biochemistry', 50, 1), (null, 'Entomology', 50, 1), " +
+                "(null, 'Geography', 50, 1), (null, 'Mathematics', 50, 1), " +
+                "(null, 'Physics ', 50, 1), (null, 'Chemistry', 50, 1), " +
+                "(null, 'Biostatistics', 50, 1), (null, 'Thesis Zoology', 50, 1), " +
+                "(null, 'Dissertation Zoology', 50, 1), (null, 'Geographic Information System', 50, 1), " +
+                "(null, 'Object-Oriented Programming', 50, 1), (null, 'Application Development', 50, 1)")
+
+    cur.execute("INSERT INTO Connection VALUES (1, 1,1,1)," +
+                "(2, 1,1,1), (3, 1,1,1), (4, 1,1,1), (5, 1,1,1)," +
+                "(6, 1,1,1), (7, 1,1,1), (8, 1,1,1), (9, 1,1,1)," +
+                "(10, 1,1,1), (11, 3,1,1), (12, 2,1,1), " +
+                "(13, 1,1,4), (14, 1,1,4), (15, 1,1,4)")
+
+    cur.execute("INSERT INTO CourseEnrollments VALUES (1, 11, 2024-05-23, 1)," +
+                "(1, 1, 2020-05-23, 1), (1, 2, 2020-05-23, 1), " +
+                "(1, 3, 2020-05-23, 1), (1, 4, 2020-05-23, 1), " +
+                "(1, 5, 2020-05-23, 1), (1, 6, 2020-05-23, 1), " +
+                "(1, 7, 2020-05-23, 1), (1, 8, 2020-05-23, 1), " +
+                "(1, 9, 2020-05-23, 1), (1, 10, 2020-05-23, 1), " +
+                "(1, 12, 2023-05-23, 1)")
+
+    cur.execute("INSERT INTO Grade VALUES (1,1,63), (1,2,71), " +
+                "(1,3,65), (1,4,74), (1,5,77), (1,6,79), " +
+                "(1,7,60), (1,8,78), (1,9,72), (1,10,68), " +
+                "(1,12,76)")
+
+
+# Migration 2: secondary indexes for the lookups in project.py
+# Degree by UserId and User by Email are already covered by the primary key and the unique constraint
+def add_lookup_indexes(cur: sqlite3.Cursor) -> None:
+    # Courses a user is assigned to, covers the filter on Assigned and the order of the profile query
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_enrollments_user_assigned " +
+                "ON CourseEnrollments(UserId, Assigned, CourseId, StartDate)")
+
+    # Grades of a user, covering so the grade is read from the index
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_grade_user ON Grade(UserId, CourseId, Grade)")
+
+    # Courses for a degree, the primary key of Connection starts with CourseId so it can not be used
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_connection_degree " +
+                "ON Connection(BaseId, DegreeBNId, TypeId, CourseId)")
+
+
+# Migration 3: full text index over the course names, kept in sync with Course by triggers
+# The trigram tokenizer matches any substring of three or more characters, shorter prefixes
+# are served by the case insensitive index on the name
+def add_course_search(cur: sqlite3.Cursor) -> None:
+    cur.execute("CREATE VIRTUAL TABLE IF NOT EXISTS CourseSearch USING fts5(CourseName," +
+                "content='Course', content_rowid='CourseId', tokenize='trigram')")
+
+    cur.execute("CREATE TRIGGER IF NOT EXISTS CourseSearchInsert AFTER INSERT ON Course " + "\n" +
+                "BEGIN " + "\n" +
+                "INSERT INTO CourseSearch(rowid, CourseName) VALUES (NEW.CourseId, NEW.CourseName);" + "\n" +
+                "END;")
+
+    cur.execute("CREATE TRIGGER IF NOT EXISTS CourseSearchDelete AFTER DELETE ON Course " + "\n" +
+                "BEGIN " + "\n" +
+                "INSERT INTO CourseSearch(CourseSearch, rowid, CourseName) " +
+                "VALUES ('delete', OLD.CourseId, OLD.CourseName);" + "\n" +
+                "END;")
+
+    cur.execute("CREATE TRIGGER IF NOT EXISTS CourseSearchUpdate AFTER UPDATE OF CourseName ON Course " + "\n" +
+                "BEGIN " + "\n" +
+                "INSERT INTO CourseSearch(CourseSearch, rowid, CourseName) " +
+                "VALUES ('delete', OLD.CourseId, OLD.CourseName);" + "\n" +
+                "INSERT INTO CourseSearch(rowid, CourseName) VALUES (NEW.CourseId, NEW.CourseName);" + "\n" +
+                "END;")
+
+    # Index the courses that already exist
+    cur.execute("INSERT INTO CourseSearch(CourseSearch) VALUES ('rebuild')")
+
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_course_name ON Course(CourseName COLLATE NOCASE, CourseId)")
+
+
+# Migration 4: credits of a course, used for the weighted average and the credits a student earned
+def add_course_credits(cur: sqlite3.Cursor) -> None:
+    cur.execute("SELECT 1 FROM pragma_table_info('Course') WHERE name = 'Credits'")
+    if cur.fetchone() is None:
+        cur.execute("ALTER TABLE Course ADD COLUMN Credits INTEGER NOT NULL DEFAULT 10")
+
+
+# Migration 5: only fill in the university email and account type when the insert leaves them empty,
+# so bulk inserts can set them directly instead of paying two extra updates per row
+def make_user_triggers_conditional(cur: sqlite3.Cursor) -> None:
+    cur.execute("DROP TRIGGER IF EXISTS CreateUniEmail")
+    cur.execute("CREATE TRIGGER CreateUniEmail AFTER INSERT ON User WHEN NEW.UniEmail IS NULL " + "\n" +
+                "BEGIN " + "\n" +
+                "UPDATE User SET UniEmail = NEW.Id || '@idkUniversity.com' WHERE Id = NEW.Id;" + "\n" +
+                "END;")
+
+    cur.execute("DROP TRIGGER IF EXISTS AssignUser")
+    cur.execute("CREATE TRIGGER AssignUser AFTER INSERT ON User WHEN NEW.Account IS NULL " + "\n" +
+                "BEGIN " + "\n" +
+                "UPDATE User SET Account = 1 WHERE Id = NEW.Id;" + "\n" +
+                "END;")
+
+
+# Tables read by the catalog cache, every change to them bumps the catalog version
+CATALOG_TABLES: tuple[str, ...] = ("Course", "Connection", "Degrees", "DegreeBase", "DegreeBaseName", "DegreeType")
+
+
+# Migration 6: version counter of the catalog tables, so a cached catalog is only reloaded after it changed
+def add_catalog_version(cur: sqlite3.Cursor) -> None:
+    cur.execute("CREATE TABLE IF NOT EXISTS CatalogVersion(Id INTEGER NOT NULL CHECK(Id = 1)," +
+                "Version INTEGER NOT NULL," +
+                "PRIMARY KEY(Id))")
+    cur.execute("INSERT OR IGNORE INTO CatalogVersion VALUES (1, 0)")
+
+    for table in CATALOG_TABLES:
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            cur.execute(f"CREATE TRIGGER IF NOT EXISTS {table}Catalog{event.capitalize()} " +
+                        f"AFTER {event} ON {table} " + "\n" +
+                        "BEGIN " + "\n" +
+                        "UPDATE CatalogVersion SET Version = Version + 1 WHERE Id = 1;" + "\n" +
+                        "END;")
+
+
+# Migration 7: students of a course for the gradebook roster, the other enrollment indexes start with UserId
+def add_course_roster_index(cur: sqlite3.Cursor) -> None:
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_enrollments_course_assigned " +
+                "ON CourseEnrollments(CourseId, Assigned, UserId)")
+
+
+# Migration 8: requests waiting for approval, a partial index so it only holds the few pending rows
+def add_pending_enrollments_index(cur: sqlite3.Cursor) -> None:
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_enrollments_pending " +
+                "ON CourseEnrollments(CourseId, UserId, StartDate) WHERE Assigned = 0")
+
+
+# Statistics of every course with grades, computed from scratch from Grade
+GRADE_STATS_QUERY: str = ("SELECT g.CourseId, COUNT(*), SUM(g.Grade), SUM(g.Grade * g.Grade), MIN(g.Grade), " +
+                          "MAX(g.Grade), COALESCE(SUM(g.Grade >= c.PassingGrade), 0) " +
+                          "FROM Grade AS g LEFT JOIN Course AS c ON c.CourseId = g.CourseId " +
+                          "GROUP BY g.CourseId")
+
+
+# Migration 9: grade statistics per course, kept up to date by triggers on Grade and Course
+# Count, sum and sum of squares change by one grade at a time, min and max are looked up again in the
+# index on (CourseId, Grade) when a grade goes away, and the pass count is recounted when the passing grade moves
+def add_course_grade_stats(cur: sqlite3.Cursor) -> None:
+    cur.execute("CREATE TABLE IF NOT EXISTS CourseGradeStats(CourseId INTEGER NOT NULL," +
+                "GradeCount INTEGER NOT NULL," +
+                "GradeSum INTEGER NOT NULL," +
+                "GradeSquares INTEGER NOT NULL," +
+                "MinGrade INTEGER," +
+                "MaxGrade INTEGER," +
+                "PassCount INTEGER NOT NULL," +
+                "PRIMARY KEY(CourseId))")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_grade_course ON Grade(CourseId, Grade)")
+
+    add_grade: str = ("INSERT INTO CourseGradeStats VALUES (NEW.CourseId, 1, NEW.Grade, NEW.Grade * NEW.Grade, " +
+                      "NEW.Grade, NEW.Grade, COALESCE(NEW.Grade >= " +
+                      "(SELECT PassingGrade FROM Course WHERE CourseId = NEW.CourseId), 0)) " +
+                      "ON CONFLICT(CourseId) DO UPDATE SET GradeCount = GradeCount + 1, " +
+                      "GradeSum = GradeSum + excluded.GradeSum, GradeSquares = GradeSquares + excluded.GradeSquares, " +
+                      "MinGrade = MIN(COALESCE(MinGrade, excluded.MinGrade), excluded.MinGrade), " +
+                      "MaxGrade = MAX(COALESCE(MaxGrade, excluded.MaxGrade), excluded.MaxGrade), " +
+                      "PassCount = PassCount + excluded.PassCount;")
+    remove_grade: str = ("UPDATE CourseGradeStats SET GradeCount = GradeCount - 1, GradeSum = GradeSum - OLD.Grade, " +
+                         "GradeSquares = GradeSquares - OLD.Grade * OLD.Grade, " +
+                         "PassCount = PassCount - COALESCE(OLD.Grade >= " +
+                         "(SELECT PassingGrade FROM Course WHERE CourseId = OLD.CourseId), 0), " +
+                         "MinGrade = (SELECT MIN(Grade) FROM Grade WHERE CourseId = OLD.CourseId), " +
+                         "MaxGrade = (SELECT MAX(Grade) FROM Grade WHERE CourseId = OLD.CourseId) " +
+                         "WHERE CourseId = OLD.CourseId;")
+
+    cur.execute("CREATE TRIGGER IF NOT EXISTS GradeStatsInsert AFTER INSERT ON Grade " + "\n" +
+                "BEGIN " + "\n" + add_grade + "\n" + "END;")
+    cur.execute("CREATE TRIGGER IF NOT EXISTS GradeStatsDelete AFTER DELETE ON Grade " + "\n" +
+                "BEGIN " + "\n" + remove_grade + "\n" + "END;")
+    # A changed grade is taken out and added again, min and max of the old course are looked up in Grade,
+    # which already holds the new grade, and the new grade is then merged into min and max of its course
+    cur.execute("CREATE TRIGGER IF NOT EXISTS GradeStatsUpdate AFTER UPDATE OF Grade, CourseId ON Grade " + "\n" +
+                "BEGIN " + "\n" + remove_grade + "\n" + add_grade + "\n" + "END;")
+    cur.execute("CREATE TRIGGER IF NOT EXISTS GradeStatsPassingGrade AFTER UPDATE OF PassingGrade ON Course " + "\n" +
+                "BEGIN " + "\n" +
+                "UPDATE CourseGradeStats SET PassCount = (SELECT COUNT(*) FROM Grade " +
+                "WHERE CourseId = NEW.CourseId AND Grade >= NEW.PassingGrade) WHERE CourseId = NEW.CourseId;" + "\n" +
+                "END;")
+
+    # INSERT OR REPLACE on Grade skips the delete trigger (SQLite only fires it with recursive_triggers on),
+    # grades are written with an upsert instead; grade_stats.py --check finds and repairs any drift
+
+    # Statistics of the grades that already exist
+    cur.execute("DELETE FROM CourseGradeStats")
+    cur.execute("INSERT INTO CourseGradeStats " + GRADE_STATS_QUERY)
+
+
+# Ordered list of all migrations as (version, description, step)
+# A step must only be added at the end and must never be changed once released
+MIGRATIONS: list[tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, "Base schema and starting data", create_base_schema),
+    (2, "Secondary indexes for login and course lookups", add_lookup_indexes),
+    (3, "Full text search over course names", add_course_search),
+    (4, "Credits of a course", add_course_credits),
+    (5, "User triggers only fill in missing values", make_user_triggers_conditional),
+    (6, "Version counter of the catalog tables", add_catalog_version),
+    (7, "Index of the students of a course", add_course_roster_index),
+    (8, "Partial index of the enrollments waiting for approval", add_pending_enrollments_index),
+    (9, "Grade statistics per course", add_course_grade_stats),
+]
+
+# Newest schema version known to this version of the portal
+LATEST_VERSION: int = MIGRATIONS[-1][0]
+
+
+# Return the schema version of the database, 0 for an empty database
+def current_version(conn: sqlite3.Connection) -> int:
+    cur = conn.cursor()
+    cur.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN (?, 'User')", (VERSION_TABLE,))
+    tables = {row[0] for row in cur.fetchall()}
+
+    if VERSION_TABLE in tables:
+        cur.execute(f"SELECT COALESCE(MAX(Version), 0) FROM {VERSION_TABLE}")
+        return cur.fetchone()[0]
+
+    # Databases created before migrations existed already have the base schema
+    if "User" in tables:
+        return 1
+    return 0
+
+
+# Upgrade the database in place to the target version (the newest by default)
+# Every migration runs in its own transaction together with its version row, so an interrupted
+# upgrade never leaves a half-applied step behind, and running it again only applies what is missing
+def migrate(conn: sqlite3.Connection, target: Optional[int] = None) -> int:
+    if target is None:
+        target = LATEST_VERSION
+
+    for version, description, step in MIGRATIONS:
+        if version > target:
+            break
+
+        # Cheap check first, so an up-to-date database does not take the write lock
+        if version <= current_version(conn):
+            continue
+
+        cur = conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            # Check again under the write lock, another process may have migrated in the meantime
+            applied = current_version(conn)
+            if version > applied:
+                cur.execute(f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE}(Version INTEGER NOT NULL," +
+                            "Description TEXT NOT NULL," +
+                            "AppliedAt TEXT NOT NULL," +
+                            "PRIMARY KEY(Version))")
+                # Record the base schema of databases created before migrations existed
+                if applied == 1:
+                    cur.execute(f"INSERT OR IGNORE INTO {VERSION_TABLE} VALUES (?, ?, ?)",
+                                (1, MIGRATIONS[0][1], time.strftime("%Y-%m-%d %H:%M:%S")))
+                step(cur)
+                cur.execute(f"INSERT INTO {VERSION_TABLE} VALUES (?, ?, ?)",
+                            (version, description, time.strftime("%Y-%m-%d %H:%M:%S")))
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    # Let SQLite refresh its statistics for the new indexes when needed
+    conn.execute("PRAGMA optimize")
+    return current_version(conn)
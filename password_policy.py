@@ -0,0 +1,97 @@
+import argparse
+import hmac
+import os
+import time
+from typing import Union
+
+# Work factor for new password hashes when ROLL_CALL_BCRYPT_ROUNDS is not set, same as bcrypt.gensalt()
+DEFAULT_ROUNDS: int = 12
+
+# Range of work factors bcrypt accepts
+MIN_ROUNDS: int = 4
+MAX_ROUNDS: int = 31
+
+# Environment variable to set the work factor for the hardware the portal runs on
+ROUNDS_VARIABLE: str = "ROLL_CALL_BCRYPT_ROUNDS"
+
+
+# Read the work factor from the environment, falls back to the default when unset or invalid
+def rounds_from_env() -> int:
+    value: str = os.environ.get(ROUNDS_VARIABLE, "")
+    if value.isdigit() and MIN_ROUNDS <= int(value) <= MAX_ROUNDS:
+        return int(value)
+    return DEFAULT_ROUNDS
+
+
+# Return the work factor a bcrypt hash was made with, like 12 for b"$2b$12$..."
+def hash_rounds(stored_hash: Union[bytes, str]) -> int:
+    if isinstance(stored_hash, str):
+        stored_hash = stored_hash.encode("utf-8")
+    return int(stored_hash.split(b"$")[2])
+
+
+# Compare the two password entries of a form in constant time, without hashing either of them
+def passwords_match(password1: str, password2: str) -> bool:
+    return hmac.compare_digest(password1.encode("utf-8"), password2.encode("utf-8"))
+
+
+# Hashing rules for user passwords, new hashes use the configured work factor and hashes made
+# with another work factor are reported so they can be upgraded on the next successful login
+class HashPolicy:
+    def __init__(self, rounds: int = DEFAULT_ROUNDS) -> None:
+        if not MIN_ROUNDS <= rounds <= MAX_ROUNDS:
+            raise ValueError(f"bcrypt rounds must be between {MIN_ROUNDS} and {MAX_ROUNDS}")
+        self.rounds: int = rounds
+
+    def __str__(self) -> str:
+        return f"bcrypt rounds: {self.rounds}"
+
+    # bcrypt is imported on the first hash or check, not on start-up
+    def hash(self, password: bytes) -> bytes:
+        import bcrypt
+        return bcrypt.hashpw(password, bcrypt.gensalt(self.rounds))
+
+    def verify(self, password: bytes, stored_hash: Union[bytes, str]) -> bool:
+        if isinstance(stored_hash, str):
+            stored_hash = stored_hash.encode("utf-8")
+        import bcrypt
+        return bcrypt.checkpw(password, stored_hash)
+
+    # True when the stored hash was made with another work factor than the policy
+    def needs_rehash(self, stored_hash: Union[bytes, str]) -> bool:
+        return hash_rounds(stored_hash) != self.rounds
+
+
+# Return the highest work factor where one hash takes at most target_ms milliseconds on this machine
+# Every extra round doubles the cost, so the search stops at the first work factor over the target
+def calibrate(target_ms: float, min_rounds: int = 10, max_rounds: int = 16) -> int:
+    import bcrypt
+    rounds: int = min_rounds
+    for candidate in range(min_rounds, max_rounds + 1):
+        start: float = time.perf_counter()
+        bcrypt.hashpw(b"calibration password", bcrypt.gensalt(candidate))
+        elapsed_ms: float = (time.perf_counter() - start) * 1000
+        if elapsed_ms > target_ms:
+            break
+        rounds = candidate
+    return rounds
+
+
+# Policy used by the portal
+policy: HashPolicy = HashPolicy(rounds_from_env())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pick the bcrypt work factor for a target hashing time")
+    parser.add_argument("--calibrate", type=float, default=250, metavar="MS",
+                        help="target time for one password hash in milliseconds (default 250)")
+    args = parser.parse_args()
+
+    rounds: int = calibrate(args.calibrate)
+    print(f"Current policy: {policy}")
+    print(f"Calibrated rounds for {args.calibrate:g} ms: {rounds}")
+    print(f"Set it with: export {ROUNDS_VARIABLE}={rounds}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,404 +1,85 @@
-import os.path
-import re
-import sqlite3
+import threading
 import tkinter as tk
 from tkinter import ttk
-import bcrypt
-from validator_collection import checkers
-from Person import Person
-from Student import Student
+from typing import Callable, Optional
+from Course import Course
+from Session import Session
+from service import (approve_requests, catalog, change_user_settings, check_login, create_database, create_new_user,
+                     db_manager, list_pending_requests, load_courses, load_gradebook, reject_requests, save_gradebook,
+                     validate_date, validate_email, validate_password)
+from approval_queue import PendingRequest
+from gradebook import GradebookError, Roster, SaveResult
 from Teacher import Teacher
 from Admin import Admin
-from Course import Course
-from Grade import Grade
-from typing import Union
-import copy
+from course_search import search_courses
+from virtual_list import VirtualList
+from course_filter import FILTER_OPTIONS, CoursePager, CourseView, filter_view
+from workers import BackgroundTask
+from password_policy import passwords_match, policy
+from login_throttle import LoginThrottled
 
-# Constant for database file path
-DBFILE: str = "roll_call.db"
+# GUI of the portal, a thin layer over the service module
+# validate_date, validate_email and validate_password stay importable from here
 
 # Font style for labels in application
 custom_font1: tuple = ("Helvetica", 15)
 custom_font2: tuple = ("Helvetica", 13)
 
-# Current logged-in user, instance of type Person (Student, Teacher, Admin)
-user: Union[Person, Student, Teacher, Admin]
+# Session of the client using this window, replaced by a new one on every login
+session: Session = Session()
 
-# Defining list of filter options for courses
-FILTER_OPTIONS: list[str] = ["", "All courses", "Courses for degree", "Courses I am taking"]
+# Main window for Tkinter GUI application, created by main()
+window: tk.Tk
 
-# Initialising lists to hold filtered courses, all courses and courses for a degree
-courses_filter_list: list[Course] = []
-all_courses_list: list[Course] = []
-all_courses_for_degree_list: list[Course] = []
 
-# Variable to keep track of selected filter option
-select_filter_value: int = 0
+def main() -> None:
+    open_window()
+    window.mainloop()
 
-# Setting up main window for Tkinter GUI application
-window = tk.Tk()
-window.geometry("1000x500")
 
+# Create the database, or upgrade it if it was made by an older version, and show the first frame
+def open_window() -> None:
+    global window
+    create_database()
 
-def main() -> None:
-    # Check if database file exists, if not create new database
-    if not os.path.isfile(DBFILE):
-        create_database()
+    # Setting up main window for Tkinter GUI application
+    window = tk.Tk()
+    window.geometry("1000x500")
 
     # Login or Create account
     start()
 
 
-# Function to create the database with the required Tables and Fields
-# And inserts the required starting data
-def create_database() -> None:
-    with sqlite3.connect(DBFILE) as db:
-        cur = db.cursor()
-
-        # Create the table Account in the Database with required fields
-        cur.execute("CREATE TABLE Account(AccountId INTEGER NOT NULL UNIQUE," +
-                    "AccountType TEXT NOT NULL UNIQUE," +
-                    "PRIMARY KEY(AccountId AUTOINCREMENT))")
-
-        # Create the table User in the Database with required fields
-        cur.execute("CREATE TABLE User(Id INTEGER UNIQUE," +
-                    "FirstName TEXT NOT NULL, Surname TEXT NOT NULL, Birth TEXT NOT NULL," +
-                    "Email TEXT NOT NULL UNIQUE, UniEmail TEXT," +
-                    "Password TEXT NOT NULL, Account INTEGER," +
-                    "PRIMARY KEY(Id AUTOINCREMENT)," +
-                    "FOREIGN KEY(Account) REFERENCES Account(AccountId))")
-
-        # Create the table DegreeBase in the Database, to symbolise like "Bachelor" or other degrees
-        cur.execute("CREATE TABLE DegreeBase(BaseId INTEGER NOT NULL," +
-                    "BaseName TEXT NOT NULL UNIQUE," +
-                    "PRIMARY KEY(BaseId AUTOINCREMENT))")
-
-        # Create the table DegreeBaseName in the Database, to symbolise like "of Science" or others
-        cur.execute("CREATE TABLE DegreeBaseName(DegreeBNId INTEGER NOT NULL," +
-                    "DegreeBName TEXT NOT NULL UNIQUE," +
-                    "PRIMARY KEY(DegreeBNId AUTOINCREMENT))")
-
-        # Create the table DegreeType in the Database, to symbolide like "Zoology" or other degrees
-        cur.execute("CREATE TABLE DegreeType(TypeId INTEGER NOT NULL," +
-                    "TypeName TEXT NOT NULL UNIQUE," +
-                    "PRIMARY KEY(TypeId AUTOINCREMENT))")
-
-        # Create the table Degree in the Database with required fields
-        cur.execute("CREATE TABLE Degrees(BaseId INTEGER NOT NULL," +
-                    "DegreeBNId INTEGER NOT NULL," +
-                    "TypeId INTEGER NOT NULL," +
-                    "PRIMARY KEY(BaseId, DegreeBNId, TypeId)," +
-                    "FOREIGN KEY(BaseId) REFERENCES DegreeBase(BaseId)" +
-                    "FOREIGN KEY(TypeId) REFERENCES DegreeType(TypeId)" +
-                    "FOREIGN KEY(DegreeBNId) REFERENCES DegreeBaseName(DegreeBNId))")
-
-        # Create the table Degree in the Database for linking the degree the user is taking
-        cur.execute("CREATE TABLE Degree(UserId INTEGER NOT NULL," +
-                    "BaseId INTEGER NOT NULL," +
-                    "DegreeBNId INTEGER NOT NULL," +
-                    "TypeId INTEGER NOT NULL," +
-                    "PRIMARY KEY(UserId, BaseId, DegreeBNId, TypeId)," +
-                    "FOREIGN KEY(UserId) REFERENCES User(Id)," +
-                    "FOREIGN KEY(BaseId, DegreeBNId, TypeId) REFERENCES Degrees(BaseId, DegreeBNId, TypeId))")
-
-        # Create the table Course in the Database with required fields
-        cur.execute("CREATE TABLE Course(CourseId INTEGER NOT NULL," +
-                    "CourseName TEXT NOT NULL," +
-                    "PassingGrade INTEGER NOT NULL," +
-                    "Active INTEGER NOT NULL," +
-                    "PRIMARY KEY(CourseId AUTOINCREMENT))")
-
-        # Create the table Grade in the Database with required fields
-        cur.execute("CREATE TABLE Grade(UserId INTEGER NOT NULL," +
-                    "CourseId INTEGER NOT NULL," +
-                    "Grade INTEGER NOT NULL," +
-                    "FOREIGN KEY(CourseId) REFERENCES Course(CourseId)," +
-                    "FOREIGN KEY(UserId) REFERENCES User(Id)," +
-                    "PRIMARY KEY(UserId, CourseId))")
-
-        # Create the table Classes in the Database with required fields
-        cur.execute("CREATE TABLE CourseEnrollments(UserId INTEGER NOT NULL," +
-                    "CourseId INTEGER NOT NULL," +
-                    "StartDate TEXT NOT NULL," +
-                    "Assigned INTEGER NOT NULL," +
-                    "PRIMARY KEY(UserId, CourseId, StartDate)," +
-                    "FOREIGN KEY(UserId) REFERENCES User(Id)," +
-                    "FOREIGN KEY(CourseId) REFERENCES Course(CourseId))")
-
-        # Create the table Connection in the Database to connect courses to degrees
-        cur.execute("CREATE TABLE Connection(CourseId INTEGER NOT NULL," +
-                    "BaseId INTEGER NOT NULL," +
-                    "DegreeBNId INTEGER NOT NULL," +
-                    "TypeId INTEGER NOT NULL," +
-                    "PRIMARY KEY(CourseId, BaseId, DegreeBNId, TypeId)," +
-                    "FOREIGN KEY(CourseId) REFERENCES Course(CourseId)," +
-                    "FOREIGN KEY(BaseId, DegreeBNId, TypeId) REFERENCES Degrees(BaseId, DegreeBNId, TypeId))")
-
-        # Triggers to automatically set the UniEmail and Account field upon new user insertion
-        cur.execute("CREATE TRIGGER CreateUniEmail AFTER INSERT ON User " + "\n" +
-                    "BEGIN " + "\n" +
-                    "UPDATE User SET UniEmail = NEW.Id || '@idkUniversity.com' WHERE Id = NEW.Id;" + "\n" +
-                    "END;")
-
-        # Trigger to automatically assign the default account type to new users
-        cur.execute("CREATE TRIGGER AssignUser AFTER INSERT ON User " + "\n" +
-                    "BEGIN " + "\n" +
-                    "UPDATE User SET Account = 1 WHERE Id = NEW.Id;" + "\n" +
-                    "END;")
-
-        # Insert the default data into table Account
-        cur.execute("INSERT INTO Account (AccountType) VALUES ('Student')," +
-                    "('Teacher'), ('Admin')")
-
-        # Insert the default data into table DegreeBase
-        cur.execute("INSERT INTO DegreeBase (BaseName) VALUES ('Bachelors')," +
-                    "('Masters'), ('Doctor of Philosophy')")
-
-        # Insert the default data into table DegreeBaseName
-        cur.execute("INSERT INTO DegreeBaseName (DegreeBName) VALUES ('Science')")
-
-        # Insert the default data into table DegreeType
-        cur.execute("INSERT INTO DegreeType (TypeName) VALUES ('Zoology'), " +
-                    "('Wildlife Management'), ('Entomology'), ('IT and IS')")
-
-        # Insert the degrees build on DegreeBase, DegreeBaseName
-        # and DegreeType into Degrees
-        cur.execute("INSERT INTO Degrees VALUES (1,1,1), (1,1,2), (1,1,3), " +
-                    "(2,1,1), (2,1,2), (2,1,3), (3,1,1), (3,1,2), (3,1,3), " +
-                    "(1,1,4)")
-
-        # Dummy data
-        cur.execute("INSERT INTO Degree VALUES (1,3,1,1)")
-
-        cur.execute("INSERT INTO Course VALUES (null, 'Zoology', 50, 1), " +
-                    "(null, 'Botany', 50, 1), (null, 'Genetics', 50, 1), " +
-                    "(null, 'Biochemistry', 50, 1), (null, 'Entomology', 50, 1), " +
-                    "(null, 'Geography', 50, 1), (null, 'Mathematics', 50, 1), " +
-                    "(null, 'Physics ', 50, 1), (null, 'Chemistry', 50, 1), " +
-                    "(null, 'Biostatistics', 50, 1), (null, 'Thesis Zoology', 50, 1), " +
-                    "(null, 'Dissertation Zoology', 50, 1), (null, 'Geographic Information System', 50, 1), " +
-                    "(null, 'Object-Oriented Programming', 50, 1), (null, 'Application Development', 50, 1)")
-
-        cur.execute("INSERT INTO Connection VALUES (1, 1,1,1)," +
-                    "(2, 1,1,1), (3, 1,1,1), (4, 1,1,1), (5, 1,1,1)," +
-                    "(6, 1,1,1), (7, 1,1,1), (8, 1,1,1), (9, 1,1,1)," +
-                    "(10, 1,1,1), (11, 3,1,1), (12, 2,1,1), " +
-                    "(13, 1,1,4), (14, 1,1,4), (15, 1,1,4)")
-
-        cur.execute("INSERT INTO CourseEnrollments VALUES (1, 11, 2024-05-23, 1)," +
-                    "(1, 1, 2020-05-23, 1), (1, 2, 2020-05-23, 1), " +
-                    "(1, 3, 2020-05-23, 1), (1, 4, 2020-05-23, 1), " +
-                    "(1, 5, 2020-05-23, 1), (1, 6, 2020-05-23, 1), " +
-                    "(1, 7, 2020-05-23, 1), (1, 8, 2020-05-23, 1), " +
-                    "(1, 9, 2020-05-23, 1), (1, 10, 2020-05-23, 1), " +
-                    "(1, 12, 2023-05-23, 1)")
-
-        cur.execute("INSERT INTO Grade VALUES (1,1,63), (1,2,71), " +
-                    "(1,3,65), (1,4,74), (1,5,77), (1,6,79), " +
-                    "(1,7,60), (1,8,78), (1,9,72), (1,10,68), " +
-                    "(1,12,76)")
-
-        # Commit changes
-        db.commit()
-
-
-def insert_course(course_name: str, passing_grade: int) -> None:
-    with sqlite3.connect(DBFILE) as conn:
-        cur = conn.cursor()
-
-        # Insert a course into the database
-        cur.execute("INSERT INTO Course (CourseName, PassingGrade) VALUES (?, ?)",
-                    (course_name, passing_grade))
-        conn.commit()
-
-
-def get_all_courses() -> None:
-    with sqlite3.connect(DBFILE) as conn:
-        cur = conn.cursor()
-
-        # Retrieve all the courses from the database
-        cur.execute("SELECT CourseId, CourseName, PassingGrade, Active FROM Course")
-        all_courses_from_database = cur.fetchall()
-
-        global all_courses_list
-
-        if all_courses_from_database:
-            all_courses_list.clear()
-            for course_tuple in all_courses_from_database:
-                course_id = course_tuple[0]
-                course_name = course_tuple[1]
-                course_pass_grade = course_tuple[2]
-                course_active = course_tuple[3]
-                all_courses_list.append(Course(course_id, course_name, course_pass_grade, course_active))
-
-
-def get_all_courses_for_degree(user_id: int) -> None:
-    with sqlite3.connect(DBFILE) as conn:
-        cur = conn.cursor()
-
-        # Retrieve the full degree from user
-        cur.execute("SELECT BaseId, DegreeBNId, TypeId FROM Degree WHERE UserId = ?", (user_id,))
-        degree_for_user = cur.fetchone()
-
-        # Retrieve all the course ids for the specific degree the user is taking
-        if degree_for_user:
-            cur.execute("SELECT CourseId FROM Connection WHERE BaseId = ? AND DegreeBNId = ? AND TypeId = ?",
-                        (degree_for_user[0], degree_for_user[1], degree_for_user[2]))
-            all_courses_by_degree = cur.fetchall()
-
-        all_courses_for_degree: list = []
-
-        # Retrieve all the courses by the course ids from the user
-        if all_courses_by_degree:
-            for course_tuple in all_courses_by_degree:
-                # Retrieve all the courses that the user is taking from the database
-                cur.execute("SELECT CourseId, CourseName, PassingGrade, Active FROM Course WHERE CourseId = ?", (course_tuple[0],))
-                all_courses_for_degree_from_database = cur.fetchone()
-                all_courses_for_degree.append(all_courses_for_degree_from_database)
-
-        global all_courses_for_degree_list
-
-        # Fill the all_courses_for_degree_list with all the courses from the user degree
-        if all_courses_for_degree:
-            all_courses_for_degree_list.clear()
-            for course_tuple in all_courses_for_degree:
-                course_id = course_tuple[0]
-                course_name = course_tuple[1]
-                course_pass_grade = course_tuple[2]
-                course_active = course_tuple[3]
-                all_courses_for_degree_list.append(Course(course_id, course_name, course_pass_grade, course_active))
-
-
-# Checks the login credentials, retrieves user details from the database and initializes the global user object based
-# on the role (Student, Teacher, Admin)
-def check_login(email: str, password: bytes) -> bool:
-    # Connect to the database and go through User to find password by email
-    with sqlite3.connect(DBFILE) as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT Password, id FROM User WHERE Email = ?", (email,))
-        # If you found the Email, put password in the result, else put None in the result
-        result = cur.fetchone()
-
-        # If the result is None, then the Email was wrong, and return False
-        if result is None:
-            return False
-
-        # Extract stored password and user ID from the result
-        stored_hash_password = result[0]
-        stored_id = result[1]
-
-        # Retrieve additional user details based on the user ID
-        cur.execute("SELECT FirstName, Surname, Birth, Email, UniEmail, Account FROM User WHERE Id = ?", (stored_id,))
-        person_result = cur.fetchone()
-        global user
-
-        # Retrieve degree of user based on the user ID
-        cur.execute("SELECT BaseId, DegreeBNId, TypeId FROM Degree WHERE UserId = ?", (stored_id,))
-        degree_list = cur.fetchone()
-
-        # Empty string of the full degree of the user
-        full_degree: str = ""
-
-        # Retrieve the name for DegreeBase, DegreeBaseName and DegreeType
-        # to get the full name of the degree of the user
-        if degree_list:
-            cur.execute(
-                "SELECT BaseName, DegreeBName, TypeName FROM DegreeBase, DegreeBaseName, DegreeType " +
-                "WHERE BaseId = ? AND DegreeBNId = ? AND TypeId = ?",
-                (degree_list[0], degree_list[1], degree_list[2]))
-            degree_for_user = cur.fetchone()
-            full_degree += f"{degree_for_user[0]} of {degree_for_user[1]} {degree_for_user[2]}"
-
-        # Retrieve the courses ids the user is enrolled into based on the user ID
-        cur.execute("SELECT CourseId FROM CourseEnrollments WHERE Assigned = 1 AND UserId = ?", (stored_id,))
-        enrolld_courses = cur.fetchall()
-
-        # Empty list of courses
-        list_of_courses: list[Course] = []
-
-        # Retrieve the course details for each course the user has based on the course ID
-        if enrolld_courses:
-            for course_tuple in enrolld_courses:
-                course_id = course_tuple[0]
-                cur.execute("SELECT CourseName, PassingGrade, Active FROM Course WHERE CourseId = ?", (course_id,))
-                enrolld_course = cur.fetchone()
-                list_of_courses.append(Course(course_id, enrolld_course[0], enrolld_course[1], enrolld_course[2]))
-
-        # Retrieve the course and grade for each graded course for the user
-        cur.execute("SELECT c.CourseId, c.CourseName, c.PassingGrade, c.Active, g.Grade FROM " +
-                    "Course AS c, Grade AS g WHERE c.CourseId = g.CourseId AND g.UserId = ?", (stored_id,))
-        graded_courses = cur.fetchall()
-
-        list_of_graded_courses: list[Grade] = []
-
-        if graded_courses:
-            for course_tuple in graded_courses:
-                list_of_graded_courses.append(Grade(Course(course_tuple[0], course_tuple[1], course_tuple[2],
-                                                           course_tuple[3]), course_tuple[4]))
-
-        # Check the user's account type and initialize the corresponding object
-        if person_result[5] == 1:
-            user = Student(stored_id, person_result[0], person_result[1], person_result[2], person_result[3],
-                           person_result[4], full_degree, list_of_courses, list_of_graded_courses)
-        elif person_result[5] == 2:
-            user = Teacher(stored_id, person_result[0], person_result[1], person_result[2], person_result[3],
-                           person_result[4], [])
-        elif person_result[5] == 3:
-            user = Admin(stored_id, person_result[0], person_result[1], person_result[2], person_result[3],
-                         person_result[4])
-
-        # Check and return true if the password is correct, else return false
-        return bcrypt.checkpw(password, stored_hash_password)
-
-
-# Check if provided str is valid date format
-def validate_date(date_b: str) -> bool:
-    return checkers.is_date(date_b)
-
-
-# Check if provided str is valid email format
-def validate_email(email_u: str) -> bool:
-    return checkers.is_email(email_u)
-
-
-# Compare 2 hashed passwords to check if they are the same
-def validate_password(hash_pass1: bytes, hash_pass2: bytes) -> bool:
-    return bcrypt.checkpw(hash_pass1, hash_pass2)
-
-
-# Insert new user into 'User' database table with given personal and authentication details
-def create_new_user(firstname: str, surname: str, birth: str, email: str, password: bytes) -> None:
-    with sqlite3.connect(DBFILE) as conn:
-        cur = conn.cursor()
-        cur.execute("INSERT INTO User VALUES (null, ?, ?, ?, ?, null, ?, null)", (firstname, surname,
-                                                                                  birth, email, password))
-        conn.commit()
+# Frames of the window by name, each one is made, placed and set up the first time it is looked up,
+# so the first paint only waits for the main frame and not for the forms behind it
+class LazyFrames(dict):
+    def __init__(self, builders: dict[str, Callable[[ttk.Frame, "LazyFrames"], None]]) -> None:
+        super().__init__()
+        self.builders: dict[str, Callable[[ttk.Frame, "LazyFrames"], None]] = builders
+
+    def __missing__(self, name: str) -> ttk.Frame:
+        frame = self[name] = ttk.Frame(window)
+        # Place all frames in the same location
+        frame.grid(row=0, column=0, sticky='nsew')
+        self.builders[name](frame, self)
+        return frame
 
 
 # Set up initial GUI components and allow user to login or register
-def start() -> None:
-    # Create frames and store them in a dictionary for easy access
-    frames = {
-        "main": ttk.Frame(window),
-        "create_user": ttk.Frame(window),
-        "login": ttk.Frame(window),
-        "portal": ttk.Frame(window),
-    }
-
-    # Setup each frame
-    main_frame(frames["main"], frames)
-    create_user(frames["create_user"], frames)
-    login(frames["login"], frames)
-
-    # Place all frames in the same location
-    for frame in frames.values():
-        frame.grid(row=0, column=0, sticky='nsew')
-        window.grid_rowconfigure(0, weight=1)
-        window.grid_columnconfigure(0, weight=1)
+def start() -> LazyFrames:
+    # The portal frame is filled by user_portal on every login
+    frames = LazyFrames({
+        "main": main_frame,
+        "create_user": create_user,
+        "login": login,
+        "portal": lambda frame, frames: None,
+    })
+    window.grid_rowconfigure(0, weight=1)
+    window.grid_columnconfigure(0, weight=1)
 
     # Show the main frame initially
     frames["main"].tkraise()
-    window.mainloop()
+    return frames
 
 
 # Configure main frame of application, providing options for user account creation or login
@@ -451,37 +132,66 @@ def create_user(frame, frames) -> None:
     password2.pack(pady=(0, 5))
 
     # Button to submit entered information, with validation checks
-    ttk.Button(frame, text="Create user", command=lambda: validate_create(first_name.get().strip(),
-                                                                          surname.get().strip(),
-                                                                          birthdate.get().strip(), email.get().strip(),
-                                                                          password1.get().strip(),
-                                                                          password2.get().strip())).pack()
-    # Button to return to main menu
-    ttk.Button(frame, text="Back", command=lambda: frames["main"].tkraise()).pack(pady=5)
+    create_button = ttk.Button(frame, text="Create user",
+                               command=lambda: validate_create(first_name.get().strip(), surname.get().strip(),
+                                                               birthdate.get().strip(), email.get().strip(),
+                                                               password1.get().strip(), password2.get().strip()))
+    create_button.pack()
+    # Button to return to main menu, stops waiting for an account that is still being created
+    ttk.Button(frame, text="Back", command=lambda: go_back()).pack(pady=5)
 
     # Message label for user feedback on actions
     user_message = ttk.Label(frame, text="")
     user_message.pack()
 
+    # Busy indicator, shown while the password is hashed and the user is saved
+    progress = ttk.Progressbar(frame, mode="indeterminate", length=200)
+
+    # Account creation running in the background, if any
+    task: Optional[BackgroundTask] = None
+
+    def go_back() -> None:
+        if task is not None:
+            task.cancel()
+        frames["main"].tkraise()
+
+    # Hash the password once and save the user, runs in a worker thread
+    # Going back while the password is hashed saves nothing
+    def hash_and_create(cancelled: threading.Event, f_name: str, s_name: str, date_b: str, email_u: str,
+                        passw: str) -> None:
+        hash_pass: bytes = policy.hash(passw.encode("utf-8"))
+        if not cancelled.is_set():
+            create_new_user(f_name, s_name, date_b, email_u, hash_pass)
+
+    # Back on the Tk thread once the user is saved
+    def on_created(result: None) -> None:
+        # Clear fields after successful account creation
+        first_name.delete(0, "end")
+        surname.delete(0, "end")
+        birthdate.delete(0, "end")
+        email.delete(0, "end")
+        password1.delete(0, "end")
+        password2.delete(0, "end")
+        user_message.config(text="")
+        # Switch to login frame
+        frames["login"].tkraise()
+
+    def on_create_error(error: BaseException) -> None:
+        user_message.config(text="Could not create user, the email may already be in use")
+
     # Validate data entered by user when creating new account
     def validate_create(f_name: str, s_name: str, date_b: str, email_u: str, pass1: str, pass2: str) -> None:
+        nonlocal task
         if (f_name.isalpha() and f_name != "" and s_name.isalpha() and s_name != "" and validate_date(date_b) and
                 validate_email(email_u) and pass1 != "" and pass2 != ""):
-            salt = bcrypt.gensalt()
-            hash_pass: bytes = bcrypt.hashpw(pass2.encode("utf-8"), salt)
-            if validate_password(pass1.encode("utf-8"), hash_pass):
-                create_new_user(f_name, s_name, date_b, email_u, hash_pass)
-                # Clear fields after successful account creation
-                first_name.delete(0, "end")
-                surname.delete(0, "end")
-                birthdate.delete(0, "end")
-                email.delete(0, "end")
-                password1.delete(0, "end")
-                password2.delete(0, "end")
-                # Switch to login frame
-                frames["login"].tkraise()
-            else:
+            # Both entries must be the same, compared as plain text in constant time
+            if not passwords_match(pass1, pass2):
                 user_message.config(text="Wrong password")
+                return
+            user_message.config(text="Creating user...")
+            task = BackgroundTask(window, hash_and_create, f_name, s_name, date_b, email_u, pass2,
+                                  on_done=on_created, on_error=on_create_error, progress=progress,
+                                  disable=(create_button,), cancellable=True)
         elif not f_name.isalpha() or f_name == "" or not s_name.isalpha() or s_name == "":
             user_message.config(text="Missing name")
         elif not validate_date(date_b):
@@ -507,31 +217,67 @@ def login(frame, frames) -> None:
     password.pack(pady=(0, 5))
 
     # Button to submit login information, with validation checks
-    ttk.Button(frame, text="Login", command=lambda: validate_login(email.get().strip(), password.get().strip())).pack()
-    # Button to return to the main menu
-    ttk.Button(frame, text="Back", command=lambda: frames["main"].tkraise()).pack(pady=5)
+    login_button = ttk.Button(frame, text="Login",
+                              command=lambda: validate_login(email.get().strip(), password.get().strip()))
+    login_button.pack()
+    # Button to return to the main menu, stops waiting for a login that is still being checked
+    ttk.Button(frame, text="Back", command=lambda: go_back()).pack(pady=5)
 
     # Message label for user feedback on login actions
     user_message = ttk.Label(frame, text="")
     user_message.pack()
 
+    # Busy indicator, shown while the password is checked and the courses are loaded
+    progress = ttk.Progressbar(frame, mode="indeterminate", length=200)
+
+    # Login running in the background, if any
+    task: Optional[BackgroundTask] = None
+
+    def go_back() -> None:
+        if task is not None:
+            task.cancel()
+        frames["main"].tkraise()
+
+    # Check the password and load the user and the courses into a new session, runs in a worker thread
+    # Going back while the password is checked skips loading the courses
+    def check_and_load(cancelled: threading.Event, email_u: str, passw: bytes) -> Optional[Session]:
+        new_session = Session()
+        if not check_login(new_session, email_u, passw) or cancelled.is_set():
+            return None
+        # Call on getting all the courses
+        load_courses(new_session)
+        return new_session
+
+    # Back on the Tk thread once the login is checked, only then the new session is used
+    def on_checked(new_session: Optional[Session]) -> None:
+        global session
+        if new_session is not None:
+            session = new_session
+            # Clear entry fields on successful login
+            email.delete(0, "end")
+            password.delete(0, "end")
+            user_message.config(text="")
+            # Setup portal frame
+            user_portal(frames["portal"], frames)
+            # Switch to portal frame
+            frames["portal"].tkraise()
+        else:
+            user_message.config(text="Invalid email and/or password")
+
+    def on_login_error(error: BaseException) -> None:
+        if isinstance(error, LoginThrottled):
+            user_message.config(text=str(error))
+        else:
+            user_message.config(text="Could not log in, please try again")
+
     # Validate provided email and password against database records
     def validate_login(email_u: str, passw: str) -> None:
+        nonlocal task
         if validate_email(email_u) and passw != "":
-            if check_login(email_u, passw.encode("utf-8")):
-                # Clear entry fields on successful login
-                email.delete(0, "end")
-                password.delete(0, "end")
-
-                # Call on getting all the courses
-                get_all_courses()
-                get_all_courses_for_degree(user.id)
-                # Setup portal frame
-                user_portal(frames["portal"], frames)
-                # Switch to portal frame
-                frames["portal"].tkraise()
-            else:
-                user_message.config(text="Invalid email and/or password")
+            user_message.config(text="Logging in...")
+            task = BackgroundTask(window, check_and_load, email_u, passw.encode("utf-8"), on_done=on_checked,
+                                  on_error=on_login_error, progress=progress, disable=(login_button,),
+                                  cancellable=True)
         elif not validate_email(email_u):
             user_message.config(text="Invalid email and/or password")
         else:
@@ -574,9 +320,17 @@ def user_portal(frame, frames) -> None:
                         command=lambda: update_content(content_frame, "courses"))
     courses.pack(pady=(15, 0))
 
-    # "Grades" button to update content frame with grades-related information
-    grades = tk.Button(sidebar, text="Grades", bg="#C9C9C9", font=custom_font1,
-                       command=lambda: update_content(content_frame, "grades"))
+    # "Grades" button to update content frame with grades-related information, teachers get their gradebook
+    # and admins the enrollment requests waiting for approval
+    if isinstance(session.user, Admin):
+        grades = tk.Button(sidebar, text="Approvals", bg="#C9C9C9", font=custom_font1,
+                           command=lambda: update_content(content_frame, "approvals"))
+    elif isinstance(session.user, Teacher):
+        grades = tk.Button(sidebar, text="Gradebook", bg="#C9C9C9", font=custom_font1,
+                           command=lambda: update_content(content_frame, "gradebook"))
+    else:
+        grades = tk.Button(sidebar, text="Grades", bg="#C9C9C9", font=custom_font1,
+                           command=lambda: update_content(content_frame, "grades"))
     grades.pack(pady=(15, 0))
 
     # "Sign Out" button to quit application
@@ -605,6 +359,14 @@ def update_content(content_frame: tk.Frame, context: str) -> None:
         # Load user grades information into content frame
         user_grades(content_frame)
 
+    elif context == "gradebook":
+        # Load the gradebook of the teacher's courses into content frame
+        user_gradebook(content_frame)
+
+    elif context == "approvals":
+        # Load the enrollment requests waiting for approval into content frame
+        admin_approvals(content_frame)
+
 
 # Function to display user account in content frame
 def user_account(content_frame: tk.Frame) -> None:
@@ -631,6 +393,7 @@ def user_account_detail(frame00: tk.Frame) -> None:
     frame01.pack(pady=(15, 15), side=tk.LEFT, fill=tk.X, expand=True, anchor="nw")
 
     # Displaying user ID, name and birthdate
+    user = session.user
     tk.Label(frame01, text=f"ID: {user.id}", font=custom_font2).pack(pady=(15, 0), padx=15, anchor="nw")
     tk.Label(frame01, text=f"Name: {user.name} {user.surname}", font=custom_font2).pack(pady=(15, 0), padx=15,
                                                                                         anchor="nw")
@@ -644,7 +407,8 @@ def user_account_detail(frame00: tk.Frame) -> None:
     tk.Label(frame02, text=f"Email: {user.email}", font=custom_font2).pack(pady=(15, 0), padx=15, anchor="nw")
     tk.Label(frame02, text=f"University Email: {user.uniEmail}", font=custom_font2).pack(pady=(15, 0), padx=15,
                                                                                          anchor="nw")
-    tk.Label(frame02, text=f"Degree: {user.degree}", font=custom_font2).pack(pady=(15, 0), padx=15, anchor="nw")
+    if hasattr(user, "degree"):
+        tk.Label(frame02, text=f"Degree: {user.degree}", font=custom_font2).pack(pady=(15, 0), padx=15, anchor="nw")
 
 
 def user_account_setting(frame10: tk.Frame, frame20: tk.Frame, content_frame: tk.Frame) -> None:
@@ -671,10 +435,17 @@ def user_account_setting(frame10: tk.Frame, frame20: tk.Frame, content_frame: tk
     setting_message = tk.Label(content_frame, text="")
     setting_message.pack()
 
+    # Save the settings in the background, the new password is hashed there
+    def save() -> None:
+        setting_message.config(text="Saving...")
+        BackgroundTask(window, change_user_settings, session, email.get().strip(), password1.get(), password2.get(),
+                       on_done=lambda message: setting_message.config(text=message),
+                       on_error=lambda error: setting_message.config(text=f"Could not save the settings: {error}"),
+                       disable=(save_button,))
+
     # Save button to trigger saving of user settings
-    tk.Button(content_frame, text="Save", bg="#C9C9C9", font=custom_font2,
-              command=lambda: setting_message.config(text=save_user_settings(email.get(), password1.get(),
-                                                                             password2.get()))).pack()
+    save_button = tk.Button(content_frame, text="Save", bg="#C9C9C9", font=custom_font2, command=save)
+    save_button.pack()
 
 
 # Function to display user courses in content frame
@@ -699,58 +470,36 @@ def user_courses(content_frame: tk.Frame) -> None:
     filter_b.pack(side=tk.LEFT, padx=(0, 5))
 
     filter_combobox = ttk.Combobox(frame03, font=custom_font2, values=FILTER_OPTIONS, state='readonly')
-    filter_combobox.current(select_filter_value)
+    filter_combobox.current(session.select_filter_value)
     filter_combobox.pack(padx=15, anchor="nw", side=tk.LEFT)
     filter_combobox.bind("<<ComboboxSelected>>", filter_courses)
 
     # Function to handle filtering of courses based on search criteria and selected filter
     def handle_filter() -> None:
-        global select_filter_value
-        global courses_filter_list
-        search_list: list[Course] = []
-        select_filter_value = filter_combobox.current()
+        session.select_filter_value = filter_combobox.current()
         search_cat: str = search.get()
-        if search_cat != "":
-            select_filter_value = 0
-            courses_filter_list.clear()
-            for item in all_courses_list:
-                if re.search(fr"^{search_cat}[a-zA-Z ]+$", item.name, re.IGNORECASE):
-                    search_list.append(Course(item.id, item.name, item.passing_grade, item.active_status))
-            courses_filter_list = search_list
+        if search_cat.strip() != "":
+            session.select_filter_value = 0
+            # Look the courses up in the full text index of the database
+            session.courses_filter_list = CourseView(search_courses(db_manager.connection(), search_cat))
         update_content(content_frame, "courses")
 
-    # Displaying filtered courses in content frame
-    for course in courses_filter_list:
-        frame10 = tk.Frame(content_frame)
-        frame10.pack(side=tk.TOP, fill=tk.X, anchor="n")
-        frame11 = tk.Frame(frame10, bg="#C9C9C9")
-        frame11.pack(pady=(15, 15), padx=(15, 15), side=tk.LEFT, fill=tk.X, expand=True, anchor="nw")
-        tk.Label(frame11, text=f"{course.name} - Active: {'Yes' if course.active_status == 1 else 'No'}",
-                 font=custom_font2, bg="#C9C9C9").pack(padx=15, anchor="nw")
+    # Displaying filtered courses in content frame, only the rows in view get widgets
+    # All courses are read page by page as the list is scrolled down
+    courses = session.courses_filter_list
+    VirtualList(content_frame, courses,
+                lambda course: (f"{course.name} - Active: {'Yes' if course.active_status == 1 else 'No'}",),
+                font=custom_font2, anchors=("nw",),
+                load_more=courses.load_more if isinstance(courses, CoursePager) else None
+                ).pack(side=tk.TOP, fill=tk.X, anchor="n")
 
 
 def filter_courses(event) -> None:
-    # Global list to hold filtered courses
-    global courses_filter_list
     # Get selected filter option from event widget
     option = event.widget.get()
-    # Match selected filter option and update courses_filter_list accordingly
-    match option:
-        case "All courses":
-            # If "All courses" is selected, clear and copy all courses to filter list
-            courses_filter_list.clear()
-            courses_filter_list = copy.deepcopy(all_courses_list)
-        case "Courses for degree":
-            # If "Courses for degree" is selected, clear and copy degree courses to filter list
-            courses_filter_list.clear()
-            courses_filter_list = copy.deepcopy(all_courses_for_degree_list)
-        case "Courses I am taking":
-            # If "Courses I am taking" is selected, clear and copy user's courses to filter list
-            courses_filter_list.clear()
-            courses_filter_list = copy.deepcopy(user.courses)
-        case _:
-            # For any other option, just clear filter list
-            courses_filter_list.clear()
+    # Show a read-only view of the matching course list, the courses are shared instead of copied
+    session.courses_filter_list = filter_view(option, session.all_courses_list, session.all_courses_for_degree_list,
+                                              session.user.courses)
 
 
 # Function to display user grades in content frame
@@ -766,48 +515,240 @@ def user_grades(content_frame: tk.Frame) -> None:
     # Adding label to display "Current Courses"
     tk.Label(frame01, text="Current Courses", font=custom_font2).pack(padx=15, anchor="n")
 
-    # Loop through user's current courses to display each course and its grade
-    for course in user.courses:
-        # Creating and packing frame for each course
-        frame02 = tk.Frame(frame00, bg="#C9C9C9")
-        frame02.pack(pady=(15, 0), padx=(15, 15), side=tk.TOP, fill=tk.X, expand=True, anchor="nw")
+    # Adding label with the grade summary, computed when the grades were loaded
+    user = session.user
+    average: str = f"{user.weighted_average:.1f}" if user.weighted_average is not None else "-"
+    tk.Label(frame01, text=f"Weighted average: {average}, Passed: {user.passed_count}, "
+                           f"Failed: {user.failed_count}, Credits earned: {user.credits_earned}",
+             font=custom_font2).pack(padx=15, anchor="n")
+
+    # Display each of the user's current courses with its grade, only the rows in view get widgets
+    VirtualList(frame00, user.courses, lambda course: (course.name, grade_context(course)),
+                font=custom_font2).pack(side=tk.TOP, fill=tk.X, expand=True, anchor="nw")
 
-        # Creating and packing subframes within course frame for course name and grade
-        frame021 = tk.Frame(frame02, bg="#C9C9C9")
-        frame021.pack(pady=(15, 15), padx=(15, 15), side=tk.LEFT, fill=tk.X, expand=True, anchor="nw")
-        frame022 = tk.Frame(frame02, bg="#C9C9C9")
-        frame022.pack(pady=(15, 15), padx=(15, 15), side=tk.RIGHT, fill=tk.X, expand=True, anchor="ne")
 
-        # Adding labels to display course name and grade
-        tk.Label(frame021, text=course.name, font=custom_font2, bg="#C9C9C9").pack(padx=15, anchor="nw")
-        tk.Label(frame022, text=grade_context(course), font=custom_font2, bg="#C9C9C9").pack(padx=15, anchor="ne")
+# Function to display the gradebook of a course the teacher teaches in content frame
+# The roster is loaded and saved in the worker pool, edits are kept until Save writes them in one batch
+def user_gradebook(content_frame: tk.Frame) -> None:
+    frame00 = tk.Frame(content_frame)
+    frame00.pack(pady=(15, 15), side=tk.TOP, fill=tk.X, anchor="nw")
+    frame01 = tk.Frame(content_frame)
+    frame01.pack(pady=(0, 15), side=tk.TOP, fill=tk.BOTH, expand=True, anchor="nw")
+
+    # Course picker, save button and messages
+    courses: list[Course] = session.user.courses
+    tk.Label(frame00, text="Gradebook", font=custom_font2).pack(padx=15, side=tk.LEFT)
+    course_combobox = ttk.Combobox(frame00, font=custom_font2, state="readonly", width=30,
+                                   values=[course.name for course in courses])
+    course_combobox.pack(padx=15, side=tk.LEFT)
+    save_button = tk.Button(frame00, text="Save", bg="#C9C9C9", font=custom_font2, state="disabled")
+    save_button.pack(padx=15, side=tk.LEFT)
+    message = tk.Label(content_frame, text="" if courses else "You are not assigned to any course",
+                       font=custom_font2)
+    message.pack(side=tk.TOP, anchor="nw", padx=15)
+    progress = ttk.Progressbar(content_frame, mode="indeterminate")
+
+    # One row per student, Treeview items are not widgets so large classes stay fast
+    tree = ttk.Treeview(frame01, columns=("student", "email", "grade", "result"), show="headings", height=15)
+    for column, heading, width in (("student", "Student", 220), ("email", "University Email", 220),
+                                   ("grade", "Grade", 80), ("result", "Result", 80)):
+        tree.heading(column, text=heading)
+        tree.column(column, width=width, anchor="w" if column in ("student", "email") else "center")
+    tree_scrollbar = ttk.Scrollbar(frame01, orient="vertical", command=tree.yview)
+    tree.configure(yscrollcommand=tree_scrollbar.set)
+    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(15, 0))
+    tree_scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+
+    # Roster shown in the tree and the grades changed since it was loaded, by user id
+    state: dict = {"roster": None}
+    edits: dict[int, Optional[int]] = {}
+
+    def result_text(roster: Roster, grade: Optional[int]) -> str:
+        if grade is None:
+            return "-"
+        return "Passed" if roster.passed(grade) else "Failed"
+
+    def show_roster(roster: Roster) -> None:
+        state["roster"] = roster
+        edits.clear()
+        tree.delete(*tree.get_children())
+        for entry in roster.entries:
+            tree.insert("", "end", iid=str(entry.user_id),
+                        values=(f"{entry.first_name} {entry.surname}", entry.uni_email,
+                                "" if entry.grade is None else entry.grade, result_text(roster, entry.grade)))
+        message.config(text=f"{len(roster.entries)} students, passing grade {roster.course.passing_grade}")
+        save_button.config(state="normal")
+
+    def on_error(error: BaseException) -> None:
+        if isinstance(error, GradebookError):
+            message.config(text="; ".join(error.problems[:3]))
+        else:
+            message.config(text="The gradebook could not be loaded or saved, try again")
+
+    def select_course(event) -> None:
+        save_button.config(state="disabled")
+        BackgroundTask(window, load_gradebook, session, courses[course_combobox.current()].id,
+                       on_done=show_roster, on_error=on_error, progress=progress, disable=(course_combobox,))
+
+    # Edit a grade in place with an entry over the grade cell, an empty grade clears it
+    def edit_grade(event) -> None:
+        item: str = tree.identify_row(event.y)
+        if not item or tree.identify_column(event.x) != "#3":
+            return
+        x, y, width, height = tree.bbox(item, "grade")
+        entry = ttk.Entry(tree, justify="center")
+        entry.insert(0, tree.set(item, "grade"))
+        entry.place(x=x, y=y, width=width, height=height)
+        entry.focus_set()
+
+        def finish(event) -> None:
+            # Return destroys the entry, which also ends in a FocusOut
+            if not entry.winfo_exists():
+                return
+            text: str = entry.get().strip()
+            entry.destroy()
+            if text != "" and not text.isdigit():
+                message.config(text="A grade must be a whole number between 0 and 100")
+                return
+            grade: Optional[int] = int(text) if text else None
+            edits[int(item)] = grade
+            tree.set(item, "grade", "" if grade is None else grade)
+            tree.set(item, "result", result_text(state["roster"], grade))
+            message.config(text=f"{len(edits)} unsaved changes")
+
+        entry.bind("<Return>", finish)
+        entry.bind("<FocusOut>", finish)
+        entry.bind("<Escape>", lambda event: entry.destroy())
+
+    def on_saved(result: SaveResult) -> None:
+        edits.clear()
+        message.config(text=str(result))
+
+    def save() -> None:
+        if not edits:
+            message.config(text="No changes to save")
+            return
+        BackgroundTask(window, save_gradebook, session, state["roster"].course.id, dict(edits),
+                       on_done=on_saved, on_error=on_error, progress=progress, disable=(save_button, course_combobox))
+
+    course_combobox.bind("<<ComboboxSelected>>", select_course)
+    tree.bind("<Double-1>", edit_grade)
+    save_button.config(command=save)
+
+
+# Function to display the enrollment requests waiting for approval in content frame
+# Requests are listed a page at a time and approved or rejected in one transaction, either the selected
+# ones or every request matching the filter
+def admin_approvals(content_frame: tk.Frame) -> None:
+    frame00 = tk.Frame(content_frame)
+    frame00.pack(pady=(15, 15), side=tk.TOP, fill=tk.X, anchor="nw")
+    frame01 = tk.Frame(content_frame)
+    frame01.pack(pady=(0, 15), side=tk.TOP, fill=tk.BOTH, expand=True, anchor="nw")
+    frame02 = tk.Frame(content_frame)
+    frame02.pack(pady=(0, 15), side=tk.TOP, fill=tk.X, anchor="nw")
+
+    # Filters on the course and on the degree of the student, the first option of each is no filter
+    courses: list[Course] = catalog().courses()
+    degrees: list[tuple[tuple[int, int, int], str]] = sorted(catalog().degree_names().items(),
+                                                             key=lambda item: item[1])
+    tk.Label(frame00, text="Course", font=custom_font2).pack(padx=(15, 5), side=tk.LEFT)
+    course_combobox = ttk.Combobox(frame00, font=custom_font2, state="readonly", width=25,
+                                   values=["Any course"] + [course.name for course in courses])
+    course_combobox.current(0)
+    course_combobox.pack(side=tk.LEFT)
+    tk.Label(frame00, text="Degree", font=custom_font2).pack(padx=(15, 5), side=tk.LEFT)
+    degree_combobox = ttk.Combobox(frame00, font=custom_font2, state="readonly", width=30,
+                                   values=["Any degree"] + [name for _, name in degrees])
+    degree_combobox.current(0)
+    degree_combobox.pack(side=tk.LEFT)
+
+    tree = ttk.Treeview(frame01, columns=("student", "course", "start"), show="headings", height=15,
+                        selectmode="extended")
+    for column, heading, width in (("student", "Student", 240), ("course", "Course", 280), ("start", "Start", 100)):
+        tree.heading(column, text=heading)
+        tree.column(column, width=width, anchor="w")
+    tree_scrollbar = ttk.Scrollbar(frame01, orient="vertical", command=tree.yview)
+    tree.configure(yscrollcommand=tree_scrollbar.set)
+    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(15, 0))
+    tree_scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+
+    message = tk.Label(content_frame, text="", font=custom_font2)
+    message.pack(side=tk.TOP, anchor="nw", padx=15)
+    progress = ttk.Progressbar(content_frame, mode="indeterminate")
+
+    # Requests shown in the tree by item id, and the key to continue the listing after
+    shown: dict[str, PendingRequest] = {}
+    state: dict = {"after": None, "total": 0}
+
+    def current_filter() -> tuple[Optional[int], Optional[tuple[int, int, int]]]:
+        course_index, degree_index = course_combobox.current(), degree_combobox.current()
+        return (courses[course_index - 1].id if course_index > 0 else None,
+                degrees[degree_index - 1][0] if degree_index > 0 else None)
+
+    def show_page(result: tuple[list[PendingRequest], int]) -> None:
+        requests, state["total"] = result
+        for request in requests:
+            item: str = tree.insert("", "end", values=(f"{request.first_name} {request.surname}",
+                                                       request.course_name, request.start_date))
+            shown[item] = request
+        if requests:
+            last = requests[-1]
+            state["after"] = (last.course_id, last.user_id, last.start_date)
+        message.config(text=f"Showing {len(shown)} of {state['total']} requests")
+
+    def on_error(error: BaseException) -> None:
+        message.config(text="The requests could not be loaded or changed, try again")
+
+    def load(more: bool = False) -> None:
+        if not more:
+            tree.delete(*tree.get_children())
+            shown.clear()
+            state["after"] = None
+        course_id, degree = current_filter()
+        BackgroundTask(window, list_pending_requests, session, course_id, degree, state["after"],
+                       on_done=show_page, on_error=on_error, progress=progress, disable=buttons)
+
+    def on_changed(verb: str) -> Callable[[int], None]:
+        def done(count: int) -> None:
+            load()
+            message.config(text=f"{verb} {count} requests")
+        return done
+
+    def change(handle: Callable[..., int], verb: str, everything: bool) -> None:
+        course_id, degree = current_filter()
+        keys = None if everything else [shown[item].key for item in tree.selection()]
+        if keys == []:
+            message.config(text="Select the requests first")
+            return
+        BackgroundTask(window, handle, session, keys, course_id, degree, on_done=on_changed(verb),
+                       on_error=on_error, progress=progress, disable=buttons)
+
+    buttons: tuple[tk.Button, ...] = (
+        tk.Button(frame02, text="Approve selected", bg="#C9C9C9", font=custom_font2,
+                  command=lambda: change(approve_requests, "Approved", False)),
+        tk.Button(frame02, text="Reject selected", bg="#C9C9C9", font=custom_font2,
+                  command=lambda: change(reject_requests, "Rejected", False)),
+        tk.Button(frame02, text="Approve all matching", bg="#C9C9C9", font=custom_font2,
+                  command=lambda: change(approve_requests, "Approved", True)),
+        tk.Button(frame02, text="Show more", bg="#C9C9C9", font=custom_font2, command=lambda: load(more=True)),
+    )
+    for button in buttons:
+        button.pack(padx=(15, 0), side=tk.LEFT)
+
+    course_combobox.bind("<<ComboboxSelected>>", lambda event: load())
+    degree_combobox.bind("<<ComboboxSelected>>", lambda event: load())
+    load()
 
 
 # Function to get grade context for a given course
 def grade_context(course: Course) -> str:
-    # Iterate through user's grades to find grade for specified course
-    for grade in user.grades:
-        if grade.course.name == course.name:
-            return f"{grade.grades}/100"
+    # Look up the grade for the course in the user's grade index
+    grade = session.user.grade_for(course.id)
+    if grade is not None:
+        return f"{grade.grades}/100"
     # Return default value if no grade is found for course
     return f"-/100"
 
 
-# Function to save user settings (email and password)
-def save_user_settings(email_u: str, pass1: str, pass2: str) -> str:
-    # Validate email and password lengths and return appropriate messages
-    if not validate_email(email_u) and (len(pass1) < 8 or len(pass2) < 8):
-        return ""
-    elif validate_email(email_u) and (len(pass1) > 7 and len(pass2) > 7) and (len(pass1) == len(pass2)):
-        return "Updated email and password"
-    elif validate_email(email_u) and (len(pass1) < 8 or len(pass2) < 8):
-        return "Updated email"
-    elif (not validate_email(email_u) or email_u == "") and (len(pass1) > 7 and len(pass2) > 7) and (
-            len(pass1) == len(pass2)):
-        return "Update password"
-    else:
-        return ""
-
-
 if __name__ == "__main__":
     main()
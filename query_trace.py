@@ -0,0 +1,197 @@
+import atexit
+import functools
+import os
+import re
+import sys
+import threading
+import time
+from typing import Optional, TextIO
+
+# Set to 1 to trace every SQL statement and print a summary on exit
+TRACE_VARIABLE: str = "ROLL_CALL_TRACE"
+
+# Set to a file path to also write the trace as Prometheus text on exit
+TRACE_FILE_VARIABLE: str = "ROLL_CALL_TRACE_FILE"
+
+# Upper bounds of the latency histogram buckets in milliseconds, the last bucket is +Inf
+BUCKETS_MS: tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+
+# Frames of these files are skipped when looking for the function that ran a statement
+SKIPPED_FILES: frozenset[str] = frozenset(("db.py", "query_trace.py"))
+
+# Distinct SQL strings whose normalized form is kept, the least recently used ones are normalized again
+NORMALIZED_CACHE_SIZE: int = 1024
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+# Reduce a statement to its shape, so calls that only differ in values or IN list length share one entry
+@functools.lru_cache(maxsize=NORMALIZED_CACHE_SIZE)
+def normalize_sql(sql: str) -> str:
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PARAMETER_LIST.sub("(?)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+# Return "module.function" of the first caller outside the database layer
+def calling_function(depth: int = 2) -> str:
+    frame = sys._getframe(depth)
+    while frame is not None:
+        code = frame.f_code
+        file_name: str = os.path.basename(code.co_filename)
+        if file_name not in SKIPPED_FILES:
+            return f"{os.path.splitext(file_name)[0]}.{code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+# Counts and latency histogram of one statement run from one function
+class StatementStats:
+    __slots__ = ("count", "total_ms", "max_ms", "buckets")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.total_ms: float = 0.0
+        self.max_ms: float = 0.0
+        self.buckets: list[int] = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        for index, bound in enumerate(BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[index] += 1
+                return
+        self.buckets[-1] += 1
+
+    def merge(self, other: "StatementStats") -> None:
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.buckets = [mine + theirs for mine, theirs in zip(self.buckets, other.buckets)]
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+
+# Records every statement run through the counting cursors of db.py
+# Latency is the time of the execute call, for a SELECT that is the time until the first row is ready
+class QueryTracer:
+    def __init__(self) -> None:
+        self.stats: dict[tuple[str, str], StatementStats] = {}
+        self._lock = threading.Lock()
+
+    def __str__(self) -> str:
+        return f"Query tracer: {sum(stats.count for stats in self.stats.values())} statements traced"
+
+    def record(self, sql: str, elapsed_ms: float, caller: str) -> None:
+        normalized: str = normalize_sql(sql)
+        with self._lock:
+            stats = self.stats.get((normalized, caller))
+            if stats is None:
+                stats = self.stats[(normalized, caller)] = StatementStats()
+            stats.add(elapsed_ms)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stats = {}
+
+    # Stats grouped by "statement", by "caller", or by both, slowest total first
+    def totals(self, by: str = "both") -> list[tuple[str, str, StatementStats]]:
+        if by not in ("both", "statement", "caller"):
+            raise ValueError("by must be both, statement or caller")
+        grouped: dict[tuple[str, str], StatementStats] = {}
+        with self._lock:
+            for (statement, caller), stats in self.stats.items():
+                key = (statement if by != "caller" else "", caller if by != "statement" else "")
+                grouped.setdefault(key, StatementStats()).merge(stats)
+        return sorted(((statement, caller, stats) for (statement, caller), stats in grouped.items()),
+                      key=lambda entry: entry[2].total_ms, reverse=True)
+
+    # Readable table of the slowest entries
+    def summary(self, by: str = "both", limit: int = 30, width: int = 80) -> str:
+        lines: list[str] = [f"{'calls':>8}{'total ms':>12}{'mean ms':>10}{'max ms':>10}  caller / statement"]
+        for statement, caller, stats in self.totals(by)[:limit]:
+            label: str = " ".join(part for part in (caller, statement) if part)
+            if len(label) > width:
+                label = label[:width - 3] + "..."
+            lines.append(f"{stats.count:>8}{stats.total_ms:>12.2f}{stats.mean_ms:>10.3f}{stats.max_ms:>10.3f}"
+                         f"  {label}")
+        return "\n".join(lines)
+
+    # Prometheus text exposition of the latency histograms, in seconds like Prometheus expects
+    def prometheus(self) -> str:
+        name: str = "roll_call_sql_duration_seconds"
+        lines: list[str] = [f"# HELP {name} Time to execute an SQL statement of the portal.",
+                            f"# TYPE {name} histogram"]
+        for statement, caller, stats in self.totals():
+            labels: str = f'caller="{prometheus_escape(caller)}",statement="{prometheus_escape(statement)}"'
+            cumulative: int = 0
+            for bound, count in zip(BUCKETS_MS, stats.buckets):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound / 1000:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {stats.count}')
+            lines.append(f"{name}_sum{{{labels}}} {stats.total_ms / 1000:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {stats.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.prometheus())
+
+
+def prometheus_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Tracer the cursors report to, None when tracing is off so an untraced statement costs one attribute lookup
+tracer: Optional[QueryTracer] = None
+
+
+# Start tracing, optionally printing the summary and writing the Prometheus file on exit
+def enable(summary_on_exit: bool = False, prometheus_path: Optional[str] = None,
+           output: TextIO = sys.stderr) -> QueryTracer:
+    global tracer
+    if tracer is None:
+        tracer = QueryTracer()
+    if summary_on_exit or prometheus_path:
+        atexit.register(dump, tracer, summary_on_exit, prometheus_path, output)
+    return tracer
+
+
+def disable() -> None:
+    global tracer
+    tracer = None
+
+
+def dump(trace: QueryTracer, summary: bool, prometheus_path: Optional[str], output: TextIO) -> None:
+    if summary:
+        print(trace.summary(), file=output)
+    if prometheus_path:
+        trace.write_prometheus(prometheus_path)
+
+
+# Time one statement, used by the cursors in db.py when a tracer is set
+def timed(trace: QueryTracer, function, sql: str, *args):
+    start: float = time.perf_counter()
+    try:
+        return function(sql, *args)
+    finally:
+        trace.record(sql, (time.perf_counter() - start) * 1000, calling_function())
+
+
+def enable_from_env() -> None:
+    prometheus_path: str = os.environ.get(TRACE_FILE_VARIABLE, "")
+    if os.environ.get(TRACE_VARIABLE, "") not in ("", "0") or prometheus_path:
+        enable(summary_on_exit=os.environ.get(TRACE_VARIABLE, "") not in ("", "0"),
+               prometheus_path=prometheus_path or None)
+
+
+enable_from_env()
@@ -0,0 +1,322 @@
+import sqlite3
+import threading
+from typing import TYPE_CHECKING, Iterable, Mapping, Optional
+import validators
+from Course import Course
+from course_filter import CoursePager
+from Session import Session
+from Teacher import Teacher
+from Admin import Admin
+from user_profile import find_login, load_profile
+from catalog_cache import CatalogCache
+from gradebook import Roster, SaveResult, load_roster, save_grades
+from approval_queue import PendingRequest, RequestKey, approve, count_pending, list_pending, reject
+from db import ConnectionManager
+from migrations import migrate
+import session_tokens
+import login_throttle
+from password_policy import passwords_match, policy
+
+if TYPE_CHECKING:
+    from write_queue import WriteQueue
+
+# Data access and domain logic of the portal, without any GUI
+# Importing this module opens no window and needs no display, the functions keep no state of their own
+# and can be called from many threads: every thread gets its own connection from db_manager
+
+# Constant for database file path
+DBFILE: str = "roll_call.db"
+
+# Shared connections to the database, one per thread
+db_manager: ConnectionManager = ConnectionManager(DBFILE)
+
+COURSE_COLUMNS: str = "c.CourseId, c.CourseName, c.PassingGrade, c.Active, c.Credits"
+
+# Courses per page of the paged course listing
+COURSE_PAGE_SIZE: int = 50
+
+# Keyset queries of the paged course listing, by id or by name (case insensitive, then id)
+# Both continue after the key of the last course of the previous page, so every page is an index range
+# scan that costs the same no matter how deep into the catalog it is, unlike OFFSET
+COURSE_PAGE_QUERIES: dict[str, tuple[str, str]] = {
+    "id": (f"SELECT {COURSE_COLUMNS} FROM Course AS c ORDER BY c.CourseId LIMIT ?",
+           f"SELECT {COURSE_COLUMNS} FROM Course AS c WHERE c.CourseId > ? ORDER BY c.CourseId LIMIT ?"),
+    "name": (f"SELECT {COURSE_COLUMNS} FROM Course AS c ORDER BY c.CourseName COLLATE NOCASE, c.CourseId LIMIT ?",
+             f"SELECT {COURSE_COLUMNS} FROM Course AS c WHERE (c.CourseName, c.CourseId) > (? COLLATE NOCASE, ?) " +
+             "ORDER BY c.CourseName COLLATE NOCASE, c.CourseId LIMIT ?"),
+}
+
+# Types of the values of the key a page continues after, per order
+COURSE_PAGE_KEYS: dict[str, tuple[type, ...]] = {"id": (int,), "name": (str, int)}
+
+# Catalog of the database of db_manager, made again when db_manager is replaced
+_catalog: Optional[CatalogCache] = None
+
+# Writer thread of the database of db_manager, made again when db_manager is replaced
+# Made with the first write, so reading and the GUI start without importing concurrent.futures
+_writer: Optional["WriteQueue"] = None
+_writer_lock = threading.Lock()
+
+
+# Function to create the database with the required Tables and Fields and the required starting data,
+# or to upgrade an existing database to the newest schema version
+def create_database() -> None:
+    migrate(db_manager.connection())
+
+
+# Return the write queue of the current database, new users, new courses and settings changes go through its
+# writer thread (gradebook saves, approvals and bulk imports still write on their own connections)
+# A queue whose writer thread stopped is replaced, so writes never wait on a thread that is gone
+def write_queue() -> "WriteQueue":
+    global _writer
+    from write_queue import WriteQueue
+    with _writer_lock:
+        if _writer is None or _writer.manager is not db_manager or not _writer.alive:
+            if _writer is not None:
+                _writer.close()
+            _writer = WriteQueue(db_manager)
+        return _writer
+
+
+# Insert a new, active course into the database, returns its id
+def insert_course(course_name: str, passing_grade: int) -> int:
+    return write_queue().write(insert_course_row, course_name, passing_grade)
+
+
+def insert_course_row(cur: sqlite3.Cursor, course_name: str, passing_grade: int) -> int:
+    cur.execute("INSERT INTO Course (CourseName, PassingGrade, Active) VALUES (?, ?, 1)",
+                (course_name, passing_grade))
+    return cur.lastrowid
+
+
+def to_courses(rows: list[tuple]) -> list[Course]:
+    return [Course(row[0], row[1], row[2], row[3], row[4]) for row in rows]
+
+
+# Return the in-memory catalog of the current database
+def catalog() -> CatalogCache:
+    global _catalog
+    if _catalog is None or _catalog.manager is not db_manager:
+        _catalog = CatalogCache(db_manager)
+    return _catalog
+
+
+# Retrieve all the courses from the database, served from the catalog cache
+def get_all_courses() -> list[Course]:
+    return catalog().courses()
+
+
+# Retrieve one page of courses ordered by "id" or "name", starting after the key of the previous page
+# Returns the courses and the key to pass for the next page, the key is None after the last page
+def list_courses_page(after: Optional[tuple] = None, limit: int = COURSE_PAGE_SIZE,
+                      order: str = "id") -> tuple[list[Course], Optional[tuple]]:
+    if order not in COURSE_PAGE_QUERIES:
+        raise ValueError(f"Unknown course order {order}, use one of {', '.join(COURSE_PAGE_QUERIES)}")
+    first_page, next_page = COURSE_PAGE_QUERIES[order]
+    kinds: tuple[type, ...] = COURSE_PAGE_KEYS[order]
+    if after is not None and (len(after) != len(kinds) or
+                              any(type(value) is not kind for value, kind in zip(after, kinds))):
+        raise ValueError(f"The key of a page by {order} is [{', '.join(kind.__name__ for kind in kinds)}]")
+
+    with db_manager.connection() as conn:
+        cur = conn.cursor()
+        if after is None:
+            cur.execute(first_page, (limit,))
+        else:
+            cur.execute(next_page, (*after, limit))
+        courses = to_courses(cur.fetchall())
+
+    if len(courses) < limit:
+        return courses, None
+    last = courses[-1]
+    return courses, ((last.id,) if order == "id" else (last.name, last.id))
+
+
+# Retrieve all the courses for the degree of the user
+def get_all_courses_for_degree(user_id: int) -> list[Course]:
+    with db_manager.connection() as conn:
+        cur = conn.cursor()
+
+        # Retrieve the full degree from user
+        cur.execute("SELECT BaseId, DegreeBNId, TypeId FROM Degree WHERE UserId = ?", (user_id,))
+        degree_for_user = cur.fetchone()
+        if degree_for_user is None:
+            return []
+
+    # The courses for the specific degree come from the catalog cache
+    return catalog().courses_for_degree(degree_for_user)
+
+
+# Fill the course lists of the session for its logged-in user
+# All courses are paged, only the first page is read here and the rest as the user scrolls
+def load_courses(session: Session) -> None:
+    session.all_courses_list = CoursePager(list_courses_page)
+    session.all_courses_for_degree_list = get_all_courses_for_degree(session.user.id)
+
+
+# Checks the login credentials, retrieves user details from the database and sets the user of the session based
+# on the role (Student, Teacher, Admin)
+# The whole profile is loaded with at most user_profile.PROFILE_QUERY_BUDGET statements once the catalog is cached
+# Attempts go through the login throttle first, which raises LoginThrottled for a client or account that tried
+# too often, client is the address of the caller for the API, logins from the application share one client
+def check_login(session: Session, email: str, password: bytes, client: str = login_throttle.LOCAL_CLIENT) -> bool:
+    if not login_throttle.throttle.admit(email, client):
+        return False
+    return verify_login(session, email, password)
+
+
+# The part of check_login after the throttle: checks the credentials, loads the user into the session
+# and records the outcome in the throttle
+def verify_login(session: Session, email: str, password: bytes) -> bool:
+    # Connect to the database and go through User to find password by email
+    with db_manager.connection() as conn:
+        cur = conn.cursor()
+        # If you found the Email, put the login row in the result, else put None in the result
+        result = find_login(cur, email)
+
+        # If the result is None, then the Email was wrong, and return False
+        if result is None:
+            login_throttle.throttle.record_unknown(email)
+            return False
+
+        # Check the password before loading the rest of the profile
+        stored_hash_password = result[0]
+        if not policy.verify(password, stored_hash_password):
+            login_throttle.throttle.record_failure(email)
+            return False
+        login_throttle.throttle.record_success(email)
+
+        # Upgrade the stored hash when it was made with another work factor than the policy
+        if policy.needs_rehash(stored_hash_password):
+            cur.execute("UPDATE User SET Password = ? WHERE Id = ?", (policy.hash(password), result[1]))
+
+        # Initialize the user object of the session based on the account type
+        session.user = load_profile(cur, result, catalog().degree_names())
+        return True
+
+
+# Return the course with the given id when the logged-in user of the session is a teacher of it
+# The courses of a teacher are loaded at login, so this needs no query
+def taught_course(session: Session, course_id: int) -> Course:
+    if isinstance(session.user, Teacher):
+        for course in session.user.courses:
+            if course.id == course_id:
+                return course
+    raise PermissionError("Only a teacher of the course can open its gradebook")
+
+
+# Load the students and grades of a course taught by the logged-in teacher
+def load_gradebook(session: Session, course_id: int) -> Roster:
+    with db_manager.connection() as conn:
+        return load_roster(conn, taught_course(session, course_id))
+
+
+# Save the grades of a course taught by the logged-in teacher, by user id, None clears a grade
+def save_gradebook(session: Session, course_id: int, grades: Mapping[int, Optional[int]]) -> SaveResult:
+    taught_course(session, course_id)
+    return save_grades(db_manager.connection(), course_id, grades)
+
+
+def require_admin(session: Session) -> None:
+    if not isinstance(session.user, Admin):
+        raise PermissionError("Only an admin can handle enrollment requests")
+
+
+# List one page of enrollment requests waiting for approval, for a course and/or the students of a degree
+def list_pending_requests(session: Session, course_id: Optional[int] = None,
+                          degree: Optional[tuple[int, int, int]] = None,
+                          after: Optional[tuple] = None) -> tuple[list[PendingRequest], int]:
+    require_admin(session)
+    with db_manager.connection() as conn:
+        return (list_pending(conn, course_id, degree, after),
+                count_pending(conn, course_id, degree))
+
+
+# Approve the selected requests, or all requests matching the filter when keys is None
+def approve_requests(session: Session, keys: Optional[Iterable[RequestKey]] = None, course_id: Optional[int] = None,
+                     degree: Optional[tuple[int, int, int]] = None) -> int:
+    require_admin(session)
+    return approve(db_manager.connection(), keys, course_id, degree)
+
+
+# Reject the selected requests, or all requests matching the filter when keys is None
+def reject_requests(session: Session, keys: Optional[Iterable[RequestKey]] = None, course_id: Optional[int] = None,
+                    degree: Optional[tuple[int, int, int]] = None) -> int:
+    require_admin(session)
+    return reject(db_manager.connection(), keys, course_id, degree)
+
+
+# Check if provided str is valid date format
+def validate_date(date_b: str) -> bool:
+    return validators.is_date(date_b)
+
+
+# Check if provided str is valid email format
+def validate_email(email_u: str) -> bool:
+    return validators.is_email(email_u)
+
+
+# Check a password against a stored password hash
+def validate_password(hash_pass1: bytes, hash_pass2: bytes) -> bool:
+    return policy.verify(hash_pass1, hash_pass2)
+
+
+# Insert new user into 'User' database table with given personal and authentication details, returns the user id
+def create_new_user(firstname: str, surname: str, birth: str, email: str, password: bytes) -> int:
+    user_id: int = write_queue().write(insert_user_row, firstname, surname, birth, email, password)
+    login_throttle.throttle.forget_unknown(email)
+    return user_id
+
+
+def insert_user_row(cur: sqlite3.Cursor, firstname: str, surname: str, birth: str, email: str,
+                    password: bytes) -> int:
+    cur.execute("INSERT INTO User VALUES (null, ?, ?, ?, ?, null, ?, null)", (firstname, surname,
+                                                                              birth, email, password))
+    return cur.lastrowid
+
+
+# Function to save user settings (email and password)
+def save_user_settings(email_u: str, pass1: str, pass2: str) -> str:
+    # Validate email and password lengths and return appropriate messages
+    if not validate_email(email_u) and (len(pass1) < 8 or len(pass2) < 8):
+        return ""
+    elif validate_email(email_u) and (len(pass1) > 7 and len(pass2) > 7) and (len(pass1) == len(pass2)):
+        return "Updated email and password"
+    elif validate_email(email_u) and (len(pass1) < 8 or len(pass2) < 8):
+        return "Updated email"
+    elif (not validate_email(email_u) or email_u == "") and (len(pass1) > 7 and len(pass2) > 7) and (
+            len(pass1) == len(pass2)):
+        return "Update password"
+    else:
+        return ""
+
+
+# Save the settings of the logged-in user of the session: the email and/or the password, picked the same way
+# as save_user_settings, returns the message to show
+# The password is hashed in the calling thread, the change itself goes through the write queue
+def change_user_settings(session: Session, email_u: str, pass1: str, pass2: str) -> str:
+    message: str = save_user_settings(email_u, pass1, pass2)
+    change_email: bool = message in ("Updated email and password", "Updated email")
+    change_password: bool = message in ("Updated email and password", "Update password")
+    if not change_email and not change_password:
+        return message
+    if change_password and not passwords_match(pass1, pass2):
+        return "Passwords do not match"
+
+    password_hash: Optional[bytes] = policy.hash(pass1.encode("utf-8")) if change_password else None
+    try:
+        write_queue().write(update_user_row, session.user.id, email_u if change_email else None, password_hash)
+    except sqlite3.IntegrityError:
+        return "Email is already in use"
+    if change_email:
+        session.user.email = email_u
+        login_throttle.throttle.forget_unknown(email_u)
+    # Tokens issued with the old credentials are no longer accepted
+    session_tokens.store.invalidate_user(session.user.id)
+    return message
+
+
+# Change the email and/or the password hash of a user, None keeps the current value
+def update_user_row(cur: sqlite3.Cursor, user_id: int, email: Optional[str], password_hash: Optional[bytes]) -> None:
+    cur.execute("UPDATE User SET Email = COALESCE(?, Email), Password = COALESCE(?, Password) WHERE Id = ?",
+                (email, password_hash, user_id))
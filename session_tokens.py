@@ -0,0 +1,153 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+from Session import Session
+
+# Seconds a session token is valid after login when ROLL_CALL_SESSION_TTL is not set
+DEFAULT_TTL: int = 8 * 3600
+
+# Sessions kept at most, the least recently used one is dropped for a new one
+MAX_SESSIONS: int = 10000
+
+# Environment variables for the signing key (shared by the instances that should accept each other's
+# signatures) and for the lifetime of a token in seconds
+KEY_VARIABLE: str = "ROLL_CALL_SESSION_KEY"
+TTL_VARIABLE: str = "ROLL_CALL_SESSION_TTL"
+
+
+# Read the signing key from the environment, a random key per process when unset
+def key_from_env() -> bytes:
+    value: str = os.environ.get(KEY_VARIABLE, "")
+    return value.encode("utf-8") if value else secrets.token_bytes(32)
+
+
+# Read the token lifetime from the environment, falls back to the default when unset or invalid
+def ttl_from_env() -> int:
+    value: str = os.environ.get(TTL_VARIABLE, "")
+    return int(value) if value.isdigit() and int(value) > 0 else DEFAULT_TTL
+
+
+# One logged-in session of the store
+class StoredSession:
+    __slots__ = ("session", "user_id", "expires")
+
+    def __init__(self, session: Session, user_id: int, expires: int) -> None:
+        self.session: Session = session
+        self.user_id: int = user_id
+        self.expires: int = expires
+
+
+# Server-side sessions behind signed, expiring tokens
+# A token is "<session id>.<expiry>.<signature>", signed with HMAC-SHA256: a forged or altered token is turned
+# away by its signature alone, a valid one costs one dictionary lookup for the loaded session (and its expiry),
+# instead of a bcrypt check and a profile load on every request
+# Sessions are kept in least recently used order up to max_sessions, and all sessions of a user can be
+# dropped at once when the user's email or password changes
+class SessionStore:
+    def __init__(self, key: Optional[bytes] = None, ttl: Optional[int] = None, max_sessions: int = MAX_SESSIONS,
+                 clock: Callable[[], float] = time.time) -> None:
+        self.key: bytes = key if key is not None else key_from_env()
+        self.ttl: int = ttl if ttl is not None else ttl_from_env()
+        self.max_sessions: int = max_sessions
+        self.clock: Callable[[], float] = clock
+        self.issued: int = 0
+        self.hits: int = 0
+        self.rejected: int = 0
+        self.expired: int = 0
+        self.evicted: int = 0
+        self.invalidated: int = 0
+        self._sessions: OrderedDict[str, StoredSession] = OrderedDict()
+        self._by_user: dict[int, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __str__(self) -> str:
+        return (f"Sessions: {len(self)}, Issued: {self.issued}, Hits: {self.hits}, Rejected: {self.rejected}, "
+                f"Expired: {self.expired}, Evicted: {self.evicted}, Invalidated: {self.invalidated}")
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def sign(self, payload: str) -> str:
+        digest: bytes = hmac.new(self.key, payload.encode("utf-8"), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+    # Store the session of a logged-in user and return its token
+    def issue(self, session: Session) -> str:
+        session_id: str = secrets.token_urlsafe(16)
+        expires: int = int(self.clock()) + self.ttl
+        payload: str = f"{session_id}.{expires}"
+        with self._lock:
+            self._sessions[session_id] = StoredSession(session, session.user.id, expires)
+            self._by_user.setdefault(session.user.id, set()).add(session_id)
+            self.issued += 1
+            while len(self._sessions) > self.max_sessions:
+                self._drop(next(iter(self._sessions)))
+                self.evicted += 1
+        return f"{payload}.{self.sign(payload)}"
+
+    # Session id of a token with a valid signature, None otherwise
+    # Tokens are ASCII, anything else (like a header decoded as latin-1) is turned away before comparing
+    def verify(self, token: str) -> Optional[str]:
+        if not token.isascii():
+            return None
+        session_id, _, rest = token.partition(".")
+        expires, _, signature = rest.partition(".")
+        if not expires.isdigit() or not hmac.compare_digest(self.sign(f"{session_id}.{expires}"), signature):
+            return None
+        return session_id
+
+    # Return the session of a token, None when the token is invalid, expired, revoked or evicted
+    def get(self, token: Optional[str]) -> Optional[Session]:
+        session_id: Optional[str] = self.verify(token) if token else None
+        with self._lock:
+            stored: Optional[StoredSession] = self._sessions.get(session_id) if session_id is not None else None
+            if stored is None:
+                self.rejected += 1
+                return None
+            if stored.expires <= self.clock():
+                self._drop(session_id)
+                self.expired += 1
+                return None
+            self._sessions.move_to_end(session_id)
+            self.hits += 1
+            return stored.session
+
+    # Log a token out, returns False when it was not a live session
+    def revoke(self, token: str) -> bool:
+        session_id: Optional[str] = self.verify(token)
+        with self._lock:
+            if session_id is None or session_id not in self._sessions:
+                return False
+            self._drop(session_id)
+            return True
+
+    # Drop every session of a user, after the email or password changed, returns how many were dropped
+    def invalidate_user(self, user_id: int) -> int:
+        with self._lock:
+            session_ids: set[str] = self._by_user.get(user_id, set()).copy()
+            for session_id in session_ids:
+                self._drop(session_id)
+            self.invalidated += len(session_ids)
+            return len(session_ids)
+
+    def stats(self) -> dict[str, int]:
+        return {"sessions": len(self), "issued": self.issued, "hits": self.hits, "rejected": self.rejected,
+                "expired": self.expired, "evicted": self.evicted, "invalidated": self.invalidated}
+
+    # Remove a session, the lock must be held
+    def _drop(self, session_id: str) -> None:
+        stored: StoredSession = self._sessions.pop(session_id)
+        user_sessions: set[str] = self._by_user[stored.user_id]
+        user_sessions.discard(session_id)
+        if not user_sessions:
+            del self._by_user[stored.user_id]
+
+
+# Sessions of this process, the settings change in service drops the sessions of the user from it
+store: SessionStore = SessionStore()
@@ -0,0 +1,120 @@
+import asyncio
+import http.client
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+from urllib.parse import quote
+import bcrypt
+import pytest
+import service
+import login_throttle
+import session_tokens
+from api_server import ApiServer
+from db import ConnectionManager
+from password_policy import HashPolicy
+
+PASSWORD: str = "DFq398g9&Ddgs"
+
+
+# Runs the API server on its own event loop thread, on a free localhost port
+class RunningServer:
+    def __init__(self) -> None:
+        self.api = ApiServer(db_workers=4)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.port: int = asyncio.run_coroutine_threadsafe(self.api.start("127.0.0.1", 0), self.loop).result()
+
+    def close(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.api.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    def request(self, method: str, path: str, body: Optional[dict] = None,
+                token: Optional[str] = None) -> tuple[int, Any]:
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=10)
+        headers: dict[str, str] = {"Content-Type": "application/json"}
+        if token is not None:
+            headers["Authorization"] = f"Bearer {token}"
+        conn.request(method, path, json.dumps(body) if body is not None else None, headers)
+        response = conn.getresponse()
+        result = response.status, json.loads(response.read())
+        conn.close()
+        return result
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(service, "db_manager", ConnectionManager(str(tmp_path / "roll_call.db")))
+    monkeypatch.setattr(service, "policy", HashPolicy(4))
+    monkeypatch.setattr(session_tokens, "store", session_tokens.SessionStore())
+    monkeypatch.setattr(login_throttle, "throttle", login_throttle.LoginThrottle())
+    service.create_database()
+    # The first user gets the dummy data with the degree, courses and grades
+    service.create_new_user("Ada", "Lovelace", "2000-01-01", "ada@gmail.com",
+                            bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(4)))
+    running = RunningServer()
+    yield running
+    running.close()
+
+
+def test_login_profile_courses_and_grades(server) -> None:
+    assert server.request("POST", "/login", {"email": "ada@gmail.com", "password": "wrong"})[0] == 401
+    assert server.request("GET", "/profile")[0] == 401
+
+    status, login = server.request("POST", "/login", {"email": "ada@gmail.com", "password": PASSWORD})
+    assert status == 200 and login["user"]["role"] == "student"
+    token = login["token"]
+
+    assert server.request("GET", "/profile", token=token)[1]["email"] == "ada@gmail.com"
+    first = server.request("GET", "/courses?limit=10&order=name", token=token)[1]
+    second = server.request("GET", "/courses?limit=10&order=name&after=" + quote(json.dumps(first["next"])),
+                            token=token)[1]
+    assert len(first["courses"]) == 10 and len(second["courses"]) == 5 and second["next"] is None
+    assert [course["name"] for course in server.request("GET", "/courses/degree", token=token)[1]["courses"]] == [
+        "Thesis Zoology"]
+    assert server.request("GET", "/courses/search?q=zoo", token=token)[1]["courses"]
+    grades = server.request("GET", "/grades", token=token)[1]
+    assert grades["passed"] + grades["failed"] == sum(course["grade"] is not None for course in grades["courses"])
+
+    assert server.request("GET", "/courses?limit=x", token=token)[0] == 400
+    for order, after in [("id", [1, 2]), ("id", "abc"), ("id", [{}]), ("id", [True]), ("id", ["1"]),
+                         ("name", ["Zoology"]), ("name", [1, "Zoology"]), ("name", ["Zoology", 1.5])]:
+        path = f"/courses?order={order}&after=" + quote(json.dumps(after))
+        assert server.request("GET", path, token=token)[0] == 400
+    assert server.request("DELETE", "/profile", token=token)[0] == 405
+    assert server.request("GET", "/nothing", token=token)[0] == 404
+    assert server.request("POST", "/logout", token=token)[0] == 200
+    assert server.request("GET", "/profile", token=token)[0] == 401
+
+
+def test_settings_change_email_and_password(server) -> None:
+    token = server.request("POST", "/login", {"email": "ada@gmail.com", "password": PASSWORD})[1]["token"]
+    status, result = server.request("POST", "/settings", {"email": "ada@lovelace.org", "password1": "NewPassw0rd!",
+                                                         "password2": "NewPassw0rd!"}, token=token)
+    assert (status, result["message"]) == (200, "Updated email and password")
+    # The old token is dropped with the old credentials, the client got a new one
+    assert server.request("GET", "/profile", token=token)[0] == 401
+    assert server.request("GET", "/profile", token=result["token"])[1]["email"] == "ada@lovelace.org"
+    assert server.request("POST", "/login", {"email": "ada@gmail.com", "password": PASSWORD})[0] == 401
+    assert server.request("POST", "/login", {"email": "ada@lovelace.org", "password": "NewPassw0rd!"})[0] == 200
+
+
+def test_many_concurrent_clients(server) -> None:
+    token = server.request("POST", "/login", {"email": "ada@gmail.com", "password": PASSWORD})[1]["token"]
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        statuses = list(executor.map(lambda _: server.request("GET", "/courses/degree", token=token)[0], range(200)))
+    assert statuses == [200] * 200
+    stats = server.request("GET", "/stats", token=token)[1]
+    # Every query thread keeps its connection (next to the test, the writer and the hashing threads),
+    # the catalog is loaded once for all clients
+    assert stats["database"]["connections_opened"] <= 4 + 2 + server.api.hash_workers
+    assert stats["catalog"]["loads"] == 1
+
+
+def test_locked_account_gets_too_many_requests(server) -> None:
+    for _ in range(login_throttle.LOCKOUT_AFTER):
+        assert server.request("POST", "/login", {"email": "ada@gmail.com", "password": "wrong"})[0] == 401
+    status, result = server.request("POST", "/login", {"email": "ada@gmail.com", "password": PASSWORD})
+    assert status == 429 and result["retry_after"] > 0
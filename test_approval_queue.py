@@ -0,0 +1,63 @@
+import pytest
+import approval_queue
+import service
+from approval_queue import PENDING_QUERY
+from db import ConnectionManager
+from Session import Session
+from Admin import Admin
+
+
+def make_requests(tmp_path, monkeypatch) -> Session:
+    monkeypatch.setattr(service, "db_manager", ConnectionManager(str(tmp_path / "roll_call.db")))
+    service.create_database()
+    with service.db_manager.connection() as conn:
+        conn.executemany("INSERT INTO User VALUES (null, 'Student', ?, '2000-01-01', ?, null, 'x', null)",
+                         [(f"Number{i}", f"student{i}@gmail.com") for i in range(1, 31)])
+        # Every student asks for courses 13 and 14, the first ten study degree (1, 1, 4)
+        conn.execute("INSERT INTO CourseEnrollments SELECT Id, CourseId, '2024-08-15', 0 " +
+                     "FROM User, Course WHERE CourseId IN (13, 14)")
+        conn.execute("INSERT INTO Degree SELECT Id, 1, 1, 4 FROM User WHERE Id BETWEEN 1 AND 10")
+    session = Session()
+    session.user = Admin(99, "Grace", "Hopper", "1906-12-09", "grace@gmail.com", "99@idkUniversity.com")
+    return session
+
+
+def test_list_and_page_pending_requests(tmp_path, monkeypatch) -> None:
+    session = make_requests(tmp_path, monkeypatch)
+    conn = service.db_manager.connection()
+    plan = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + PENDING_QUERY))
+    assert "idx_enrollments_pending" in plan
+
+    requests, total = service.list_pending_requests(session)
+    assert total == 60 and len(requests) == 60
+    assert [request.course_id for request in requests[:2]] == [13, 13]
+
+    pages, after = [], None
+    while page := approval_queue.list_pending(conn, course_id=14, after=after, limit=7):
+        pages.append(page)
+        after = (page[-1].course_id, page[-1].user_id, page[-1].start_date)
+    assert len(pages) == 5 and sum(len(page) for page in pages) == 30
+
+    requests, total = service.list_pending_requests(session, degree=(1, 1, 4))
+    assert total == 20 and {request.user_id for request in requests} == set(range(1, 11))
+
+
+def test_approve_and_reject_in_bulk(tmp_path, monkeypatch) -> None:
+    session = make_requests(tmp_path, monkeypatch)
+    requests, _ = service.list_pending_requests(session, course_id=13)
+
+    assert service.approve_requests(session, [request.key for request in requests[:5]]) == 5
+    # Approving again changes nothing, the requests are no longer pending
+    assert service.approve_requests(session, [request.key for request in requests[:5]]) == 0
+    assert service.reject_requests(session, [requests[5].key]) == 1
+
+    assert service.approve_requests(session, course_id=14, degree=(1, 1, 4)) == 10
+    assert service.reject_requests(session, course_id=14) == 20
+    assert service.list_pending_requests(session)[1] == 24
+
+    conn = service.db_manager.connection()
+    assert conn.execute("SELECT COUNT(*) FROM CourseEnrollments WHERE CourseId IN (13, 14) AND Assigned = 1 " +
+                        "AND StartDate = '2024-08-15'").fetchone()[0] == 15
+
+    with pytest.raises(PermissionError):
+        service.approve_requests(Session())
@@ -0,0 +1,24 @@
+import bench_data
+import service
+from generate_dataset import generate
+
+
+def test_generate_and_benchmark(tmp_path) -> None:
+    path = str(tmp_path / "bench.db")
+    counts = generate(path, users=300, courses=60, enrollments_per_student=5, degree_types=3, seed=1)
+    assert counts["users"] == 300 and counts["enrollments"] > 0 and counts["grades"] > 0
+
+    # run() points the service at the generated database only for the run
+    manager = service.db_manager
+    results = bench_data.run(path, runs=10, seed=1)
+    assert service.db_manager is manager
+    # The counts are the rows in the tables, without the starting data
+    assert results["dataset"]["Grade"] == counts["grades"] + 11
+    assert results["dataset"]["Course"] >= 60
+    assert set(results["results"]) == {"check_login_without_bcrypt", "get_all_courses",
+                                       "get_all_courses_for_degree", "search_courses", "grades_page_prep"}
+
+    slower = {"results": {name: {**result, "p50_ms": result["p50_ms"] * 2}
+                          for name, result in results["results"].items()}}
+    assert bench_data.compare(results, slower) == []
+    assert bench_data.compare(slower, results) == list(results["results"])
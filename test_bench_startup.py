@@ -0,0 +1,29 @@
+import pytest
+import bench_startup
+
+
+def test_parse_importtime() -> None:
+    report = ("import time: self [us] | cumulative | imported package\n"
+              "import time:       120 |        120 |   Course\n"
+              "import time:       300 |        420 | project\n")
+    assert bench_startup.parse_importtime(report) == {"Course": (120, 120), "project": (300, 420)}
+
+
+# The portal starts within the budget, without the modules it only needs after the first click
+def test_startup_budget() -> None:
+    assert not set(bench_startup.DEFERRED_MODULES) & bench_startup.loaded_modules("project")
+    times = bench_startup.import_times("project", runs=3)
+    assert times["project"][1] / 1000 <= bench_startup.IMPORT_BUDGET_MS
+
+    frame_ms = bench_startup.time_to_first_frame(runs=3)
+    # None without a display, the import budget still holds there
+    assert frame_ms is None or frame_ms <= bench_startup.FRAME_BUDGET_MS
+
+
+# Only a missing display counts as no measurement, a launch that crashes fails with its error output
+def test_failed_launch_is_not_taken_for_no_display(monkeypatch) -> None:
+    assert bench_startup.is_no_display("_tkinter.TclError: no display name and no $DISPLAY environment variable")
+    assert not bench_startup.is_no_display("NameError: name 'window' is not defined")
+    monkeypatch.setattr(bench_startup, "FIRST_FRAME_CODE", "raise RuntimeError('open_window broke')\n")
+    with pytest.raises(RuntimeError, match="open_window broke"):
+        bench_startup.time_to_first_frame(runs=1)
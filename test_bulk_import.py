@@ -0,0 +1,74 @@
+import json
+import pytest
+import bulk_import
+import service
+from db import ConnectionManager
+from password_policy import HashPolicy
+from Session import Session
+
+
+def test_import_students_and_courses(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(service, "db_manager", ConnectionManager(str(tmp_path / "roll_call.db")))
+    monkeypatch.setattr(bulk_import, "policy", HashPolicy(4))
+    monkeypatch.setattr(service, "policy", HashPolicy(4))
+    service.create_database()
+    service.create_new_user("Ada", "Lovelace", "2000-01-01", "ada@gmail.com", b"hash")
+
+    students = tmp_path / "students.csv"
+    students.write_text("first_name,surname,birthdate,email,password\n" +
+                        "".join(f"Alan,Turing,2001-02-03,alan{i}@gmail.com,DFq398g9&Ddgs\n" for i in range(5)) +
+                        "Grace,Hopper,not a date,grace@gmail.com,DFq398g9&Ddgs\n" +
+                        "Ada,Lovelace,2000-01-01,ada@gmail.com,DFq398g9&Ddgs\n" +
+                        "Alan,Turing,2001-02-03,alan0@gmail.com,DFq398g9&Ddgs\n")
+    report = bulk_import.import_file(str(students), "students", chunk_size=3, workers=2)
+
+    assert (report.rows_read, report.rows_imported) == (8, 5)
+    assert [error.line for error in report.errors] == [7, 8, 9]
+    users = service.db_manager.connection().execute("SELECT Id, UniEmail, Account FROM User ORDER BY Id").fetchall()
+    assert users[-1] == (6, "6@idkUniversity.com", 1)
+    assert service.check_login(Session(), "alan4@gmail.com", b"DFq398g9&Ddgs")
+
+    courses = tmp_path / "courses.jsonl"
+    courses.write_text(json.dumps({"name": "Ecology", "passing_grade": 50, "active": 1, "credits": 5}) + "\n" +
+                       json.dumps({"name": "Ethology", "passing_grade": 500, "active": 1, "credits": 5}) + "\n")
+    report = bulk_import.import_file(str(courses), "courses")
+    assert report.rows_imported == 1
+    assert str(report.errors[0]) == "Line 2: Passing grade must be between 0 and 100"
+
+
+# An error other than a constraint leaves no open write transaction on the shared connection
+def test_failed_chunk_is_rolled_back(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(service, "db_manager", ConnectionManager(str(tmp_path / "roll_call.db")))
+    service.create_database()
+
+    def fail(cur, sql, rows, report) -> None:
+        cur.executemany(sql, [values for _, values in rows])
+        raise RuntimeError("disk gone")
+
+    monkeypatch.setattr(bulk_import, "insert_chunk", fail)
+    courses = tmp_path / "courses.jsonl"
+    courses.write_text(json.dumps({"name": "Ecology", "passing_grade": 50, "active": 1, "credits": 5}) + "\n")
+    with pytest.raises(RuntimeError):
+        bulk_import.import_file(str(courses), "courses")
+
+    conn = service.db_manager.connection()
+    assert not conn.in_transaction
+    assert conn.execute("SELECT COUNT(*) FROM Course WHERE CourseName = 'Ecology'").fetchone()[0] == 0
+
+
+# Existing emails are found in every slice of a chunk that is looked up in several statements
+def test_existing_emails_are_looked_up_in_slices(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(service, "db_manager", ConnectionManager(str(tmp_path / "roll_call.db")))
+    monkeypatch.setattr(bulk_import, "policy", HashPolicy(4))
+    monkeypatch.setattr(bulk_import, "EMAIL_LOOKUP_SIZE", 2)
+    service.create_database()
+    for i in range(5):
+        service.create_new_user("Alan", "Turing", "2001-02-03", f"alan{i}@gmail.com", b"hash")
+
+    students = tmp_path / "students.csv"
+    students.write_text("first_name,surname,birthdate,email,password\n" +
+                        "".join(f"Alan,Turing,2001-02-03,alan{i}@gmail.com,DFq398g9&Ddgs\n" for i in range(6)))
+    report = bulk_import.import_file(str(students), "students", chunk_size=6, workers=1)
+
+    assert (report.rows_read, report.rows_imported) == (6, 1)
+    assert [error.line for error in report.errors] == [2, 3, 4, 5, 6]
@@ -0,0 +1,26 @@
+import service
+from db import ConnectionManager
+
+
+def test_catalog_reloads_only_after_a_change(tmp_path, monkeypatch) -> None:
+    path = str(tmp_path / "roll_call.db")
+    monkeypatch.setattr(service, "db_manager", ConnectionManager(path))
+    service.create_database()
+    catalog = service.catalog()
+
+    assert len(service.get_all_courses()) == 15
+    assert [course.name for course in service.get_all_courses_for_degree(1)] == ["Thesis Zoology"]
+    assert catalog.degree_names()[(3, 1, 1)] == "Doctor of Philosophy of Science Zoology"
+    assert catalog.loads == 1
+
+    # Enrollments are not part of the catalog
+    with service.db_manager.connection() as conn:
+        conn.execute("INSERT INTO CourseEnrollments VALUES (1, 2, '2024-01-01', 1)")
+    service.get_all_courses()
+    assert catalog.loads == 1
+
+    # A change from another process is seen on the next read
+    with ConnectionManager(path).connection() as other:
+        other.execute("INSERT INTO Course (CourseName, PassingGrade, Active) VALUES ('Dissertation Zoology', 50, 1)")
+    assert len(service.get_all_courses()) == 16
+    assert catalog.loads == 2
@@ -0,0 +1,37 @@
+from Course import Course
+from course_filter import CoursePager, CourseView, filter_view
+
+
+def test_filter_view_shares_courses() -> None:
+    all_courses = [Course(1, "Zoology", 50, 1), Course(2, "Botany", 50, 1), Course(3, "Genetics", 50, 1)]
+    degree_courses = all_courses[:2]
+
+    view = filter_view("All courses", all_courses, degree_courses, [])
+    assert len(view) == 3
+    assert view[0] is all_courses[0]
+    assert [course.id for course in view[1:]] == [2, 3]
+    assert not hasattr(view, "append") and not hasattr(view, "clear")
+
+    assert list(filter_view("Courses for degree", all_courses, degree_courses, [])) == degree_courses
+    assert len(filter_view("", all_courses, degree_courses, [])) == 0
+    assert isinstance(filter_view("Courses I am taking", all_courses, degree_courses, []), CourseView)
+
+
+def test_course_pager_reads_pages_on_demand() -> None:
+    courses = [Course(number, f"Course {number}", 50, 1) for number in range(1, 8)]
+    requested = []
+
+    def fetch(after):
+        requested.append(after)
+        start = 0 if after is None else after[0]
+        page = courses[start:start + 3]
+        return page, ((page[-1].id,) if len(page) == 3 else None)
+
+    pager = CoursePager(fetch)
+    assert len(pager) == 3 and not pager.done
+    assert filter_view("All courses", pager, [], []) is pager
+
+    while pager.load_more():
+        pass
+    assert pager.done and list(pager) == courses
+    assert requested == [None, (3,), (6,)]
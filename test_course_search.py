@@ -0,0 +1,34 @@
+import sqlite3
+from course_search import search_courses
+from migrations import migrate
+
+
+def course_names(conn: sqlite3.Connection, text: str) -> list[str]:
+    return [course.name for course in search_courses(conn, text)]
+
+
+def test_search_courses() -> None:
+    conn = sqlite3.connect(":memory:")
+    migrate(conn)
+
+    assert course_names(conn, "object-oriented") == ["Object-Oriented Programming"]
+    assert course_names(conn, "oriented prog") == ["Object-Oriented Programming"]
+    assert course_names(conn, "zoo") == ["Zoology", "Thesis Zoology", "Dissertation Zoology"]
+    assert course_names(conn, "Ge") == ["Genetics", "Geographic Information System", "Geography"]
+    assert course_names(conn, "(C++ [") == []
+    assert course_names(conn, "") == []
+
+
+def test_search_follows_course_changes() -> None:
+    conn = sqlite3.connect(":memory:")
+    migrate(conn)
+
+    conn.execute("INSERT INTO Course (CourseName, PassingGrade, Active) VALUES ('Data Structures 2', 50, 1)")
+    assert course_names(conn, "structures 2") == ["Data Structures 2"]
+
+    conn.execute("UPDATE Course SET CourseName = 'Algorithms 2' WHERE CourseName = 'Data Structures 2'")
+    assert course_names(conn, "structures") == []
+    assert course_names(conn, "algo") == ["Algorithms 2"]
+
+    conn.execute("DELETE FROM Course WHERE CourseName = 'Algorithms 2'")
+    assert course_names(conn, "algo") == []
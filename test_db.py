@@ -0,0 +1,31 @@
+import threading
+from db import ConnectionManager
+
+
+def test_connection_reused_per_thread(tmp_path) -> None:
+    manager = ConnectionManager(str(tmp_path / "roll_call.db"))
+    conn = manager.connection()
+    assert manager.connection() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
+    other: list = []
+    thread = threading.Thread(target=lambda: other.append(manager.connection()))
+    thread.start()
+    thread.join()
+
+    assert other[0] is not conn
+    assert manager.connections_opened == 2
+    manager.close_all()
+
+
+def test_statement_counter(tmp_path) -> None:
+    manager = ConnectionManager(str(tmp_path / "roll_call.db"))
+    with manager.connection() as conn:
+        conn.execute("CREATE TABLE Test(Id INTEGER)")
+        conn.cursor().executemany("INSERT INTO Test VALUES (?)", [(1,), (2,), (3,)])
+        conn.execute("SELECT * FROM Test").fetchall()
+
+    assert manager.stats() == {"connections_opened": 1, "statements_executed": 3}
+    manager.close()
+    assert manager.statements_executed == 3
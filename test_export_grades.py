@@ -0,0 +1,32 @@
+import csv
+import gzip
+import io
+import json
+import export_grades
+import service
+from db import ConnectionManager
+
+
+def test_export_csv_and_gzip_jsonl(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(service, "db_manager", ConnectionManager(str(tmp_path / "roll_call.db")))
+    service.create_database()
+    service.create_new_user("Ada", "Lovelace", "2000-01-01", "ada@gmail.com", b"hash")
+    service.create_new_user("Alan", "Turing", "2001-02-03", "alan@gmail.com", b"hash")
+    with service.db_manager.connection() as conn:
+        conn.execute("INSERT INTO CourseEnrollments VALUES (2, 13, '2024-08-15', 1), (2, 14, '2024-08-15', 0)")
+
+    quiet = io.StringIO()
+    progress = export_grades.export_grades(str(tmp_path / "grades.csv"), batch_size=5,
+                                           progress=export_grades.Progress(output=quiet))
+    with open(tmp_path / "grades.csv", newline="", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+    # The twelve courses of the dummy student and the one approved course of the new student
+    assert progress.count == len(rows) == 13
+    assert rows[0]["degree"] == "Doctor of Philosophy of Science Zoology"
+    assert (rows[0]["course_id"], rows[0]["grade"], rows[0]["result"]) == ("1", "63", "passed")
+    assert rows[-1]["surname"] == "Turing" and rows[-1]["grade"] == "" and rows[-1]["degree"] == ""
+
+    export_grades.export_grades(str(tmp_path / "grades.jsonl.gz"), progress=export_grades.Progress(output=quiet))
+    with gzip.open(tmp_path / "grades.jsonl.gz", "rt", encoding="utf-8") as file:
+        records = [json.loads(line) for line in file]
+    assert len(records) == 13 and records[0]["grade"] == 63 and records[-1]["grade"] is None
@@ -0,0 +1,46 @@
+import random
+import statistics
+import sqlite3
+import grade_stats
+from gradebook import UPSERT_GRADE
+from migrations import migrate
+
+
+def test_stats_follow_every_grade_change() -> None:
+    conn = sqlite3.connect(":memory:")
+    migrate(conn)
+    rng = random.Random(1)
+    for step in range(400):
+        user_id, course_id = rng.randint(1, 40), rng.randint(1, 4)
+        action = rng.random()
+        if action < 0.6:
+            conn.execute(UPSERT_GRADE, (user_id, course_id, rng.randint(0, 100)))
+        elif action < 0.8:
+            conn.execute("UPDATE Grade SET Grade = ? WHERE UserId = ? AND CourseId = ?",
+                         (rng.randint(0, 100), user_id, course_id))
+        elif action < 0.9:
+            conn.execute("DELETE FROM Grade WHERE UserId = ? AND CourseId = ?", (user_id, course_id))
+        else:
+            conn.execute("UPDATE Course SET PassingGrade = ? WHERE CourseId = ?", (rng.randint(30, 70), course_id))
+    conn.commit()
+
+    assert grade_stats.check_consistency(conn) == []
+    grades = [row[0] for row in conn.execute("SELECT Grade FROM Grade WHERE CourseId = 2")]
+    passing = conn.execute("SELECT PassingGrade FROM Course WHERE CourseId = 2").fetchone()[0]
+    stats = grade_stats.course_stats(conn, 2)
+    assert stats.count == len(grades) and (stats.min_grade, stats.max_grade) == (min(grades), max(grades))
+    assert abs(stats.mean - statistics.fmean(grades)) < 1e-9
+    assert abs(stats.stddev - statistics.pstdev(grades)) < 1e-9
+    assert stats.pass_rate == sum(grade >= passing for grade in grades) / len(grades)
+    assert grade_stats.course_stats(conn, 15).mean is None
+
+
+def test_check_finds_and_repairs_drift() -> None:
+    conn = sqlite3.connect(":memory:")
+    migrate(conn)
+    conn.execute("UPDATE CourseGradeStats SET GradeSum = GradeSum + 1 WHERE CourseId = 3")
+    conn.execute("DELETE FROM CourseGradeStats WHERE CourseId = 5")
+    conn.commit()
+
+    assert grade_stats.check_consistency(conn, repair=True) == [3, 5]
+    assert grade_stats.check_consistency(conn) == []
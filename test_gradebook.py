@@ -0,0 +1,60 @@
+import pytest
+import service
+from db import ConnectionManager
+from gradebook import GradebookError
+from Session import Session
+from Teacher import Teacher
+from user_profile import find_login, load_profile
+
+
+def make_class(tmp_path, monkeypatch, students: int) -> Session:
+    monkeypatch.setattr(service, "db_manager", ConnectionManager(str(tmp_path / "roll_call.db")))
+    service.create_database()
+    # The first user gets the dummy enrollments of the starting data
+    service.create_new_user("Ada", "Lovelace", "2000-01-01", "ada@gmail.com", b"hash")
+    with service.db_manager.connection() as conn:
+        conn.execute("INSERT INTO User VALUES (null, 'Alan', 'Turing', '1912-06-23', 'alan@gmail.com', null, 'x', 2)")
+        conn.execute("INSERT INTO CourseEnrollments VALUES (2, 13, '2024-08-15', 1)")
+        conn.executemany("INSERT INTO User VALUES (null, 'Student', ?, '2000-01-01', ?, null, 'x', null)",
+                         [(f"Number{i:04}", f"student{i}@gmail.com") for i in range(students)])
+        conn.execute("INSERT INTO CourseEnrollments SELECT Id, 13, '2024-08-15', 1 FROM User WHERE Id > 2")
+        # A student still waiting for approval is not part of the roster
+        conn.execute("INSERT INTO CourseEnrollments VALUES (1, 13, '2024-08-15', 0)")
+
+    session = Session()
+    cur = service.db_manager.connection().cursor()
+    session.user = load_profile(cur, find_login(cur, "alan@gmail.com"), service.catalog().degree_names())
+    return session
+
+
+def test_save_grades_for_a_large_class(tmp_path, monkeypatch) -> None:
+    session = make_class(tmp_path, monkeypatch, 500)
+    assert isinstance(session.user, Teacher) and [course.id for course in session.user.courses] == [13]
+
+    roster = service.load_gradebook(session, 13)
+    assert len(roster.entries) == 500 and all(entry.grade is None for entry in roster.entries)
+    assert roster.entries[0].surname == "Number0000"
+
+    grades = {entry.user_id: (entry.user_id * 7) % 101 for entry in roster.entries}
+    result = service.save_gradebook(session, 13, grades)
+    assert (result.saved, result.passed + result.failed) == (500, 500)
+    assert result.seconds < 1
+
+    # Change some grades and clear one, the rest stays as it was
+    first, second = roster.entries[0].user_id, roster.entries[1].user_id
+    result = service.save_gradebook(session, 13, {first: 100, second: None})
+    assert (result.saved, result.cleared) == (1, 1)
+    reloaded = {entry.user_id: entry.grade for entry in service.load_gradebook(session, 13).entries}
+    assert reloaded[first] == 100 and reloaded[second] is None
+    assert sum(grade is not None for grade in reloaded.values()) == 499
+
+
+def test_invalid_grades_write_nothing(tmp_path, monkeypatch) -> None:
+    session = make_class(tmp_path, monkeypatch, 3)
+    with pytest.raises(GradebookError) as error:
+        service.save_gradebook(session, 13, {3: 80, 4: 101, 1: 50})
+    assert len(error.value.problems) == 2
+    assert all(entry.grade is None for entry in service.load_gradebook(session, 13).entries)
+
+    with pytest.raises(PermissionError):
+        service.load_gradebook(session, 4)
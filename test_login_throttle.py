@@ -0,0 +1,76 @@
+import bcrypt
+import pytest
+import login_throttle
+import service
+from db import ConnectionManager
+from login_throttle import LoginThrottle, LoginThrottled
+from password_policy import HashPolicy
+from Session import Session
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now: float = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_client_bucket_refills() -> None:
+    clock = FakeClock()
+    throttle = LoginThrottle(clock)
+    for i in range(int(login_throttle.CLIENT_CAPACITY)):
+        assert throttle.admit(f"user{i}@gmail.com", "10.0.0.1")
+    with pytest.raises(LoginThrottled) as error:
+        throttle.admit("other@gmail.com", "10.0.0.1")
+    assert error.value.reason == "client" and error.value.retry_after == pytest.approx(1.0)
+    assert throttle.admit("other@gmail.com", "10.0.0.2")
+    clock.now += 1
+    assert throttle.admit("other@gmail.com", "10.0.0.1")
+
+
+def test_progressive_lockout() -> None:
+    clock = FakeClock()
+    throttle = LoginThrottle(clock)
+    lockouts: list[float] = []
+    for _ in range(3):
+        for _ in range(login_throttle.LOCKOUT_AFTER if not lockouts else 1):
+            throttle.admit("ada@gmail.com", f"10.0.0.{len(lockouts)}")
+            throttle.record_failure("ada@gmail.com")
+        with pytest.raises(LoginThrottled) as error:
+            throttle.admit(" ADA@gmail.com", "10.0.1.1")
+        lockouts.append(error.value.retry_after)
+        clock.now += error.value.retry_after
+    assert lockouts == [30, 60, 120]
+
+    throttle.admit("ada@gmail.com")
+    throttle.record_success("ada@gmail.com")
+    throttle.record_failure("ada@gmail.com")
+    assert throttle.admit("ada@gmail.com")
+    assert throttle.stats()["rejected_locked"] == 3
+
+
+def test_rejected_logins_skip_bcrypt_and_database(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(service, "db_manager", ConnectionManager(str(tmp_path / "roll_call.db")))
+    monkeypatch.setattr(service, "policy", HashPolicy(4))
+    monkeypatch.setattr(login_throttle, "throttle", LoginThrottle())
+    service.create_database()
+    password_hash: bytes = bcrypt.hashpw(b"secret", bcrypt.gensalt(4))
+    service.create_new_user("Ada", "Lovelace", "2000-01-01", "ada@gmail.com", password_hash)
+    checks: list[bytes] = []
+    verify = service.policy.verify
+    monkeypatch.setattr(service.policy, "verify", lambda password, stored: checks.append(password) or verify(
+        password, stored))
+
+    for _ in range(login_throttle.LOCKOUT_AFTER):
+        assert not service.check_login(Session(), "ada@gmail.com", b"wrong")
+    with pytest.raises(LoginThrottled):
+        service.check_login(Session(), "ada@gmail.com", b"secret")
+    assert len(checks) == login_throttle.LOCKOUT_AFTER
+
+    assert not service.check_login(Session(), "nobody@gmail.com", b"secret")
+    statements = service.db_manager.statements_executed
+    assert not service.check_login(Session(), "nobody@gmail.com", b"secret")
+    assert service.db_manager.statements_executed == statements
+    service.create_new_user("Nobody", "Yet", "2000-01-01", "nobody@gmail.com", password_hash)
+    assert service.check_login(Session(), "nobody@gmail.com", b"secret")
@@ -0,0 +1,23 @@
+import sqlite3
+from migrations import LATEST_VERSION, create_base_schema, current_version, migrate
+from user_profile import ENROLLED_COURSES_QUERY
+
+
+def test_migrate_new_database() -> None:
+    conn = sqlite3.connect(":memory:")
+    assert current_version(conn) == 0
+    assert migrate(conn) == LATEST_VERSION
+    # Running it again changes nothing
+    assert migrate(conn) == LATEST_VERSION
+    assert conn.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0] == LATEST_VERSION
+
+
+def test_migrate_database_created_before_migrations() -> None:
+    conn = sqlite3.connect(":memory:")
+    create_base_schema(conn.cursor())
+    conn.commit()
+    assert current_version(conn) == 1
+
+    assert migrate(conn) == LATEST_VERSION
+    plan = conn.execute("EXPLAIN QUERY PLAN " + ENROLLED_COURSES_QUERY, (1,)).fetchall()
+    assert "COVERING INDEX idx_enrollments_user_assigned" in " ".join(row[3] for row in plan)
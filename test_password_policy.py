@@ -0,0 +1,37 @@
+import bcrypt
+import service
+from db import ConnectionManager
+from Session import Session
+from password_policy import HashPolicy, calibrate, hash_rounds, passwords_match
+
+
+def test_needs_rehash() -> None:
+    policy = HashPolicy(5)
+    stored_hash: bytes = HashPolicy(4).hash(b"DFq398g9&Ddgs")
+    assert hash_rounds(stored_hash) == 4
+    assert policy.needs_rehash(stored_hash)
+    assert policy.verify(b"DFq398g9&Ddgs", stored_hash)
+    assert not policy.needs_rehash(policy.hash(b"DFq398g9&Ddgs"))
+
+
+def test_passwords_match_and_calibrate() -> None:
+    assert passwords_match("DFq398g9&Ddgs", "DFq398g9&Ddgs")
+    assert not passwords_match("DFq398g9&Ddgs", "DFq398g9&Ddgt")
+    assert 4 <= calibrate(1000, min_rounds=4, max_rounds=6) <= 6
+
+
+def test_check_login_upgrades_hash(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(service, "db_manager", ConnectionManager(str(tmp_path / "roll_call.db")))
+    monkeypatch.setattr(service, "policy", HashPolicy(5))
+    service.create_database()
+    service.create_new_user("Ada", "Lovelace", "2000-01-01", "ada@gmail.com",
+                            bcrypt.hashpw(b"DFq398g9&Ddgs", bcrypt.gensalt(4)))
+
+    session = Session()
+    assert not service.check_login(session, "ada@gmail.com", b"wrong password")
+    assert session.user is None
+    assert service.check_login(session, "ada@gmail.com", b"DFq398g9&Ddgs")
+    stored_hash = service.db_manager.connection().execute("SELECT Password FROM User").fetchone()[0]
+    assert hash_rounds(stored_hash) == 5
+    assert service.check_login(session, "ada@gmail.com", b"DFq398g9&Ddgs")
+    assert session.user.email == "ada@gmail.com"
@@ -0,0 +1,33 @@
+import query_trace
+import service
+from db import ConnectionManager
+
+
+def test_normalize_sql() -> None:
+    assert query_trace.normalize_sql("SELECT *  FROM User\n WHERE Id = 5 AND Email = 'a''b'") == \
+        "SELECT * FROM User WHERE Id = ? AND Email = ?"
+    assert query_trace.normalize_sql("SELECT Email FROM User WHERE Email IN (?, ?, ?)") == \
+        query_trace.normalize_sql("SELECT Email FROM User WHERE Email IN (?)")
+    # Ad-hoc SQL with the values written in does not grow the cache without bound
+    for user_id in range(query_trace.NORMALIZED_CACHE_SIZE + 10):
+        query_trace.normalize_sql(f"SELECT * FROM User WHERE Id = {user_id}")
+    assert query_trace.normalize_sql.cache_info().currsize == query_trace.NORMALIZED_CACHE_SIZE
+
+
+def test_trace_statements_per_caller(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(service, "db_manager", ConnectionManager(str(tmp_path / "roll_call.db")))
+    service.create_database()
+    monkeypatch.setattr(query_trace, "tracer", None)
+    tracer = query_trace.enable()
+    service.get_all_courses_for_degree(1)
+    service.get_all_courses_for_degree(1)
+
+    stats = {caller: stats for _, caller, stats in tracer.totals(by="caller")}
+    assert set(stats) == {"service.get_all_courses_for_degree", "catalog_cache._refresh", "catalog_cache._load"}
+    assert stats["service.get_all_courses_for_degree"].count == 2
+    assert sum(stats["service.get_all_courses_for_degree"].buckets) == 2
+    assert 'caller="service.get_all_courses_for_degree"' in tracer.prometheus()
+
+    query_trace.disable()
+    service.get_all_courses_for_degree(1)
+    assert sum(stats.count for _, _, stats in tracer.totals(by="caller")) == sum(s.count for s in stats.values())
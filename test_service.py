@@ -0,0 +1,59 @@
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+import service
+from db import ConnectionManager
+from Session import Session
+from password_policy import HashPolicy
+
+
+def test_service_import_is_headless() -> None:
+    code = "import sys, service; assert 'tkinter' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True, env={"PATH": ""})
+
+
+def test_logins_from_many_threads(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(service, "db_manager", ConnectionManager(str(tmp_path / "roll_call.db")))
+    monkeypatch.setattr(service, "policy", HashPolicy(4))
+    service.create_database()
+    for i in range(8):
+        service.create_new_user("Ada", "Lovelace", "2000-01-01", f"ada{i}@gmail.com",
+                                bcrypt.hashpw(b"DFq398g9&Ddgs", bcrypt.gensalt(4)))
+
+    def login(i: int) -> Session:
+        session = Session()
+        assert service.check_login(session, f"ada{i}@gmail.com", b"DFq398g9&Ddgs")
+        service.load_courses(session)
+        return session
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        sessions = list(executor.map(login, range(8)))
+
+    assert [session.user.email for session in sessions] == [f"ada{i}@gmail.com" for i in range(8)]
+    # The first user gets the dummy data with the degree
+    assert [course.name for course in sessions[0].all_courses_for_degree_list] == ["Thesis Zoology"]
+    assert all(len(session.all_courses_list) == 15 for session in sessions)
+
+
+def test_list_courses_page_keyset(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(service, "db_manager", ConnectionManager(str(tmp_path / "roll_call.db")))
+    service.create_database()
+    with service.db_manager.connection() as conn:
+        conn.executemany("INSERT INTO Course (CourseName, PassingGrade, Active) VALUES (?, 50, 1)",
+                         [("animal Behavior",), ("ANIMAL BEHAVIOR",), ("zz Last",)])
+
+    for order in ("id", "name"):
+        pages, key = [], None
+        while True:
+            courses, key = service.list_courses_page(key, limit=4, order=order)
+            pages.append(courses)
+            if key is None:
+                break
+        listed = [course for page in pages for course in page]
+        assert len(pages) == 5 and len(listed) == 18 == len({course.id for course in listed})
+        if order == "id":
+            assert [course.id for course in listed] == list(range(1, 19))
+        else:
+            assert listed == sorted(listed, key=lambda course: (course.name.lower(), course.id))
+            assert [course.name for course in listed[:2]] == ["animal Behavior", "ANIMAL BEHAVIOR"]
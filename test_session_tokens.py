@@ -0,0 +1,56 @@
+from Person import Person
+from Session import Session
+from session_tokens import SessionStore
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now: float = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def login(user_id: int) -> Session:
+    session = Session()
+    session.user = Person(user_id, "Ada", "Lovelace", "2000-01-01", f"ada{user_id}@gmail.com", "")
+    return session
+
+
+def test_tokens_are_signed_and_expire() -> None:
+    clock = FakeClock()
+    store = SessionStore(key=b"secret", ttl=60, clock=clock)
+    session = login(1)
+    token = store.issue(session)
+    assert store.get(token) is session
+
+    session_id, expires, signature = token.split(".")
+    assert store.get(f"{session_id}.{int(expires) + 3600}.{signature}") is None
+    assert SessionStore(key=b"other", clock=clock).get(token) is None
+    assert store.get("") is None and store.get("nonsense") is None
+    # A header decoded as latin-1 can carry any character, it is rejected like any other bad token
+    assert store.get("abc.123.\xe9") is None and store.get(f"{session_id}.{expires}.{signature}\xe9") is None
+
+    clock.now += 61
+    assert store.get(token) is None
+    assert len(store) == 0 and store.stats()["expired"] == 1
+
+
+def test_least_recently_used_session_is_evicted() -> None:
+    store = SessionStore(key=b"secret", max_sessions=2)
+    first, second = store.issue(login(1)), store.issue(login(2))
+    store.get(first)
+    third = store.issue(login(3))
+    assert store.get(second) is None
+    assert store.get(first) is not None and store.get(third) is not None
+    assert store.stats()["evicted"] == 1
+
+
+def test_invalidate_and_revoke() -> None:
+    store = SessionStore(key=b"secret")
+    tokens = [store.issue(login(1)) for _ in range(3)]
+    other = store.issue(login(2))
+    assert store.revoke(tokens[0]) and not store.revoke(tokens[0])
+    assert store.invalidate_user(1) == 2
+    assert [store.get(token) for token in tokens] == [None, None, None]
+    assert store.get(other) is not None
@@ -0,0 +1,46 @@
+from Course import Course
+from Grade import Grade
+from Student import Student
+
+
+def test_grade_index_and_summary() -> None:
+    zoology = Course(1, "Zoology", 50, 1, 10)
+    botany = Course(2, "Botany", 60, 1, 5)
+    # Same name as another course, but a different course
+    zoology_2 = Course(3, "Zoology", 50, 1, 10)
+    student = Student(1, "Ada", "Lovelace", "2000-01-01", "ada@gmail.com", "1@idkUniversity.com", "",
+                      [zoology, botany, zoology_2], [Grade(zoology, 80), Grade(botany, 50)])
+
+    assert student.grade_for(1).grades == 80
+    assert student.grade_for(3) is None
+    assert student.average == 65
+    assert student.weighted_average == 70
+    assert (student.passed_count, student.failed_count, student.credits_earned) == (1, 1, 10)
+
+    student.set_grade(Grade(botany, 70))
+    student.set_grade(Grade(zoology_2, 20))
+    assert student.grade_for(2).grades == 70
+    assert len(student.grades) == 3
+    assert (student.passed_count, student.failed_count, student.credits_earned) == (2, 1, 15)
+
+
+def test_summary_without_grades() -> None:
+    student = Student(1, "Ada", "Lovelace", "2000-01-01", "ada@gmail.com", "1@idkUniversity.com", "", [], [])
+    assert student.average is None
+    assert student.weighted_average is None
+    assert student.credits_earned == 0
+
+
+def test_set_grade_replaces_in_place() -> None:
+    courses = [Course(course_id, f"Course {course_id}", 50, 1, 5) for course_id in range(1, 4)]
+    student = Student(1, "Ada", "Lovelace", "2000-01-01", "ada@gmail.com", "1@idkUniversity.com", "",
+                      courses, [Grade(course, 60) for course in courses])
+    new_grade = Grade(courses[1], 90)
+    student.set_grade(new_grade)
+    student.set_grade(Grade(Course(4, "Course 4", 50, 1, 5), 40))
+
+    assert student.grades[1] is new_grade
+    assert [grade.course.id for grade in student.grades] == [1, 2, 3, 4]
+    assert student.grade_for(2) is new_grade
+    assert student.grade_for(4).grades == 40
+    assert student.average == 62.5
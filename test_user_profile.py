@@ -0,0 +1,46 @@
+import bcrypt
+import login_throttle
+import service
+from db import ConnectionManager
+from password_policy import HashPolicy
+from Session import Session
+from Student import Student
+from user_profile import PROFILE_QUERY_BUDGET, find_login
+
+
+def test_check_login_query_budget(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(service, "db_manager", ConnectionManager(str(tmp_path / "roll_call.db")))
+    monkeypatch.setattr(service, "policy", HashPolicy(4))
+    monkeypatch.setattr(login_throttle, "throttle", login_throttle.LoginThrottle())
+    service.create_database()
+    service.create_new_user("Ada", "Lovelace", "2000-01-01", "ada@gmail.com",
+                            bcrypt.hashpw(b"password", bcrypt.gensalt(4)))
+
+    with service.db_manager.connection() as conn:
+        # Enroll the dummy student in a lot of extra courses
+        cur = conn.cursor()
+        cur.executemany("INSERT INTO Course (CourseName, PassingGrade, Active) VALUES (?, 50, 1)",
+                        [(f"Course {i}",) for i in range(60)])
+        cur.execute("INSERT INTO CourseEnrollments SELECT 1, CourseId, '2024-01-01', 1 FROM Course WHERE CourseId > 15")
+        conn.commit()
+
+    # The first login loads the catalog, every later one only checks its version
+    assert service.check_login(Session(), "ada@gmail.com", b"password")
+    session = Session()
+    executed_before = conn.statements_executed
+    assert service.check_login(session, "ada@gmail.com", b"password")
+    student = session.user
+
+    assert conn.statements_executed - executed_before == PROFILE_QUERY_BUDGET
+    assert isinstance(student, Student)
+    assert student.degree == "Doctor of Philosophy of Science Zoology"
+    assert len(student.courses) == 72
+    assert len(student.grades) == 11
+
+
+def test_find_login_unknown_email(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(service, "db_manager", ConnectionManager(str(tmp_path / "roll_call.db")))
+    service.create_database()
+
+    with service.db_manager.connection() as conn:
+        assert find_login(conn.cursor(), "nobody@gmail.com") is None
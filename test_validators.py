@@ -0,0 +1,28 @@
+import pytest
+import validators
+
+EMAILS: list[str] = ["abc@gmail.com", "abcgmail.com", "abc@gmail", "a.b+c@sub.domain.org", "a..b@gmail.com",
+                     ".a@gmail.com", "a(comment)@gmail.com", "a)b(@gmail.com", "a(b@gmail.com", "\"a@b\"@gmail.com",
+                     "a@b@gmail.com", "\"x<y>\"@gmail.com", "x<y>@gmail.com", "a@localhost", "a@my.test",
+                     "a@[127.0.0.1]", "a@[::1]", "a@1.2.3.4", "a@256.1.1.1", "a@xn--p1ai.ru", "a@ü.de",
+                     "a@café.fr", "ü@gmail.com", "a @gmail.com", "a@ gmail.com", "a@gmail.com ", "a@GMAIL.COM",
+                     "a@dom%.com", "a@x.y:80", "a@-a.com", "a@a_b.com", "a@gmail.ſe", "!a@gmail.com", "", "@"]
+
+DATES: list[str] = ["2000-01-01", "abc", "2000/01/01", "2000-1-01", "0000-01-01", "2000-02-29", "1900-02-29",
+                    "2000-13-01", "+200-01-01", "2_00-01-01", " 2000-01-01", "2000-01-01T10:00", "2000-01-01 10",
+                    "2000-01-01T", "20000-01-01", "9999-12-31", ""]
+
+
+def test_email_and_date() -> None:
+    assert validators.is_email("abc@gmail.com") and validators.is_email("a@[127.0.0.1]")
+    assert not validators.is_email("abc@gmail") and not validators.is_email("a..b@gmail.com")
+    assert validators.is_date("2000-02-29") and validators.is_date("2000/01/01")
+    assert not validators.is_date("1900-02-29") and not validators.is_date("2000-01-01T10:00")
+
+
+# Same answers as the validator_collection checkers the portal used before
+@pytest.mark.parametrize("value", EMAILS + DATES)
+def test_same_as_validator_collection(value: str) -> None:
+    checkers = pytest.importorskip("validator_collection.checkers")
+    assert validators.is_email(value) == checkers.is_email(value)
+    assert validators.is_date(value) == checkers.is_date(value)
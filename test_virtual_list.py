@@ -0,0 +1,101 @@
+import tkinter as tk
+from typing import Iterator
+
+import pytest
+
+from virtual_list import VirtualList, bind_extra, clamp_first_row, rows_for_height
+
+
+@pytest.fixture
+def root() -> Iterator[tk.Tk]:
+    try:
+        window = tk.Tk()
+    except tk.TclError:
+        pytest.skip("no display")
+    yield window
+    window.destroy()
+
+
+def make_list(master: tk.Misc, total: int, visible_rows: int = 5) -> VirtualList:
+    return VirtualList(master, list(range(total)), lambda row: (f"row {row}", str(row * 2)), ("Arial", 10),
+                       visible_rows=visible_rows)
+
+
+def test_clamp_first_row() -> None:
+    assert clamp_first_row(5, 8, 1000) == 5
+    assert clamp_first_row(-3, 8, 1000) == 0
+    assert clamp_first_row(995, 8, 1000) == 992
+    assert clamp_first_row(2, 8, 3) == 0
+
+
+def test_rows_for_height() -> None:
+    assert rows_for_height(400, 50) == 8
+    assert rows_for_height(449, 50) == 8
+    assert rows_for_height(20, 50) == 1
+    assert rows_for_height(400, 0) == 400
+
+
+def test_scrolling_recycles_the_row_pool(root: tk.Tk) -> None:
+    rows = make_list(root, 1000)
+    frames = list(rows.row_frames)
+    assert rows.row_labels[0][0].cget("text") == "row 0"
+
+    rows.scroll_to(10)
+    assert rows.first == 10
+    assert rows.row_frames == frames
+    assert [labels[0].cget("text") for labels in rows.row_labels] == [f"row {row}" for row in range(10, 15)]
+
+    rows.on_scroll("scroll", "1", "pages")
+    assert rows.row_labels[0][1].cget("text") == "30"
+    rows.scroll_to(2000)
+    assert rows.first == 995
+    assert rows.row_labels[-1][0].cget("text") == "row 999"
+
+
+def test_short_list_hides_unused_rows(root: tk.Tk) -> None:
+    rows = make_list(root, 3)
+    root.update()
+    assert [frame.winfo_ismapped() for frame in rows.row_frames] == [True, True, True, False, False]
+
+
+def test_resize_grows_and_shrinks_the_pool(root: tk.Tk) -> None:
+    rows = make_list(root, 1000)
+    rows.scroll_to(997)
+    rows.resize(8)
+    assert len(rows.row_frames) == len(rows.row_labels) == 8
+    assert rows.first == 992
+    assert rows.row_labels[-1][0].cget("text") == "row 999"
+    rows.resize(2)
+    assert len(rows.row_frames) == 2
+    assert rows.row_labels[0][0].cget("text") == "row 992"
+
+
+def test_pool_follows_the_canvas_height(root: tk.Tk) -> None:
+    canvas = tk.Canvas(root, height=600)
+    canvas.pack(fill=tk.BOTH, expand=True)
+    inner = tk.Frame(canvas)
+    canvas.create_window((0, 0), window=inner, anchor="nw")
+    rows = make_list(inner, 1000, visible_rows=1)
+    rows.pack(fill=tk.X)
+    root.update()
+    row_height = rows.row_frames[0].winfo_reqheight() + 15
+    assert rows.viewport is canvas
+    offset = rows.winfo_rooty() - canvas.winfo_rooty()
+    assert len(rows.row_frames) == rows_for_height(canvas.winfo_height() - offset, row_height)
+
+    canvas.config(height=3 * row_height + offset)
+    root.update()
+    assert len(rows.row_frames) == 3
+
+    rows.destroy()
+    assert canvas.bind("<Configure>") == ""
+
+
+def test_bind_extra_removes_only_its_handler(root: tk.Tk) -> None:
+    calls: list[str] = []
+    root.bind("<<Ping>>", lambda event: calls.append("first"))
+    unbind = bind_extra(root, "<<Ping>>", lambda event: calls.append("second"))
+    root.event_generate("<<Ping>>")
+    unbind()
+    root.event_generate("<<Ping>>")
+    assert calls == ["first", "second", "first"]
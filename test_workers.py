@@ -0,0 +1,68 @@
+import threading
+import time
+from workers import BackgroundTask
+
+
+# Stand-in for the Tk window, runs the callbacks scheduled with after() on request
+class FakeWindow:
+    def __init__(self) -> None:
+        self.scheduled: list = []
+
+    def after(self, delay: int, callback) -> str:
+        self.scheduled.append(callback)
+        return str(len(self.scheduled))
+
+    def after_cancel(self, after_id: str) -> None:
+        self.scheduled.clear()
+
+    def run_pending(self) -> None:
+        while self.scheduled:
+            self.scheduled.pop(0)()
+            time.sleep(0.001)
+
+
+def test_result_delivered_on_calling_thread() -> None:
+    window = FakeWindow()
+    results: list = []
+    task = BackgroundTask(window, lambda x: (x * 2, threading.current_thread().name), 21,
+                          on_done=results.append, on_error=results.append)
+    window.run_pending()
+
+    assert results[0][0] == 42
+    assert results[0][1].startswith("roll-call-worker")
+    assert str(task) == "Background task: done"
+
+
+def test_cancelled_task_drops_result() -> None:
+    window = FakeWindow()
+    results: list = []
+    release = threading.Event()
+    task = BackgroundTask(window, release.wait, on_done=results.append, on_error=results.append)
+    task.cancel()
+    release.set()
+    window.run_pending()
+
+    assert results == []
+    assert str(task) == "Background task: cancelled"
+
+
+# A running task can not be stopped, a cancellable one sees the event before it would write
+def test_cancellable_task_sees_cancel() -> None:
+    window = FakeWindow()
+    started = threading.Event()
+    release = threading.Event()
+    writes: list = []
+
+    def create(cancelled: threading.Event, value: int) -> None:
+        started.set()
+        release.wait()
+        if not cancelled.is_set():
+            writes.append(value)
+
+    task = BackgroundTask(window, create, 1, on_done=writes.append, on_error=writes.append, cancellable=True)
+    started.wait()
+    task.cancel()
+    release.set()
+    task.future.result(timeout=5)
+    window.run_pending()
+    assert writes == []
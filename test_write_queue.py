@@ -0,0 +1,92 @@
+import multiprocessing
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import service
+from db import DEFAULT_PRAGMAS, ConnectionManager
+from write_queue import WriteQueue, backoff_delay, is_busy
+
+PROCESSES: int = 4
+THREADS: int = 4
+USERS_PER_THREAD: int = 50
+
+
+def add_row(cur: sqlite3.Cursor, value: int) -> int:
+    cur.execute("INSERT INTO Test VALUES (?)", (value,))
+    return value
+
+
+# Creates users from several threads of one process, with no busy timeout so every lock
+# collision with the other processes goes through the retry with backoff
+def create_users(path: str, process: int) -> dict[str, float]:
+    service.db_manager = ConnectionManager(path, pragmas={**DEFAULT_PRAGMAS, "busy_timeout": 0})
+
+    def create(thread: int) -> None:
+        for i in range(USERS_PER_THREAD):
+            service.create_new_user("Ada", "Lovelace", "2000-01-01", f"ada.{process}.{thread}.{i}@gmail.com", b"hash")
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        list(executor.map(create, range(THREADS)))
+    stats = service.write_queue().stats()
+    service.write_queue().close()
+    return stats
+
+
+def test_failing_write_only_undoes_itself(tmp_path) -> None:
+    manager = ConnectionManager(str(tmp_path / "test.db"))
+    with manager.connection() as conn:
+        conn.execute("CREATE TABLE Test(Id INTEGER PRIMARY KEY)")
+    writes = WriteQueue(manager)
+    futures = [writes.submit(add_row, value) for value in (1, 2, 1, 3)]
+    writes.close()
+
+    assert [future.result() for future in futures[:2]] + [futures[3].result()] == [1, 2, 3]
+    with pytest.raises(sqlite3.IntegrityError):
+        futures[2].result()
+    assert [row[0] for row in manager.connection().execute("SELECT Id FROM Test")] == [1, 2, 3]
+    assert writes.stats()["committed"] == 3 and writes.stats()["failed"] == 1
+    with pytest.raises(RuntimeError):
+        writes.submit(add_row, 4)
+
+
+# close_all closes the connection of the writer thread too, the next batch opens a new one
+def test_writes_after_close_all(tmp_path) -> None:
+    manager = ConnectionManager(str(tmp_path / "test.db"))
+    with manager.connection() as conn:
+        conn.execute("CREATE TABLE Test(Id INTEGER PRIMARY KEY)")
+    writes = WriteQueue(manager)
+    assert writes.write(add_row, 1, timeout=10) == 1
+    manager.close_all()
+    assert writes.write(add_row, 2, timeout=10) == 2
+    assert writes.alive
+    writes.close()
+    assert not writes.alive
+    assert [row[0] for row in manager.connection().execute("SELECT Id FROM Test")] == [1, 2]
+
+
+def test_busy_detection_and_backoff() -> None:
+    busy = sqlite3.OperationalError("database is locked")
+    busy.sqlite_errorcode = sqlite3.SQLITE_BUSY
+    assert is_busy(busy) and not is_busy(sqlite3.OperationalError("no such table: Test"))
+    assert 0.0025 <= backoff_delay(0) <= 0.005
+    assert backoff_delay(30) <= 0.5
+
+
+def test_no_lost_writes_from_many_processes(tmp_path, monkeypatch) -> None:
+    path = str(tmp_path / "roll_call.db")
+    monkeypatch.setattr(service, "db_manager", ConnectionManager(path))
+    service.create_database()
+    course_id = service.insert_course("Astronomy", 50)
+    assert [course.active_status for course in service.get_all_courses() if course.id == course_id] == [1]
+    users_before = service.db_manager.connection().execute("SELECT COUNT(*) FROM User").fetchone()[0]
+
+    with multiprocessing.get_context("spawn").Pool(PROCESSES) as pool:
+        stats = pool.starmap(create_users, [(path, process) for process in range(PROCESSES)])
+
+    emails = {row[0] for row in service.db_manager.connection().execute("SELECT Email FROM User WHERE Id > ?",
+                                                                         (users_before,))}
+    assert emails == {f"ada.{process}.{thread}.{i}@gmail.com" for process in range(PROCESSES)
+                      for thread in range(THREADS) for i in range(USERS_PER_THREAD)}
+    assert sum(process_stats["failed"] for process_stats in stats) == 0
+    assert sum(process_stats["committed"] for process_stats in stats) == PROCESSES * THREADS * USERS_PER_THREAD
+    service.db_manager.close_all()
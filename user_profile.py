@@ -0,0 +1,74 @@
+import sqlite3
+from typing import Mapping, Optional, Union
+from Person import Person
+from Student import Student
+from Teacher import Teacher
+from Admin import Admin
+from Course import Course
+from Grade import Grade
+
+# Maximum number of statements needed to log in and load a full profile, no matter how many courses
+# the user is enrolled in: one for the user row with its degree, one for the version check of the catalog
+# cache (for the degree names, loaded already), one for the enrolled courses and one for the graded courses
+PROFILE_QUERY_BUDGET: int = 4
+
+# Login row for a user by email, together with the user's degree (if any)
+# The name of the degree comes from the catalog cache, so the degree name tables are not joined
+LOGIN_QUERY: str = ("SELECT u.Password, u.Id, u.FirstName, u.Surname, u.Birth, u.Email, u.UniEmail, u.Account, " +
+                    "d.BaseId, d.DegreeBNId, d.TypeId " +
+                    "FROM User AS u " +
+                    "LEFT JOIN Degree AS d ON d.UserId = u.Id " +
+                    "WHERE u.Email = ? " +
+                    "ORDER BY d.BaseId, d.DegreeBNId, d.TypeId")
+
+# All the courses a user is assigned to, in one join instead of one lookup per course
+ENROLLED_COURSES_QUERY: str = ("SELECT c.CourseId, c.CourseName, c.PassingGrade, c.Active, c.Credits " +
+                               "FROM CourseEnrollments AS e JOIN Course AS c ON c.CourseId = e.CourseId " +
+                               "WHERE e.Assigned = 1 AND e.UserId = ? " +
+                               "ORDER BY e.CourseId, e.StartDate")
+
+# All the graded courses of a user together with the grade
+GRADED_COURSES_QUERY: str = ("SELECT c.CourseId, c.CourseName, c.PassingGrade, c.Active, c.Credits, g.Grade " +
+                             "FROM Grade AS g JOIN Course AS c ON c.CourseId = g.CourseId " +
+                             "WHERE g.UserId = ? " +
+                             "ORDER BY g.CourseId")
+
+
+# Find the login row of a user by email, returns None when the email is unknown
+# The first item of the row is the stored password hash
+def find_login(cur: sqlite3.Cursor, email: str) -> Optional[tuple]:
+    cur.execute(LOGIN_QUERY, (email,))
+    return cur.fetchone()
+
+
+# Build the full user object (Student, Teacher, Admin) from a login row returned by find_login
+# degree_names maps (BaseId, DegreeBNId, TypeId) to the full degree name, see CatalogCache.degree_names
+def load_profile(cur: sqlite3.Cursor, login_row: tuple,
+                 degree_names: Mapping[tuple[int, int, int], str]) -> Union[Person, Student, Teacher, Admin]:
+    (_, user_id, first_name, surname, birth, email, uni_email, account,
+     base_id, base_name_id, type_id) = login_row
+
+    if account == 1:
+        # Full name of the degree, like "Bachelors of Science Zoology"
+        full_degree: str = ""
+        if base_id is not None:
+            full_degree = degree_names.get((base_id, base_name_id, type_id), "")
+
+        cur.execute(ENROLLED_COURSES_QUERY, (user_id,))
+        list_of_courses: list[Course] = [Course(row[0], row[1], row[2], row[3], row[4]) for row in cur.fetchall()]
+
+        cur.execute(GRADED_COURSES_QUERY, (user_id,))
+        list_of_graded_courses: list[Grade] = [Grade(Course(row[0], row[1], row[2], row[3], row[4]), row[5])
+                                               for row in cur.fetchall()]
+
+        return Student(user_id, first_name, surname, birth, email, uni_email, full_degree, list_of_courses,
+                       list_of_graded_courses)
+    elif account == 2:
+        # A teacher is linked to the courses they teach by an assigned enrollment
+        cur.execute(ENROLLED_COURSES_QUERY, (user_id,))
+        taught_courses: list[Course] = [Course(row[0], row[1], row[2], row[3], row[4]) for row in cur.fetchall()]
+        return Teacher(user_id, first_name, surname, birth, email, uni_email, taught_courses)
+    elif account == 3:
+        return Admin(user_id, first_name, surname, birth, email, uni_email)
+
+    return Person(user_id, first_name, surname, birth, email, uni_email)
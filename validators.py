@@ -0,0 +1,189 @@
+import datetime
+import re
+from string import punctuation, whitespace
+
+# Date and email checks of the portal, with the same results as validator_collection's checkers.is_date and
+# checkers.is_email for strings, without importing validator_collection (and jsonschema behind it), which took
+# most of the start-up time of the portal
+# The patterns are the ones of validator_collection 1.5.0, compiled once on import, with character classes
+# that match the same characters but compile in a fraction of the time
+
+# Domains that are always valid
+SPECIAL_USE_DOMAIN_NAMES: tuple[str, ...] = ("localhost", "invalid", "test", "example")
+
+# Characters a domain may not contain
+URL_UNSAFE_CHARACTERS: tuple[str, ...] = ("[", "]", "{", "}", "|", "^", "%", "~")
+
+EMAIL_REGEX: re.Pattern = re.compile(
+    r"(?:[a-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[a-z0-9!#$%&'*+/=?^_`{|}~-]+)*|\""
+    r"(?:[\x01-\x08\x0b\x0c\x0e-\x1f\x21\x23-\x5b\x5d-\x7f]|\\[\x01-\x09\x0b\x0c\x0e-\x7f])*\")"
+    r"@(?:(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+[a-z0-9](?:[a-z0-9-]*[a-z0-9])"
+    r"?|\[(?:(?:(2(5[0-5]|[0-4][0-9])|1[0-9][0-9]|[1-9]?[0-9]))\.){3}"
+    r"(?:(2(5[0-5]|[0-4][0-9])|1[0-9][0-9]|[1-9]?[0-9])|[a-z0-9-]*[a-z0-9]:"
+    r"(?:[\x01-\x08\x0b\x0c\x0e-\x1f\x21-\x5a\x53-\x7f]|\\[\x01-\x09\x0b\x0c\x0e-\x7f])+)\])")
+
+# Character classes of the validator_collection patterns, written as the characters they leave out: a class
+# like [a-z\u00a1-\uffff] is compiled into a table of every character it covers, which took 150 ms on import
+# Letters, digits and everything from \u00a1 to \uffff, [A-Za-z\u00a1-\uffff0-9]
+_NAME: str = r"[^\x00-\x2f\x3a-\x40\x5b-\x60\x7b-\xa0\U00010000-\U0010ffff]"
+# The same and the dash, [A-Za-z\u00a1-\uffff0-9-]
+_NAME_DASH: str = r"[^\x00-\x2c\x2e\x2f\x3a-\x40\x5b-\x60\x7b-\xa0\U00010000-\U0010ffff]"
+# The same without the dash and with [\]^_` between the letters, [A-z\u00a1-\uffff0-9]
+_HOST: str = r"[^\x00-\x2f\x3a-\x40\x7b-\xa0\U00010000-\U0010ffff]"
+# Letters, [ and the rest up to ` and everything from \u00a1 to \uffff, [A-z\u00a1-\uffff]
+_TLD: str = r"[^\x00-\x40\x7b-\xa0\U00010000-\U0010ffff]"
+
+# Case insensitive in validator_collection, [a-z] there also matches the dotted and dotless i, the long s and
+# the Kelvin sign
+DOMAIN_REGEX: re.Pattern = re.compile(
+    rf"\b((?={_NAME_DASH}{{1,63}}\.)([xX][nN]--)?{_NAME}+"
+    rf"(-{_NAME}+)*\.)+[A-Za-z\u0130\u0131\u017f\u212a]{{2,63}}\b")
+
+# Second chance for a domain that is not a DOMAIN_REGEX match, as the host of an http:// URL
+URL_REGEX: re.Pattern = re.compile(
+    r"^"
+    # protocol identifier
+    r"(?:(?:https?|ftp)://)"
+    # user:pass authentication
+    r"(?:\S+(?::\S*)?@)?"
+    r"(?:"
+    # IP address exclusion of private and local networks
+    r"(?!(?:10|127)(?:\.\d{1,3}){3})"
+    r"(?!(?:169\.254|192\.168)(?:\.\d{1,3}){2})"
+    r"(?!172\.(?:1[6-9]|2\d|3[0-1])(?:\.\d{1,3}){2})"
+    # IP address dotted notation octets
+    r"(?:[1-9]\d?|1\d\d|2[01]\d|22[0-3])"
+    r"(?:\.(?:1?\d{1,2}|2[0-4]\d|25[0-5])){2}"
+    r"(?:\.(?:[1-9]\d?|1\d\d|2[0-4]\d|25[0-4]))"
+    r"|"
+    r"(?:"
+    r"(?:localhost|invalid|test|example)|("
+    # host name
+    rf"(?:(?:{_HOST}-*_*)*{_HOST}+)"
+    # domain name
+    rf"(?:\.(?:{_HOST}-*)*{_HOST}+)*"
+    # TLD identifier
+    rf"(?:\.(?:{_TLD}{{2,}}))"
+    r")))"
+    # port number
+    r"(?::\d{2,5})?"
+    # resource path
+    r"(?:/\S*)?"
+    r"$",
+    re.UNICODE)
+
+_IPV4_OCTET: str = r"(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])"
+_IPV6_TAIL: str = rf"(?:[0-9A-Fa-f]{{1,4}}:[0-9A-Fa-f]{{1,4}}|(?:{_IPV4_OCTET}\.){{3}}{_IPV4_OCTET})"
+_H16: str = "[0-9A-Fa-f]{1,4}"
+
+IPV6_REGEX: re.Pattern = re.compile(
+    "^(?:"
+    rf"(?:{_H16}:){{6}}{_IPV6_TAIL}"
+    rf"|::(?:{_H16}:){{5}}{_IPV6_TAIL}"
+    rf"|(?:{_H16})?::(?:{_H16}:){{4}}{_IPV6_TAIL}"
+    rf"|(?:{_H16}:{_H16})?::(?:{_H16}:){{3}}{_IPV6_TAIL}"
+    rf"|(?:(?:{_H16}:){{,2}}{_H16})?::(?:{_H16}:){{2}}{_IPV6_TAIL}"
+    rf"|(?:(?:{_H16}:){{,3}}{_H16})?::{_H16}:{_IPV6_TAIL}"
+    rf"|(?:(?:{_H16}:){{,4}}{_H16})?::{_IPV6_TAIL}"
+    rf"|(?:(?:{_H16}:){{,5}}{_H16})?::{_H16}"
+    rf"|(?:(?:{_H16}:){{,6}}{_H16})?::"
+    r")(?:%25(?:[A-Za-z0-9\-._~]|%[0-9A-Fa-f]{2})+)?$")
+
+
+# Check for a date written as YYYY-MM-DD, a time after a space or a T is ignored
+def is_date(value: str) -> bool:
+    if not value or not isinstance(value, str) or len(value) > 10:
+        return False
+    value = value.split(" ")[0].split("T")[0]
+    if len(value) != 10:
+        return False
+    try:
+        datetime.date(int(value[:4]), int(value[5:7]), int(value[-2:]))
+    except ValueError:
+        return False
+    return True
+
+
+# Check for a domain name like "gmail.com"
+def is_domain(value: str) -> bool:
+    if not value or any(character in value for character in "/\\@:"):
+        return False
+    value = value.strip().lower()
+    if any(character in value for character in whitespace):
+        return False
+    if value in SPECIAL_USE_DOMAIN_NAMES:
+        return True
+    if any(character in value for character in URL_UNSAFE_CHARACTERS):
+        return False
+    return bool(DOMAIN_REGEX.match(value) or URL_REGEX.match("http://" + value))
+
+
+# Check for an IPv6 or IPv4 address
+def is_ip_address(value: str) -> bool:
+    if not value:
+        return False
+    if IPV6_REGEX.match(value.lower().strip()):
+        return True
+    components: list[str] = value.split(".")
+    if len(components) != 4 or not all(component.isdigit() for component in components):
+        return False
+    try:
+        return all(0 <= int(component) <= 255 for component in components)
+    except ValueError:
+        return False
+
+
+# Check for an email address, with an optional (comment), a quoted local part or an [ip address] as the domain
+def is_email(value: str) -> bool:
+    if not value or not isinstance(value, str) or "@" not in value:
+        return False
+
+    # A comment is dropped, an unbalanced parenthesis makes the address invalid
+    if "(" in value and ")" in value:
+        open_position: int = value.find("(")
+        close_position: int = value.find(")") + 1
+        if close_position < open_position:
+            return False
+        value = value.replace(value[open_position:close_position], "")
+    elif "(" in value or ")" in value:
+        return False
+
+    # Angle brackets and more than one @ need to be quoted
+    if "<" in value or ">" in value:
+        lt_position: int = value.find("<")
+        gt_position: int = value.find(">")
+        first_quote: int = value.find('"', 0, lt_position) if lt_position >= 0 else -1
+        second_quote: int = value.find('"', gt_position) if gt_position >= 0 else -1
+        if first_quote < 0 or second_quote < 0:
+            return False
+    at_count: int = value.count("@")
+    if at_count > 1:
+        last_at: int = 0
+        last_quote: int = 0
+        for _ in range(at_count):
+            at_position: int = value.find("@", last_at + 1)
+            if at_position >= 0:
+                first_quote = value.find('"', last_quote, at_position)
+                second_quote = value.find('"', first_quote)
+                if first_quote < 0 or second_quote < 0:
+                    return False
+            last_at = at_position
+            last_quote = second_quote
+
+    parts: list[str] = value.split("@")
+    local: str = "".join(parts[:-1])
+    domain: str = parts[-1]
+    if domain.startswith("[") and domain.endswith("]"):
+        domain = domain[1:-1]
+    if not is_domain(domain):
+        return is_ip_address(domain) and is_email(local + "@test.com")
+
+    match: re.Match = EMAIL_REGEX.search(value)
+    if not match:
+        return False
+    position: int = value.find(match.group(0))
+    if position > 0:
+        prefix: str = value[:position]
+        if prefix[0] in punctuation or ".." in prefix:
+            return False
+    return position + len(match.group(0)) == len(value)
@@ -0,0 +1,174 @@
+import tkinter as tk
+from typing import Any, Callable, Optional, Sequence
+
+# Background colour of list rows, same as the rest of the portal
+ROW_BG: str = "#C9C9C9"
+
+
+# Return the first row to show, so the window of visible rows always stays inside the list
+def clamp_first_row(first: int, visible_rows: int, total: int) -> int:
+    return max(0, min(first, total - visible_rows))
+
+
+# Number of rows of the given height that fit in the given height, at least one
+def rows_for_height(height: int, row_height: int) -> int:
+    return max(1, height // max(1, row_height))
+
+
+# Bind a handler to an event of a widget the list does not own, returns a function that removes only this
+# handler again (Misc.unbind with a funcid drops every handler of the event before Python 3.13)
+def bind_extra(widget: tk.Misc, sequence: str, handler: Callable[[tk.Event], None]) -> Callable[[], None]:
+    funcid: str = widget.bind(sequence, handler, add="+")
+
+    def unbind() -> None:
+        if not widget.winfo_exists():
+            return
+        script: str = widget.tk.call("bind", widget._w, sequence)
+        kept: str = "\n".join(line for line in script.split("\n") if funcid not in line)
+        widget.tk.call("bind", widget._w, sequence, kept)
+        widget.deletecommand(funcid)
+    return unbind
+
+
+# List that only creates widgets for the rows that fit in the view
+# A pool of row frames is filled with the data of the rows scrolled into view, so creating and scrolling
+# the list costs the same for ten rows as for ten thousand
+# The pool starts with visible_rows rows and follows the height of the view: the canvas the list is
+# scrolled in, or else its window
+# For rows that are read page by page, load_more is called when the view comes near the end of the
+# rows read so far, it adds rows to the sequence and returns False once there is nothing left
+class VirtualList(tk.Frame):
+    def __init__(self, master: tk.Misc, rows: Sequence[Any], columns: Callable[[Any], tuple[str, ...]],
+                 font: tuple, visible_rows: int = 8, anchors: tuple[str, ...] = ("nw", "ne"),
+                 load_more: Optional[Callable[[], bool]] = None) -> None:
+        super().__init__(master)
+        self.font: tuple = font
+        self.anchors: tuple[str, ...] = anchors
+        self.columns: Callable[[Any], tuple[str, ...]] = columns
+        self.visible_rows: int = visible_rows
+        self.first: int = 0
+        self.rows: Sequence[Any] = rows
+        self.load_more: Optional[Callable[[], bool]] = load_more
+
+        # Pool of row widgets, each with one label per column
+        self.body = tk.Frame(self)
+        self.body.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.row_frames: list[tk.Frame] = []
+        self.row_labels: list[list[tk.Label]] = []
+        for _ in range(visible_rows):
+            self.add_row()
+        self.bind_wheel(self)
+        self.bind_wheel(self.body)
+
+        # Resize the pool when the list is laid out and when the view it is shown in is resized
+        self.viewport: tk.Misc = self.winfo_toplevel()
+        ancestor: Optional[tk.Misc] = self.master
+        while ancestor is not None and not isinstance(ancestor, tk.Canvas):
+            ancestor = ancestor.master
+        if ancestor is not None:
+            self.viewport = ancestor
+        self.bind("<Configure>", self.on_resize)
+        unbind: Callable[[], None] = bind_extra(self.viewport, "<Configure>", self.on_resize)
+        self.bind("<Destroy>", lambda event: unbind() if event.widget is self else None)
+
+        self.fill(0)
+        self.render()
+
+    # Scroll with the mouse wheel on any part of the list
+    def bind_wheel(self, widget: tk.Misc) -> None:
+        widget.bind("<MouseWheel>", self.on_mouse_wheel)
+        widget.bind("<Button-4>", lambda event: self.scroll_to(self.first - 1))
+        widget.bind("<Button-5>", lambda event: self.scroll_to(self.first + 1))
+
+    # Add a row frame with one label per column to the pool
+    def add_row(self) -> None:
+        frame = tk.Frame(self.body, bg=ROW_BG)
+        labels: list[tk.Label] = []
+        for index, anchor in enumerate(self.anchors):
+            label = tk.Label(frame, text="", font=self.font, bg=ROW_BG)
+            label.pack(pady=(15, 15), padx=15, side=tk.LEFT if index == 0 else tk.RIGHT, anchor=anchor)
+            labels.append(label)
+            self.bind_wheel(label)
+        self.bind_wheel(frame)
+        self.row_frames.append(frame)
+        self.row_labels.append(labels)
+
+    # Grow or shrink the pool to the given number of rows and show the rows in view again
+    def resize(self, visible_rows: int) -> None:
+        visible_rows = max(1, visible_rows)
+        if visible_rows == self.visible_rows:
+            return
+        while len(self.row_frames) < visible_rows:
+            self.add_row()
+        for frame in self.row_frames[visible_rows:]:
+            frame.destroy()
+        del self.row_frames[visible_rows:]
+        del self.row_labels[visible_rows:]
+        self.visible_rows = visible_rows
+        self.fill(self.first)
+        self.first = clamp_first_row(self.first, visible_rows, len(self.rows))
+        self.render()
+
+    # Size the pool to the rows that fit between the top of the list and the bottom of the view
+    # A row takes the requested height of its frame and the padding above it, the pool only shrinks while
+    # all its rows are in use, as a list shorter than the pool also leaves a window sized to it smaller
+    def on_resize(self, event: tk.Event) -> None:
+        if event.widget is not self and event.widget is not self.viewport:
+            return
+        height: int = self.viewport.winfo_height()
+        height -= min(max(0, self.winfo_rooty() - self.viewport.winfo_rooty()), height)
+        visible_rows: int = rows_for_height(height, self.row_frames[0].winfo_reqheight() + 15)
+        if visible_rows > self.visible_rows or len(self.rows) >= self.visible_rows:
+            self.resize(visible_rows)
+
+    # Replace the rows of the list and start from the top
+    def set_rows(self, rows: Sequence[Any], load_more: Optional[Callable[[], bool]] = None) -> None:
+        self.rows = rows
+        self.load_more = load_more
+        self.first = 0
+        self.fill(0)
+        self.render()
+
+    # Read more rows until the rows past the first one in view fill another view, or nothing is left
+    def fill(self, first: int) -> None:
+        while self.load_more is not None and first + 2 * self.visible_rows > len(self.rows):
+            if not self.load_more():
+                self.load_more = None
+
+    def scroll_to(self, first: int) -> None:
+        self.fill(first)
+        first = clamp_first_row(first, self.visible_rows, len(self.rows))
+        if first != self.first:
+            self.first = first
+            self.render()
+
+    # Handle the scrollbar commands ("moveto", fraction) and ("scroll", number, "units" or "pages")
+    def on_scroll(self, action: str, amount: str, unit: str = "units") -> None:
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * len(self.rows)))
+        elif action == "scroll":
+            step: int = self.visible_rows if unit == "pages" else 1
+            self.scroll_to(self.first + int(amount) * step)
+
+    def on_mouse_wheel(self, event: tk.Event) -> None:
+        self.scroll_to(self.first - (1 if event.delta > 0 else -1))
+
+    # Fill the row pool with the rows in view and hide the rows past the end of the list
+    def render(self) -> None:
+        total: int = len(self.rows)
+        for index, frame in enumerate(self.row_frames):
+            row_index: int = self.first + index
+            if row_index < total:
+                for label, text in zip(self.row_labels[index], self.columns(self.rows[row_index])):
+                    label.config(text=text)
+                frame.pack(pady=(15, 0), padx=(15, 15), side=tk.TOP, fill=tk.X, expand=True, anchor="nw")
+            else:
+                frame.pack_forget()
+
+        if total > self.visible_rows:
+            self.scrollbar.set(self.first / total, (self.first + self.visible_rows) / total)
+        else:
+            self.scrollbar.set(0, 1)
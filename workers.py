@@ -0,0 +1,89 @@
+import threading
+import tkinter as tk
+from tkinter import ttk
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+# Milliseconds between two checks of a running task from the Tk main loop
+POLL_INTERVAL: int = 25
+
+# Shared pool for blocking work, bcrypt releases the GIL so hashing runs next to the Tk main loop
+# Each worker thread gets its own database connection from the connection manager
+# Created by the first task, so concurrent.futures (and logging behind it) is not imported on start-up
+_executor: Optional["ThreadPoolExecutor"] = None
+
+
+# Return the shared pool, tasks are only started from the Tk thread so no lock is needed
+def worker_pool() -> "ThreadPoolExecutor":
+    global _executor
+    if _executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+        _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="roll-call-worker")
+    return _executor
+
+
+# Runs a function in the worker pool and hands the result back on the Tk thread
+# The Tk thread polls the future with window.after, so no Tk call is ever made from a worker thread
+# While the task runs the progress bar moves and the given widgets are disabled
+# With cancellable the function gets the cancel event of the task as its first argument, to check before it
+# does something that can not be taken back, like writing to the database
+class BackgroundTask:
+    def __init__(self, window: tk.Misc, function: Callable[..., Any], *args: Any,
+                 on_done: Callable[[Any], None], on_error: Callable[[BaseException], None],
+                 progress: Optional[ttk.Progressbar] = None, disable: tuple[tk.Widget, ...] = (),
+                 cancellable: bool = False) -> None:
+        self.window: tk.Misc = window
+        self.on_done: Callable[[Any], None] = on_done
+        self.on_error: Callable[[BaseException], None] = on_error
+        self.progress: Optional[ttk.Progressbar] = progress
+        self.disable: tuple[tk.Widget, ...] = disable
+        self.cancelled: bool = False
+        self.cancel_event = threading.Event()
+
+        self.set_busy(True)
+        if cancellable:
+            args = (self.cancel_event, *args)
+        self.future: "Future" = worker_pool().submit(function, *args)
+        self.after_id: str = window.after(POLL_INTERVAL, self.poll)
+
+    def __str__(self) -> str:
+        state: str = "cancelled" if self.cancelled else "done" if self.future.done() else "running"
+        return f"Background task: {state}"
+
+    # Stop waiting for the task and drop its result
+    # A task the worker already started runs on to the end, unless it is cancellable and checks the event
+    def cancel(self) -> None:
+        if self.cancelled:
+            return
+        self.cancelled = True
+        self.cancel_event.set()
+        self.future.cancel()
+        self.window.after_cancel(self.after_id)
+        self.set_busy(False)
+
+    def set_busy(self, busy: bool) -> None:
+        if self.progress is not None:
+            if busy:
+                self.progress.pack(pady=5)
+                self.progress.start()
+            else:
+                self.progress.stop()
+                self.progress.pack_forget()
+        for widget in self.disable:
+            widget.configure(state="disabled" if busy else "normal")
+
+    def poll(self) -> None:
+        if self.cancelled:
+            return
+        if not self.future.done():
+            self.after_id = self.window.after(POLL_INTERVAL, self.poll)
+            return
+
+        self.set_busy(False)
+        error: Optional[BaseException] = self.future.exception()
+        if error is not None:
+            self.on_error(error)
+        else:
+            self.on_done(self.future.result())
@@ -0,0 +1,222 @@
+import queue
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+from db import ConnectionManager
+
+# Writes committed together in one transaction at most
+MAX_BATCH: int = 64
+
+# Attempts to start or commit a transaction while another process holds the write lock
+MAX_ATTEMPTS: int = 10
+
+# First and longest pause between two attempts in seconds, the pause doubles after every attempt
+BASE_DELAY: float = 0.005
+MAX_DELAY: float = 0.5
+
+# Commit latencies kept for the metrics
+LATENCY_SAMPLES: int = 1000
+
+# Error codes of a database locked by another connection, extended codes share the low byte
+BUSY_CODES: tuple[int, ...] = (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+
+
+# True when the error is "database is locked" or "database table is locked", which go away by trying again
+def is_busy(error: BaseException) -> bool:
+    return (isinstance(error, sqlite3.OperationalError)
+            and (getattr(error, "sqlite_errorcode", 0) & 0xFF) in BUSY_CODES)
+
+
+# Pause before the next attempt: doubles every attempt up to max_delay, with jitter so the
+# processes waiting for the same lock do not all try again at the same moment
+def backoff_delay(attempt: int, base_delay: float = BASE_DELAY, max_delay: float = MAX_DELAY) -> float:
+    return min(max_delay, base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+# One write waiting in the queue: the function gets the cursor of the batch transaction and the arguments
+class PendingWrite:
+    __slots__ = ("future", "function", "args", "queued")
+
+    def __init__(self, function: Callable[..., Any], args: tuple) -> None:
+        self.future: Future = Future()
+        self.function: Callable[..., Any] = function
+        self.args: tuple = args
+        self.queued: float = time.perf_counter()
+
+
+# Funnels the writes of a process through one writer thread, so the threads of a process never
+# fight each other for the write lock of the database
+# Writes queued while a transaction commits are committed together in the next one (group commit),
+# each in its own savepoint so a failing write only undoes itself; when another process holds the lock,
+# starting and committing the transaction are tried again with exponential backoff
+class WriteQueue:
+    def __init__(self, manager: ConnectionManager, max_batch: int = MAX_BATCH, max_attempts: int = MAX_ATTEMPTS,
+                 base_delay: float = BASE_DELAY, max_delay: float = MAX_DELAY) -> None:
+        self.manager: ConnectionManager = manager
+        self.max_batch: int = max_batch
+        self.max_attempts: int = max_attempts
+        self.base_delay: float = base_delay
+        self.max_delay: float = max_delay
+        self.submitted: int = 0
+        self.committed: int = 0
+        self.failed: int = 0
+        self.batches: int = 0
+        self.busy_retries: int = 0
+        self.max_depth: int = 0
+        self._latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._waits: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed: bool = False
+
+    def __str__(self) -> str:
+        stats = self.stats()
+        return (f"Writes: {stats['committed']} committed, {stats['failed']} failed in {stats['batches']} batches, "
+                f"Queue depth: {stats['queue_depth']} (max {stats['max_queue_depth']}), "
+                f"Commit: {stats['commit_ms_mean']:.1f} ms mean, {stats['commit_ms_p95']:.1f} ms p95, "
+                f"Busy retries: {stats['busy_retries']}")
+
+    # Writes waiting for the writer thread
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    # Queue a write, the returned future holds the result of the function once its transaction committed
+    # The function must not commit or roll back itself
+    def submit(self, function: Callable[..., Any], *args: Any) -> Future:
+        write = PendingWrite(function, args)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The write queue is closed")
+            if self._thread is None:
+                # Started on the first write, so a process that only reads never has a writer thread
+                self._thread = threading.Thread(target=self._run, name="roll-call-writer", daemon=True)
+                self._thread.start()
+            self.submitted += 1
+            self._queue.put(write)
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+        return write.future
+
+    # Queue a write and wait until it is committed, returns the result of the function or raises its error
+    def write(self, function: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("A write can not wait for the write queue from the writer thread")
+        return self.submit(function, *args).result(timeout)
+
+    # Commit the writes already queued and stop the writer thread
+    def close(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    # False once the queue is closed or its writer thread stopped, a stopped queue takes no more writes
+    @property
+    def alive(self) -> bool:
+        with self._lock:
+            return not self._closed and (self._thread is None or self._thread.is_alive())
+
+    # Return the counters and latencies, latencies are in milliseconds over the last LATENCY_SAMPLES batches
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            latencies: list[float] = sorted(self._latencies)
+            waits: list[float] = list(self._waits)
+            return {"submitted": self.submitted, "committed": self.committed, "failed": self.failed,
+                    "batches": self.batches, "busy_retries": self.busy_retries, "queue_depth": self.depth,
+                    "max_queue_depth": self.max_depth,
+                    "mean_batch": self.committed / self.batches if self.batches else 0.0,
+                    "commit_ms_mean": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+                    "commit_ms_p95": 1000 * latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+                    "queue_wait_ms_mean": 1000 * sum(waits) / len(waits) if waits else 0.0}
+
+    def _run(self) -> None:
+        stopping: bool = False
+        while not stopping:
+            write: Optional[PendingWrite] = self._queue.get()
+            if write is None:
+                break
+            # Everything that queued up meanwhile goes into the same transaction
+            batch: list[PendingWrite] = [write]
+            while len(batch) < self.max_batch:
+                try:
+                    write = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if write is None:
+                    stopping = True
+                    break
+                batch.append(write)
+            self._commit_batch(batch)
+        self.manager.close()
+
+    # Run a statement again with backoff for as long as the database is locked, up to max_attempts times
+    def _retry(self, function: Callable[..., Any], *args: Any) -> Any:
+        for attempt in range(self.max_attempts):
+            try:
+                return function(*args)
+            except sqlite3.OperationalError as error:
+                if not is_busy(error) or attempt == self.max_attempts - 1:
+                    raise
+                with self._lock:
+                    self.busy_retries += 1
+                time.sleep(backoff_delay(attempt, self.base_delay, self.max_delay))
+
+    # The connection is looked up for every batch, so one closed by ConnectionManager.close_all is opened again
+    # Any error fails the futures of the batch, the writer thread keeps running for the next one
+    def _commit_batch(self, batch: list[PendingWrite]) -> None:
+        batch = [write for write in batch if write.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        start: float = time.perf_counter()
+        outcomes: list[tuple[PendingWrite, Any, Optional[BaseException]]] = []
+        conn: Optional[sqlite3.Connection] = None
+        try:
+            conn = self.manager.connection()
+            cur = conn.cursor()
+            self._retry(cur.execute, "BEGIN IMMEDIATE")
+            for write in batch:
+                cur.execute("SAVEPOINT write")
+                try:
+                    outcomes.append((write, write.function(cur, *write.args), None))
+                except Exception as error:
+                    cur.execute("ROLLBACK TO write")
+                    outcomes.append((write, None, error))
+                cur.execute("RELEASE write")
+            self._retry(conn.commit)
+        except Exception as error:
+            # Nothing of the batch was committed
+            if conn is not None and conn.in_transaction:
+                try:
+                    conn.rollback()
+                except sqlite3.Error:
+                    pass
+            with self._lock:
+                self.failed += len(batch)
+            for write in batch:
+                write.future.set_exception(error)
+            return
+
+        end: float = time.perf_counter()
+        with self._lock:
+            self.batches += 1
+            self._latencies.append(end - start)
+            self._waits.extend(start - write.queued for write in batch)
+            for _, _, error in outcomes:
+                if error is None:
+                    self.committed += 1
+                else:
+                    self.failed += 1
+        for write, result, error in outcomes:
+            if error is None:
+                write.future.set_result(result)
+            else:
+                write.future.set_exception(error)